@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Time applying curation proposals to a real Anki collection.
+
+Builds a throwaway collection, then applies N proposals (80% edits, 10%
+creates, 10% deletes) twice: one repository call per proposal, as
+apply_proposals used to do, and through the batched, transactional
+apply_proposals. Reports wall time per size for both.
+
+Usage:
+    uv run python scripts/bench_apply_curation.py [--sizes 10 100 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from anki.collection import Collection
+
+from addon.application.use_cases.apply_curation import apply_proposals
+from addon.domain.entities.note import AddonNote, NoteId
+from addon.domain.entities.proposals import (
+    CreateProposal,
+    DeleteProposal,
+    EditProposal,
+    Proposal,
+)
+from addon.infrastructure.persistence.anki_note_repository import (
+    AnkiNoteRepository,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1_000],
+        help="Numbers of proposals to apply",
+    )
+    args = parser.parse_args()
+
+    print(f"{'proposals':>10} {'one-by-one s':>13} {'batched s':>10}")
+    for size in args.sizes:
+        one_by_one = _time(size, _apply_one_by_one)
+        batched = _time(size, _apply_batched)
+        print(f"{size:>10} {one_by_one:>13.3f} {batched:>10.3f}")
+
+
+def _time(size: int, apply) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        col = Collection(str(Path(tmp) / "bench.anki2"))
+        try:
+            repository = AnkiNoteRepository(col)
+            proposals = _proposals(repository, size)
+            start = time.perf_counter()
+            apply(repository, proposals)
+            return time.perf_counter() - start
+        finally:
+            col.close()
+
+
+def _proposals(repository: AnkiNoteRepository, size: int) -> list[Proposal]:
+    n_creates = size // 10
+    n_deletes = size // 10
+    n_edits = size - n_creates - n_deletes
+    existing = repository.add_many(
+        [
+            AddonNote(front=f"Question {i}", back=f"Answer {i}")
+            for i in range(n_edits + n_deletes)
+        ],
+        deck_name="Default",
+    )
+    proposals: list[Proposal] = []
+    for note_id in existing[:n_edits]:
+        before = repository.get(note_id)
+        after = AddonNote(
+            front=before.front, back=before.back + " (edited)", tags=["x"]
+        )
+        proposals.append(EditProposal(note_id, before, after, "edit"))
+    for i in range(n_creates):
+        note = AddonNote(front=f"New {i}", back="new")
+        proposals.append(CreateProposal(note, "create"))
+    for note_id in existing[n_edits:]:
+        before = repository.get(note_id)
+        proposals.append(DeleteProposal(note_id, before, "delete"))
+    return proposals
+
+
+def _apply_one_by_one(
+    repository: AnkiNoteRepository, proposals: list[Proposal]
+) -> None:
+    for proposal in proposals:
+        if isinstance(proposal, EditProposal):
+            repository.update(proposal.note_id, proposal.after)
+        elif isinstance(proposal, CreateProposal):
+            repository.add(proposal.note, "Default")
+    for proposal in proposals:
+        if isinstance(proposal, DeleteProposal):
+            repository.remove([NoteId(proposal.note_id)])
+
+
+def _apply_batched(
+    repository: AnkiNoteRepository, proposals: list[Proposal]
+) -> None:
+    apply_proposals(repository, proposals, deck_name="Default")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Measure batch formatting throughput against a simulated LLM server.
+
+Formats N notes through BatchFormatter with a completion provider that
+sleeps for a fixed latency per call (a stand-in for the LLM round
+trip), once per worker count. Reports notes per minute and the queue
+depth of ready suggestions; 1 worker matches formatting the notes one
+at a time.
+
+Then simulates a review session the way the review editor drives the
+formatter: the user spends --think seconds per note while the next
+--lookahead notes are prefetched, and the note being left is
+cancelled. Reports the mean wait per note after the first; look-ahead
+0 requests each note only when the user reaches it.
+
+Usage:
+    uv run python scripts/bench_batch_formatter.py \
+        [--notes 300] [--latency 0.05] [--workers 1 4 8] \
+        [--think 0.05] [--lookahead 0 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from addon.application.services.batch_formatter import BatchFormatter
+from addon.application.services.formatter_service import NoteFormatter
+from addon.domain.entities.note import AddonNote, NoteId
+
+_RESPONSE = json.dumps({"front": "Formatted Q", "back": "Formatted A"})
+
+
+class _SimulatedServer:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+
+    def run(self, prompt: str | list[dict], **kwargs) -> str:
+        time.sleep(self._latency)
+        return _RESPONSE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=300)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds per simulated LLM call",
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument(
+        "--think",
+        type=float,
+        default=0.05,
+        help="Seconds the simulated user spends on each note",
+    )
+    parser.add_argument("--lookahead", type=int, nargs="+", default=[0, 5])
+    parser.add_argument(
+        "--review-notes",
+        type=int,
+        default=30,
+        help="Notes in the simulated review session",
+    )
+    args = parser.parse_args()
+
+    notes = {
+        NoteId(i): AddonNote(front=f"Question {i}", back=f"Answer {i}")
+        for i in range(args.notes)
+    }
+    print(f"{'workers':>8} {'seconds':>8} {'notes/min':>10} {'queue':>6}")
+    for workers in args.workers:
+        formatter = NoteFormatter(_SimulatedServer(args.latency))
+        batch = BatchFormatter(formatter, max_workers=workers)
+        batch.submit(notes)
+        batch.wait()
+        stats = batch.stats()
+        print(
+            f"{workers:>8} {stats.elapsed_seconds:>8.2f} "
+            f"{stats.notes_per_minute:>10.0f} {stats.queue_depth:>6}"
+        )
+        batch.shutdown()
+
+    print()
+    print(f"{'lookahead':>10} {'mean wait ms':>13}")
+    session = dict(list(notes.items())[: args.review_notes])
+    for lookahead in args.lookahead:
+        wait = _review(session, args.latency, args.think, lookahead)
+        print(f"{lookahead:>10} {wait * 1000:>13.1f}")
+
+
+def _review(
+    notes: dict[NoteId, AddonNote],
+    latency: float,
+    think: float,
+    lookahead: int,
+) -> float:
+    """Mean seconds the user waits for each suggestion after the
+    first."""
+    batch = BatchFormatter(NoteFormatter(_SimulatedServer(latency)))
+    ids = list(notes)
+    waits = []
+    for i, note_id in enumerate(ids):
+        if i > 0:
+            batch.cancel([ids[i - 1]])
+        window = ids[i : i + 1 + lookahead]
+        batch.submit({n: notes[n] for n in window})
+        start = time.perf_counter()
+        while batch.take(note_id) is None:
+            time.sleep(0.001)
+        if i > 0:
+            waits.append(time.perf_counter() - start)
+        time.sleep(think)
+    batch.shutdown()
+    return sum(waits) / len(waits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Time the deck-wide near-duplicate job end to end on 20k notes.
+
+Builds a collection of synthetic notes whose embeddings are clustered
+unit vectors, with --duplicates of them planted as noisy copies of
+other notes, loads it into a NumpyDocumentRepository and runs
+SimilarNoteFinder.find_duplicate_groups(). Reports the time to load
+and to group, and the planted pairs found. Embeddings are precomputed
+so only the index and the grouping are timed, not the encoder.
+
+The NumPy repository is what to use locally: Qdrant's local mode
+searches exhaustively and checks the "not the query point" filter in
+Python for every stored point, so its kNN step grows quadratically
+with the collection (~4 minutes at 5k notes). With --url (a running
+Qdrant server, e.g. http://localhost:6333) the job runs on the
+server's HNSW index instead.
+
+Usage:
+    uv run python scripts/bench_duplicate_groups.py \
+        [--notes 20000] [--duplicates 400] [--dim 384] \
+        [--threshold 0.9] [--neighbors 5] [--url URL]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+
+import numpy as np
+
+from addon.application.use_cases.note_duplicate_finder import (
+    SimilarNoteFinder,
+)
+from addon.domain.entities.note import AddonCollection, AddonNote
+from addon.domain.repositories.document_repository import DocumentRepository
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+
+_NOTE_NUMBER = re.compile(r"note(\d+)\b")
+
+
+class _PrecomputedEncoder:
+    """Looks up each note's vector from the number in its front."""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self._vectors = vectors
+
+    def encode(self, sentences, batch_size: int = 32):
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        rows = [int(_NOTE_NUMBER.search(s).group(1)) for s in sentences]
+        return self._vectors[rows]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._vectors.shape[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=20_000)
+    parser.add_argument("--duplicates", type=int, default=400)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--neighbors", type=int, default=5)
+    parser.add_argument(
+        "--url", help="Qdrant server to run the job on, instead of NumPy"
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _synthetic(rng, args.notes, args.dim)
+    copies = rng.choice(args.notes, args.duplicates, replace=False)
+    originals = rng.choice(
+        np.setdiff1d(np.arange(args.notes), copies),
+        args.duplicates,
+        replace=False,
+    )
+    vectors[copies] = _normalize(
+        vectors[originals]
+        + rng.normal(0, 0.01, (args.duplicates, args.dim)).astype(np.float32)
+    )
+
+    collection = AddonCollection(name="bench")
+    notes = [
+        AddonNote(front=f"note{i} question", back="answer")
+        for i in range(args.notes)
+    ]
+    collection.add(notes=notes)
+    encoder = _PrecomputedEncoder(vectors)
+    repository: DocumentRepository
+    if args.url:
+        from qdrant_client import QdrantClient
+
+        from addon.infrastructure.persistence.qdrant_repository import (
+            QdrantDocumentRepository,
+        )
+
+        repository = QdrantDocumentRepository(
+            encoder,
+            client=QdrantClient(url=args.url),  # type: ignore[arg-type]
+            collection_name="bench_duplicate_groups",
+            batch_size=256,
+        )
+    else:
+        repository = NumpyDocumentRepository(encoder, batch_size=256)
+    finder = SimilarNoteFinder(collection=collection, repository=repository)
+
+    start = time.perf_counter()
+    finder.load_collection()
+    loaded = time.perf_counter()
+    groups = finder.find_duplicate_groups(
+        threshold=args.threshold, neighbors=args.neighbors
+    )
+    grouped = time.perf_counter()
+
+    planted = {
+        frozenset((notes[a].guid, notes[b].guid))
+        for a, b in zip(originals, copies)
+    }
+    found = sum(
+        1
+        for pair in planted
+        if any(pair <= {n.guid for n in g.notes} for g in groups)
+    )
+    print(f"notes: {args.notes}, groups: {len(groups)}")
+    print(f"planted pairs found: {found}/{len(planted)}")
+    print(f"load: {loaded - start:.1f} s, group: {grouped - loaded:.1f} s")
+    print(f"end to end: {grouped - start:.1f} s")
+
+
+def _synthetic(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    """Unit vectors around 100 topics, far enough apart from each
+    other to stay below a 0.9 threshold."""
+    topics = rng.normal(0, 1, (100, dim)).astype(np.float32)
+    vectors = topics[rng.integers(0, 100, n)] + rng.normal(
+        0, 1.0, (n, dim)
+    ).astype(np.float32)
+    return _normalize(vectors)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Measure rebuilding the vector index with and without the embedding
+cache.
+
+Loads N notes into a fresh in-memory Qdrant collection three times:
+with the bare encoder, through CachedEmbeddingModel with an empty
+cache, and again with the cache warm (as when the index is rebuilt
+after a settings change). Then reports the time to open the cache,
+which maps the vectors file instead of reading it, and to compact it
+after deleting a tenth of the notes.
+
+The encoder is simulated like in bench_embedding_load.py: each call
+costs a fixed overhead plus a smaller cost per text.
+
+Usage:
+    uv run python scripts/bench_embedding_cache.py \
+        [--notes 20000] [--dim 384]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from addon.domain.repositories.document_repository import Document
+from addon.infrastructure.persistence.embedding_cache import (
+    CachedEmbeddingModel,
+    MemmapEmbeddingCache,
+)
+from addon.infrastructure.persistence.qdrant_repository import (
+    QdrantDocumentRepository,
+)
+
+
+class _SimulatedEncoder:
+    def __init__(self, dim: int, call_overhead: float, per_text: float):
+        self._dim = dim
+        self._call_overhead = call_overhead
+        self._per_text = per_text
+
+    def encode(self, sentences, batch_size: int = 32):
+        texts = [sentences] if isinstance(sentences, str) else sentences
+        time.sleep(self._call_overhead + self._per_text * len(texts))
+        vectors = np.full((len(texts), self._dim), 0.1, dtype=np.float32)
+        return vectors[0] if isinstance(sentences, str) else vectors
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--call-overhead", type=float, default=0.005)
+    parser.add_argument("--per-text", type=float, default=0.001)
+    args = parser.parse_args()
+
+    documents = [
+        Document(
+            id=str(uuid.UUID(int=i)),
+            content=f"Question {i}? Answer {i}.",
+            source="bench",
+            metadata={},
+        )
+        for i in range(args.notes)
+    ]
+    encoder = _SimulatedEncoder(args.dim, args.call_overhead, args.per_text)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(f"{'load':>12} {'seconds':>8}")
+        for name in ("no cache", "cold cache", "warm cache"):
+            model = (
+                encoder
+                if name == "no cache"
+                else _cached(encoder, cache_dir, args.dim)
+            )
+            start = time.perf_counter()
+            QdrantDocumentRepository(model, batch_size=256).store_batch(
+                documents
+            )
+            print(f"{name:>12} {time.perf_counter() - start:>8.2f}")
+
+        start = time.perf_counter()
+        model = _cached(encoder, cache_dir, args.dim)
+        opened = time.perf_counter() - start
+        model.encode([d.content for d in documents[: args.notes * 9 // 10]])
+        start = time.perf_counter()
+        dropped = model.compact()
+        compacted = time.perf_counter() - start
+        print()
+        print(f"open cache of {args.notes} rows: {opened * 1000:.1f} ms")
+        print(f"compact ({dropped} rows dropped): {compacted * 1000:.1f} ms")
+
+
+def _cached(encoder, cache_dir: str, dim: int) -> CachedEmbeddingModel:
+    return CachedEmbeddingModel(
+        encoder, MemmapEmbeddingCache(cache_dir, "simulated", dim)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Measure loading notes into QdrantDocumentRepository, in notes/second.
+
+Stores N documents in an in-memory Qdrant collection through
+store_batch() at several batch sizes; batch size 1 matches the old
+behaviour of one encoder call per document.
+
+Then stores the notes in an on-disk index, closes it and times
+reopening it and loading the same notes again, which finds them all
+unchanged and embeds nothing.
+
+By default the encoder is simulated: each call costs a fixed overhead
+(tokenization, dispatch, framework setup) plus a smaller cost per text,
+the shape of CPU inference with sentence-transformers. Pass --model to
+time a real SentenceTransformer instead (needs sentence-transformers).
+
+Usage:
+    uv run python scripts/bench_embedding_load.py \
+        [--notes 10000] [--batch-sizes 1 16 64 256] \
+        [--model sentence-transformers/all-MiniLM-L6-v2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from addon.domain.repositories.document_repository import Document
+from addon.infrastructure.persistence.qdrant_repository import (
+    QdrantDocumentRepository,
+)
+
+_DIMENSION = 384
+
+
+class _SimulatedEncoder:
+    def __init__(self, call_overhead: float, per_text: float) -> None:
+        self._call_overhead = call_overhead
+        self._per_text = per_text
+
+    def encode(self, sentences, batch_size: int = 32):
+        texts = [sentences] if isinstance(sentences, str) else sentences
+        time.sleep(self._call_overhead + self._per_text * len(texts))
+        vectors = [[0.1] * _DIMENSION for _ in texts]
+        return vectors[0] if isinstance(sentences, str) else vectors
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return _DIMENSION
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256]
+    )
+    parser.add_argument("--model", help="SentenceTransformer to time")
+    parser.add_argument(
+        "--call-overhead",
+        type=float,
+        default=0.004,
+        help="Simulated seconds per encoder call",
+    )
+    parser.add_argument(
+        "--per-text",
+        type=float,
+        default=0.0004,
+        help="Simulated seconds per encoded text",
+    )
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+
+        encoder = SentenceTransformer(args.model, device="cpu")
+    else:
+        encoder = _SimulatedEncoder(args.call_overhead, args.per_text)
+    documents = [
+        Document(
+            id=str(uuid.UUID(int=i)),
+            content=f"Question {i} about topic {i % 97} Answer {i * 7}",
+            source="",
+            metadata={},
+        )
+        for i in range(args.notes)
+    ]
+
+    print(f"{'batch size':>10} {'seconds':>8} {'notes/s':>8}")
+    for batch_size in args.batch_sizes:
+        client = _client(encoder)
+        repository = QdrantDocumentRepository(
+            encoder, client=client, batch_size=batch_size
+        )
+        start = time.perf_counter()
+        repository.store_batch(documents)
+        seconds = time.perf_counter() - start
+        print(f"{batch_size:>10} {seconds:>8.2f} {args.notes / seconds:>8.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = _client(encoder, tmp)
+        QdrantDocumentRepository(encoder, client=client).store_batch(documents)
+        client.close()
+        start = time.perf_counter()
+        client = QdrantClient(path=tmp)
+        opened = time.perf_counter() - start
+        QdrantDocumentRepository(encoder, client=client).store_batch(documents)
+        reloaded = time.perf_counter() - start
+        client.close()
+    print()
+    print(f"reopen on-disk index: {opened:.3f} s")
+    print(f"reopen + reload unchanged notes: {reloaded:.3f} s")
+
+
+def _client(encoder, path: str = ":memory:") -> QdrantClient:
+    client = (
+        QdrantClient(":memory:")
+        if path == ":memory:"
+        else QdrantClient(path=path)
+    )
+    client.create_collection(
+        collection_name="docs",
+        vectors_config=VectorParams(
+            size=encoder.get_sentence_embedding_dimension(),
+            distance=Distance.COSINE,
+        ),
+    )
+    return client
+
+
+if __name__ == "__main__":
+    main()
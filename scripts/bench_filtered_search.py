@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Measure deck-filtered search on the NumPy repository.
+
+Stores --notes synthetic notes spread over --decks decks, then runs
+--queries searches restricted to one deck three ways: filtered inside
+the search (SearchQuery.filter, scoring only the deck's rows),
+unfiltered for reference, and the post-filtering alternative: fetch
+4x max_results from the whole collection and drop the other decks.
+Reports the median latency and how many of the 10 requested results
+each way returned.
+
+Usage:
+    uv run python scripts/bench_filtered_search.py \
+        [--notes 50000] [--decks 50] [--dim 384] [--queries 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchFilter,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+
+_MAX_RESULTS = 10
+_OVERFETCH = 4
+
+
+class _RandomEncoder:
+    def __init__(self, dim: int) -> None:
+        self._dim = dim
+        self._rng = np.random.default_rng(0)
+
+    def encode(self, sentences, batch_size: int = 32):
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        return self._rng.normal(0, 1, (len(sentences), self._dim))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--decks", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    repo = NumpyDocumentRepository(_RandomEncoder(args.dim), 1024)
+    repo.store_batch(
+        [
+            Document(
+                id=str(uuid.UUID(int=i)),
+                content=f"note {i}",
+                source="",
+                metadata={"deck_name": f"deck {i % args.decks}"},
+            )
+            for i in range(args.notes)
+        ]
+    )
+
+    def post_filtered(deck: str) -> list:
+        results = repo.find_similar(
+            SearchQuery("query", _MAX_RESULTS * _OVERFETCH)
+        )
+        return [
+            r for r in results if r.document.metadata["deck_name"] == deck
+        ][:_MAX_RESULTS]
+
+    searches = {
+        "filtered": lambda deck: repo.find_similar(
+            SearchQuery("query", _MAX_RESULTS, SearchFilter(deck=deck))
+        ),
+        "unfiltered": lambda deck: repo.find_similar(
+            SearchQuery("query", _MAX_RESULTS)
+        ),
+        "post-filtered": post_filtered,
+    }
+    print(f"{'search':>14} {'p50 ms':>7} {'results':>8}")
+    for name, search in searches.items():
+        latencies, found = [], []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            results = search(f"deck {i % args.decks}")
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(len(results))
+        p50 = statistics.median(latencies)
+        print(f"{name:>14} {p50:>7.2f} {statistics.mean(found):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
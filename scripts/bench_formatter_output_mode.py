@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare formatter output size and latency for rewrite vs edits mode.
+
+For a few representative notes paired with the formatting a model
+would produce, builds the response each output mode returns (the whole
+note as AddonNoteChanges, or the span replacements as AddonNoteEdits)
+and reports its estimated tokens. Output tokens dominate LLM latency,
+so the simulated latency is --ms-per-token times the response tokens,
+plus one --overhead for the round trip. The rewrite is the edit script
+applied locally, so both modes yield the same formatted note.
+
+Usage:
+    uv run python scripts/bench_formatter_output_mode.py \
+        [--ms-per-token 20] [--overhead 0.2]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from addon.application.services.formatter_service import apply_note_edits
+from addon.application.services.span_masking import estimate_tokens
+from addon.domain.entities.note import AddonNote
+from addon.infrastructure.llm.schemas import AddonNoteEdits, NoteEdit
+
+_LONG_BACK = (
+    "Adam keeps an exponential moving average of the gradient (first "
+    "moment) and of the squared gradient (second moment), corrects both "
+    "for their bias towards zero in early steps, and scales each "
+    "parameter's step by the ratio of the two. beta_1 and beta_2 set the "
+    "decay of each average; epsilon avoids division by zero"
+)
+# (note as sent, edits the model returns)
+_CASES = {
+    "typo": (
+        AddonNote(front="What does Adam stand for", back="Adaptive moment"),
+        [
+            NoteEdit(field="front", find="for", replace="for?"),
+            NoteEdit(field="back", find="moment", replace="moment estimation"),
+        ],
+    ),
+    "context": (
+        AddonNote(front="What does beta_2 control?", back=_LONG_BACK),
+        [
+            NoteEdit(
+                field="front",
+                find="What does beta_2",
+                replace="In the Adam optimizer, what does `beta_2`",
+            ),
+            NoteEdit(field="back", find="by zero", replace="by zero."),
+        ],
+    ),
+    "clean": (
+        AddonNote(front="What is a tensor?", back=_LONG_BACK),
+        [],
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--ms-per-token",
+        type=float,
+        default=20.0,
+        help="Simulated decode time per output token, in milliseconds",
+    )
+    parser.add_argument(
+        "--overhead",
+        type=float,
+        default=0.2,
+        help="Simulated seconds per request besides decoding",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'note':>8} {'rewrite tok':>12} {'edits tok':>10} "
+        f"{'rewrite s':>10} {'edits s':>8}"
+    )
+    for name, (note, edits) in _CASES.items():
+        rewrite = apply_note_edits(note, edits)
+        rewrite_tokens = estimate_tokens(rewrite.model_dump_json())
+        edit_tokens = estimate_tokens(
+            AddonNoteEdits(edits=edits).model_dump_json()
+        )
+        print(
+            f"{name:>8} {rewrite_tokens:>12} {edit_tokens:>10} "
+            f"{_latency(rewrite_tokens, args):>10.2f} "
+            f"{_latency(edit_tokens, args):>8.2f}"
+        )
+
+
+def _latency(tokens: int, args: argparse.Namespace) -> float:
+    return args.overhead + tokens * args.ms_per_token / 1000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure hybrid search latency on 50k notes.
+
+Builds synthetic notes (Zipf-distributed words, like natural text),
+indexes them in a HybridDocumentRepository over the NumPy dense
+repository, and reports the median and 95th percentile latency of
+lexical (BM25) search alone, dense search alone and the fused hybrid
+search, against a 50 ms p95 target for interactive use (the curator
+tool and the duplicate check run while the user waits).
+
+The encoder is a bag of random word vectors, so dense latency covers
+the index but not a real model's forward pass (a few ms per query for
+a small sentence-transformer on CPU).
+
+Usage:
+    uv run python scripts/bench_hybrid_search.py \
+        [--notes 50000] [--dim 384] [--queries 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.bm25_index import BM25Index, tokenize
+from addon.infrastructure.persistence.hybrid_repository import (
+    HybridDocumentRepository,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+
+_TARGET_P95_MS = 50
+_VOCABULARY = 20_000
+_WORDS_PER_NOTE = 25
+
+
+class _BagOfWordsEncoder:
+    """Embeds a text as the sum of fixed random vectors of its words."""
+
+    def __init__(self, dim: int) -> None:
+        self._dim = dim
+        self._words: dict[str, np.ndarray] = {}
+        self._rng = np.random.default_rng(1)
+
+    def encode(self, sentences, batch_size: int = 32):
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        return np.stack([self._embed(text) for text in sentences])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self._dim, dtype=np.float32)
+        for word in tokenize(text):
+            if word not in self._words:
+                self._words[word] = self._rng.normal(0, 1, self._dim).astype(
+                    np.float32
+                )
+            vector += self._words[word]
+        return vector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    words = rng.zipf(1.3, (args.notes, _WORDS_PER_NOTE)) % _VOCABULARY
+    documents = [
+        Document(
+            id=str(uuid.UUID(int=i)),
+            content=" ".join(f"w{w}" for w in row),
+            source="",
+            metadata={},
+        )
+        for i, row in enumerate(words)
+    ]
+    queries = [
+        SearchQuery(" ".join(documents[i].content.split()[:8]), 10)
+        for i in rng.choice(args.notes, args.queries, replace=False)
+    ]
+
+    dense = NumpyDocumentRepository(_BagOfWordsEncoder(args.dim), 256)
+    lexical = BM25Index()
+    hybrid = HybridDocumentRepository(dense, lexical)
+    start = time.perf_counter()
+    hybrid.store_batch(documents)
+    print(f"index {args.notes} notes: {time.perf_counter() - start:.1f} s")
+
+    searches = {
+        "bm25": lambda q: lexical.search(q.text, 50),
+        "dense": lambda q: dense.find_similar(SearchQuery(q.text, 50)),
+        "hybrid": hybrid.find_similar,
+    }
+    print(f"{'search':>7} {'p50 ms':>7} {'p95 ms':>7} {'target':>7}")
+    for name, search in searches.items():
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        verdict = "ok" if p95 <= _TARGET_P95_MS else "missed"
+        print(f"{name:>7} {p50:>7.1f} {p95:>7.1f} {verdict:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Measure the MinHash/LSH near-verbatim duplicate pass on 50k notes.
+
+Builds synthetic notes (Zipf-distributed words) and plants copies of
+--copies of them: half re-wrapped in HTML (tags, entities, line
+breaks), half with one word changed. Reports the time of
+SimilarNoteFinder.find_verbatim_duplicate_groups(), which needs no
+embeddings, how many planted copies of each kind it grouped with their
+original (recall) and how many grouped notes were not planted copies
+(false positives).
+
+Usage:
+    uv run python scripts/bench_minhash.py \
+        [--notes 50000] [--copies 2000] [--threshold 0.8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from addon.application.use_cases.note_duplicate_finder import (
+    SimilarNoteFinder,
+)
+from addon.domain.entities.note import AddonCollection, AddonNote
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+
+_VOCABULARY = 20_000
+_WORDS_PER_NOTE = 25
+
+
+class _UnusedEncoder:
+    """The verbatim pass never embeds anything."""
+
+    def encode(self, sentences, batch_size: int = 32):
+        raise AssertionError("the verbatim pass computed an embedding")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--copies", type=int, default=2_000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    words = rng.zipf(1.3, (args.notes, _WORDS_PER_NOTE)) % _VOCABULARY
+    notes = [
+        AddonNote(
+            front=" ".join(f"w{w}" for w in row[:10]),
+            back=" ".join(f"w{w}" for w in row[10:]),
+        )
+        for row in words
+    ]
+    planted: dict[str, tuple[str, str]] = {}
+    for n, i in enumerate(rng.choice(args.notes, args.copies, replace=False)):
+        front, back = notes[i].front, notes[i].back
+        if n % 2:
+            kind = "html"
+            copy = AddonNote(
+                front=f"<div><b>{front}</b></div>",
+                back=back.replace(" ", "&nbsp;", 3) + "<br>",
+            )
+        else:
+            kind = "one word changed"
+            tokens = back.split()
+            tokens[len(tokens) // 2] = "changed"
+            copy = AddonNote(front=front, back=" ".join(tokens))
+        planted[copy.guid] = (notes[i].guid, kind)
+        notes.append(copy)
+    collection = AddonCollection(name="bench")
+    collection.add(notes=notes)
+    finder = SimilarNoteFinder(
+        collection, NumpyDocumentRepository(_UnusedEncoder())
+    )
+
+    start = time.perf_counter()
+    groups = finder.find_verbatim_duplicate_groups(args.threshold)
+    elapsed = time.perf_counter() - start
+
+    group_of = {
+        note.guid: g for g, group in enumerate(groups) for note in group.notes
+    }
+    found: dict[str, list[bool]] = {}
+    for copy, (original, kind) in planted.items():
+        found.setdefault(kind, []).append(
+            copy in group_of and group_of[copy] == group_of.get(original)
+        )
+    originals = {original for original, _ in planted.values()}
+    false_positives = sum(
+        guid not in planted and guid not in originals for guid in group_of
+    )
+    print(f"notes: {len(notes)}  time: {elapsed:.2f} s")
+    print(f"groups: {len(groups)}")
+    for kind, hits in found.items():
+        print(f"recall ({kind}): {sum(hits)}/{len(hits)}")
+    print(f"grouped notes that are not planted copies: {false_positives}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Compare NumpyDocumentRepository with the Qdrant adapter.
+
+Reports, for the same synthetic documents:
+- the import time of each adapter module in a fresh interpreter;
+- the time to build the index with store_batch() (embeddings are
+  precomputed, so only indexing is timed);
+- the median latency of one find_similar() call and the time per query
+  of a batch of queries (find_similar_batch() for NumPy, one call per
+  query for Qdrant, which has no batched query method on the port).
+
+Qdrant runs in local in-memory mode, the one the add-on can use without
+a server.
+
+Usage:
+    uv run python scripts/bench_numpy_repository.py \
+        [--notes 20000] [--dim 384] [--queries 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+from addon.infrastructure.persistence.qdrant_repository import (
+    QdrantDocumentRepository,
+)
+
+_IMPORTS = {
+    "numpy adapter": "addon.infrastructure.persistence.numpy_repository",
+    "qdrant_client": "qdrant_client",
+}
+
+
+class _LookupEncoder:
+    """Returns precomputed vectors for texts of the form 'doc <i>'."""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self._vectors = vectors
+
+    def encode(self, sentences, batch_size: int = 32):
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        return self._vectors[[int(s.split()[1]) for s in sentences]]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._vectors.shape[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'import':>14} {'ms':>7}")
+    for name, module in _IMPORTS.items():
+        print(f"{name:>14} {_import_ms(module):>7.0f}")
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(0, 1, (args.notes, args.dim)).astype(np.float32)
+    encoder = _LookupEncoder(vectors)
+    documents = [
+        Document(
+            id=str(uuid.UUID(int=i)),
+            content=f"doc {i}",
+            source="",
+            metadata={},
+        )
+        for i in range(args.notes)
+    ]
+    queries = [
+        SearchQuery(f"doc {i}", max_results=10)
+        for i in rng.choice(args.notes, args.queries, replace=False)
+    ]
+
+    repositories = {
+        "qdrant local": lambda: QdrantDocumentRepository(
+            encoder, batch_size=256
+        ),
+        "numpy float32": lambda: NumpyDocumentRepository(encoder, 256),
+        "numpy float16": lambda: NumpyDocumentRepository(
+            encoder, 256, dtype="float16"
+        ),
+    }
+    print()
+    print(f"{'index':>14} {'build s':>8} {'query ms':>9} {'batched ms':>11}")
+    for name, create in repositories.items():
+        start = time.perf_counter()
+        repository = create()
+        repository.store_batch(documents)
+        build = time.perf_counter() - start
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            repository.find_similar(query)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if isinstance(repository, NumpyDocumentRepository):
+            repository.find_similar_batch(queries)
+        else:
+            for query in queries:
+                repository.find_similar(query)
+        batched = (time.perf_counter() - start) / len(queries)
+
+        print(
+            f"{name:>14} {build:>8.2f} "
+            f"{statistics.median(latencies) * 1000:>9.2f} "
+            f"{batched * 1000:>11.2f}"
+        )
+
+
+def _import_ms(module: str) -> float:
+    """Milliseconds to import `module` in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Measure the cost of the cross-encoder rerank stage.
+
+Runs the duplicate check of --queries notes through
+RerankingDocumentRepository over the NumPy repository, with the
+cross-encoder scoring --candidates pairs per note, and reports the
+time per check at several batch sizes, then again with the pair cache
+warm (the same checks repeated, e.g. reopening the review session).
+
+By default the cross-encoder is simulated: each call costs a fixed
+overhead plus a smaller cost per pair, the shape of CPU inference. Pass
+--model to time a real cross-encoder through ONNX Runtime instead
+(needs sentence-transformers[onnx]).
+
+Usage:
+    uv run python scripts/bench_rerank.py \
+        [--notes 5000] [--queries 100] [--candidates 20] \
+        [--batch-sizes 1 8 32] [--model cross-encoder/stsb-TinyBERT-L4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+import zlib
+
+import numpy as np
+
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+from addon.infrastructure.persistence.reranking_repository import (
+    RerankingDocumentRepository,
+    create_cross_encoder,
+)
+
+
+class _RandomEncoder:
+    """Embeds each text as a random vector seeded by the text, so the
+    same query always finds the same candidates."""
+
+    def __init__(self, dim: int = 64) -> None:
+        self._dim = dim
+
+    def encode(self, sentences, batch_size: int = 32):
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        return np.stack(
+            [
+                np.random.default_rng(zlib.crc32(text.encode())).normal(
+                    0, 1, self._dim
+                )
+                for text in sentences
+            ]
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+
+class _SimulatedCrossEncoder:
+    def __init__(self, call_overhead: float, per_pair: float) -> None:
+        self._call_overhead = call_overhead
+        self._per_pair = per_pair
+
+    def predict(self, sentences, batch_size: int = 32):
+        calls = -(-len(sentences) // batch_size)
+        time.sleep(
+            calls * self._call_overhead + len(sentences) * self._per_pair
+        )
+        return [0.5] * len(sentences)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 8, 32]
+    )
+    parser.add_argument("--model", help="Real cross-encoder to time")
+    args = parser.parse_args()
+
+    base = NumpyDocumentRepository(_RandomEncoder())
+    base.store_batch(
+        [
+            Document(
+                id=str(uuid.UUID(int=i)),
+                content=f"What is fact number {i}? It is answer {i}.",
+                source="",
+                metadata={},
+            )
+            for i in range(args.notes)
+        ]
+    )
+    queries = [
+        SearchQuery(f"What is fact number {i}?", max_results=5)
+        for i in range(args.queries)
+    ]
+    model = (
+        create_cross_encoder(args.model)
+        if args.model
+        else _SimulatedCrossEncoder(call_overhead=0.004, per_pair=0.0008)
+    )
+
+    print(f"{'batch':>6} {'ms/check':>9} {'cached ms/check':>16}")
+    for batch_size in args.batch_sizes:
+        repository = RerankingDocumentRepository(
+            base, model, candidates=args.candidates, batch_size=batch_size
+        )
+        cold = _time_checks(repository, queries)
+        warm = _time_checks(repository, queries)
+        print(f"{batch_size:>6} {cold:>9.1f} {warm:>16.2f}")
+
+
+def _time_checks(
+    repository: RerankingDocumentRepository, queries: list[SearchQuery]
+) -> float:
+    """Mean milliseconds per duplicate check."""
+    start = time.perf_counter()
+    for query in queries:
+        repository.find_similar(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+if __name__ == "__main__":
+    main()
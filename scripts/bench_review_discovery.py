@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Time finding the notes marked for review in a real Anki collection.
+
+Builds a throwaway collection holding a deck of N cards (two per note,
+"Basic (and reversed card)") with every 20th card flagged orange, then
+finds the flagged notes twice: the way the counter and review editor
+used to (find the deck's notes, then find and load every card of every
+note to read its flag), and with find_notes_marked_for_review's single
+grouped query. Checks both against Anki's own `flag:2` search.
+
+Usage:
+    uv run python scripts/bench_review_discovery.py [--cards 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from anki.collection import AddNoteRequest, Collection
+
+from addon.application.use_cases.note_counter import (
+    find_notes_marked_for_review,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        col = Collection(str(Path(tmp) / "bench.anki2"))
+        try:
+            deck_id = _populate(col, args.cards)
+
+            start = time.perf_counter()
+            old = _per_card(col, deck_id)
+            old_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            review = find_notes_marked_for_review(col, deck_id)
+            new_seconds = time.perf_counter() - start
+
+            expected = sorted(col.find_notes(f"did:{deck_id} flag:2"))
+            assert old == review.flagged_note_ids == expected
+        finally:
+            col.close()
+
+    print(
+        f"{args.cards} cards, {review.total_notes} notes, "
+        f"{len(review.flagged_note_ids)} flagged"
+    )
+    print(f"{'per-card lookups':>18} {old_seconds:>8.3f} s")
+    print(f"{'single query':>18} {new_seconds:>8.3f} s")
+
+
+def _populate(col: Collection, cards: int) -> int:
+    deck_id = col.decks.id("Bench")
+    assert deck_id is not None
+    notetype = col.models.by_name("Basic (and reversed card)")
+    assert notetype is not None
+    requests = []
+    for i in range(cards // 2):
+        note = col.new_note(notetype)
+        note["Front"] = f"Question {i}"
+        note["Back"] = f"Answer {i}"
+        requests.append(AddNoteRequest(note, deck_id))
+    col.add_notes(requests)
+    card_ids = sorted(col.find_cards(f"did:{deck_id}"))
+    col.set_user_flag_for_cards(2, card_ids[::20])
+    return deck_id
+
+
+def _per_card(col: Collection, deck_id: int) -> list[int]:
+    flagged = []
+    for note_id in col.find_notes(f"did:{deck_id}"):
+        for card_id in col.find_cards(f"nid:{note_id}"):
+            if col.get_card(card_id).flags == 2:
+                flagged.append(note_id)
+                break
+    return sorted(flagged)
+
+
+if __name__ == "__main__":
+    main()
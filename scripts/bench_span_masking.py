@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Compare formatter prompt sizes with and without span masking.
+
+Renders the formatter prompt for a few representative note shapes
+(plain text, an inline base64 image, a long code block, MathJax) with
+protected spans sent verbatim and masked, and reports the estimated
+tokens of the note part of the prompt (the template itself is the same
+either way). The response echoes the spans too, so the model also
+generates roughly as many fewer tokens.
+
+Usage:
+    uv run python scripts/bench_span_masking.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+
+from addon.application.services.span_masking import SpanMask, estimate_tokens
+
+_CODE = (
+    "```python<br>"
+    + "<br>".join(f"def step_{i}(x):<br>    return x * {i}" for i in range(12))
+    + "<br>```"
+)
+_IMAGE = '<img src="data:image/png;base64,{}">'.format(
+    base64.b64encode(bytes(range(256)) * 12).decode()
+)
+_NOTES = {
+    "plain": ("What does beta_2 control in Adam?", "Second moment decay."),
+    "image": ("What does this plot show?", f"Loss curve {_IMAGE}"),
+    "code": ("How is the pipeline defined?", _CODE),
+    "math": (
+        "What is the softmax?",
+        "\\(\\sigma(z)_i = \\frac{e^{z_i}}{\\sum_j e^{z_j}}\\)",
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    print(f"{'note':>6} {'verbatim':>9} {'masked':>7} {'saved':>6}")
+    for name, (front, back) in _NOTES.items():
+        mask = SpanMask()
+        verbatim = estimate_tokens(f"Front: {front}\nBack: {back}\n")
+        masked = estimate_tokens(
+            f"Front: {mask.mask(front)}\nBack: {mask.mask(back)}\n"
+        )
+        saved = 1 - masked / verbatim
+        print(f"{name:>6} {verbatim:>9} {masked:>7} {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Recall, latency and memory of vector index settings on 50k notes.
+
+Builds a synthetic index shaped like note embeddings (unit vectors
+clustered around topics) and compares VectorIndexConfig settings.
+
+Always runs offline:
+- the estimated RAM of each setting (vectors, int8 copy, HNSW links);
+- recall@10 of int8 scalar quantization against exact search, with and
+  without rescoring the top candidates with the original vectors.
+
+With --url (a running Qdrant server, e.g. http://localhost:6333) it
+also provisions a collection per setting through
+QdrantDocumentRepository's config, loads the vectors and measures
+recall@10 and median query latency of the real HNSW index. Qdrant's
+local mode searches exhaustively, so HNSW is only measured on a server.
+
+Usage:
+    uv run python scripts/bench_vector_index.py \
+        [--notes 50000] [--dim 384] [--queries 200] [--url URL]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from addon.infrastructure.persistence.qdrant_repository import (
+    QdrantDocumentRepository,
+    VectorIndexConfig,
+)
+
+_K = 10
+_CONFIGS = {
+    "m=8": VectorIndexConfig(hnsw_m=8),
+    "m=16 (default)": VectorIndexConfig(),
+    "m=32": VectorIndexConfig(hnsw_m=32, hnsw_ef_construct=200),
+    "m=16 on_disk": VectorIndexConfig(on_disk=True),
+    "m=16 int8": VectorIndexConfig(quantize=True),
+    "m=16 on_disk int8": VectorIndexConfig(on_disk=True, quantize=True),
+}
+
+
+class _FixedEncoder:
+    """Only sizes the collection; vectors are uploaded precomputed."""
+
+    def __init__(self, dim: int) -> None:
+        self._dim = dim
+
+    def encode(self, sentences, batch_size: int = 32):
+        raise NotImplementedError
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", help="Qdrant server to measure HNSW on")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _synthetic(rng, args.notes, args.dim)
+    queries = _normalize(
+        vectors[rng.choice(args.notes, args.queries, replace=False)]
+        + rng.normal(0, 0.05, (args.queries, args.dim)).astype(np.float32)
+    )
+    exact = _top_k(vectors @ queries.T)
+
+    print(f"{'setting':>18} {'est. RAM MB':>12}")
+    for name, config in _CONFIGS.items():
+        print(f"{name:>18} {_ram_mb(config, args.notes, args.dim):>12.1f}")
+
+    quantized = _int8(vectors)
+    approx_scores = quantized @ queries.T
+    int8_only = _top_k(approx_scores)
+    candidates = _top_k(approx_scores, k=4 * _K)
+    rescored = np.array(
+        [
+            candidates[i][np.argsort(-(vectors[candidates[i]] @ q))[:_K]]
+            for i, q in enumerate(queries)
+        ]
+    )
+    print()
+    print(f"int8 recall@{_K}: {_recall(int8_only, exact):.3f}")
+    print(f"int8 + rescore top {4 * _K}: {_recall(rescored, exact):.3f}")
+
+    if args.url:
+        print()
+        print(f"{'setting':>18} {'recall@10':>10} {'p50 ms':>7}")
+        for name, config in _CONFIGS.items():
+            recall, latency = _measure_server(
+                args.url, config, vectors, queries, exact
+            )
+            print(f"{name:>18} {recall:>10.3f} {latency * 1000:>7.2f}")
+
+
+def _synthetic(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    topics = rng.normal(size=(max(1, n // 100), dim)).astype(np.float32)
+    assignment = rng.integers(0, len(topics), n)
+    noise = rng.normal(0, 0.6, (n, dim)).astype(np.float32)
+    return _normalize(topics[assignment] + noise)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _top_k(scores: np.ndarray, k: int = _K) -> np.ndarray:
+    """Indices of the k best rows for each query (column), best first."""
+    best = np.argpartition(-scores, k, axis=0)[:k].T
+    order = np.take_along_axis(-scores.T, best, axis=1).argsort(axis=1)
+    return np.take_along_axis(best, order, axis=1)
+
+
+def _int8(vectors: np.ndarray) -> np.ndarray:
+    """Scalar quantization as Qdrant does it: clip to the 0.99 quantile
+    range, map linearly to 256 levels; returned dequantized."""
+    low, high = np.quantile(vectors, [0.005, 0.995])
+    scale = (high - low) / 255
+    codes = np.round((np.clip(vectors, low, high) - low) / scale)
+    return (codes * scale + low).astype(np.float32)
+
+
+def _recall(found: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(e)) for f, e in zip(found, exact))
+    return hits / exact.size
+
+
+def _ram_mb(config: VectorIndexConfig, n: int, dim: int) -> float:
+    vectors = 0 if config.on_disk else n * dim * 4
+    quantized = n * dim if config.quantize else 0
+    links = n * config.hnsw_m * 2 * 4
+    return (vectors + quantized + links) / 1e6
+
+
+def _measure_server(
+    url: str,
+    config: VectorIndexConfig,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    exact: np.ndarray,
+) -> tuple[float, float]:
+    from qdrant_client import QdrantClient
+
+    client = QdrantClient(url=url)
+    name = f"bench_{uuid.uuid4().hex[:8]}"
+    repository = QdrantDocumentRepository(
+        _FixedEncoder(vectors.shape[1]),
+        client=client,  # type: ignore[arg-type]
+        collection_name=name,
+        index_config=config,
+    )
+    repository._ensure_collection()
+    try:
+        client.upload_collection(
+            collection_name=name,
+            vectors=vectors,
+            ids=range(len(vectors)),
+            batch_size=1_000,
+            wait=True,
+        )
+        while client.get_collection(name).status != "green":
+            time.sleep(0.5)
+        found, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            points = client.query_points(
+                collection_name=name, query=query.tolist(), limit=_K
+            ).points
+            latencies.append(time.perf_counter() - start)
+            found.append([point.id for point in points])
+        return _recall(np.array(found), exact), statistics.median(latencies)
+    finally:
+        client.delete_collection(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,14 @@ def setup_addon() -> None:
 
     from .application.use_cases.note_counter import (
         display_notes_marked_for_review_count,
+        display_review_counts_for_all_decks,
+        register_review_count_hooks,
     )
     from .application.use_cases.note_curator import add_curator_button
     from .application.use_cases.note_formatter import (
         add_custom_button,
         open_review_editor,
+        register_editor_batch_hooks,
     )
 
     # Add option in "Tools" to count notes that require formatting changes
@@ -20,6 +23,13 @@ def setup_addon() -> None:
     qconnect(action.triggered, display_notes_marked_for_review_count)
     mw.form.menuTools.addAction(action)
 
+    action = QAction("Count notes marked for review (all decks)", mw)
+    qconnect(action.triggered, display_review_counts_for_all_decks)
+    mw.form.menuTools.addAction(action)
+
+    # Counts are cached; drop them when cards or decks change
+    register_review_count_hooks()
+
     # Add option in "Tools" to format notes using AI
     action = QAction("Improve note using AI", mw)
     action.setShortcut(QKeySequence("r"))
@@ -28,6 +38,7 @@ def setup_addon() -> None:
 
     # Add button in Browser view to format notes using AI
     gui_hooks.editor_did_init_buttons.append(add_custom_button)
+    register_editor_batch_hooks()
 
     # Add button in the editor to curate the note's cluster using AI
     gui_hooks.editor_did_init_buttons.append(add_curator_button)
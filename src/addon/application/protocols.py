@@ -15,3 +15,16 @@ class CompletionProvider(Protocol):
     """
 
     def run(self, prompt: str | list[dict], **kwargs) -> str: ...
+
+
+class FormatterCache(Protocol):
+    """Port for remembering formatter results between calls.
+
+    Keys are opaque strings built by the formatter (they already encode
+    everything that affects the result); values are the LLM's
+    structured response as JSON text.
+    """
+
+    def get(self, key: str) -> str | None: ...
+
+    def put(self, key: str, value: str) -> None: ...
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from ...domain.entities.note import AddonNote, NoteId
+from .formatter_service import NoteFormatter
+
+
+@dataclass(frozen=True)
+class FormattingSuggestion:
+    """The formatter's output for one note, waiting for user review.
+
+    Attributes:
+        note_id: The note the suggestion is for.
+        original: The note as it was sent to the formatter; None if it
+            could not be loaded (see BatchFormatter.submit_ids).
+        formatted: The formatted note; None if formatting failed.
+        error: Why formatting failed; empty on success.
+    """
+
+    note_id: NoteId
+    original: Optional[AddonNote]
+    formatted: Optional[AddonNote]
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class BatchFormattingStats:
+    """Progress of a batch formatting job.
+
+    Attributes:
+        total: Notes submitted to the job.
+        completed: Notes the formatter has finished (including failures).
+        failed: Notes the formatter raised on.
+        cancelled: Notes withdrawn before their suggestion was used.
+        cache_hit_rate: Share of formatter calls answered from its cache.
+        tokens_saved: Estimated LLM tokens avoided by span masking.
+        queue_depth: Finished suggestions not yet taken for review.
+        elapsed_seconds: Time since the job started.
+    """
+
+    total: int
+    completed: int
+    failed: int
+    queue_depth: int
+    elapsed_seconds: float
+    cancelled: int = 0
+    cache_hit_rate: float = 0.0
+    tokens_saved: int = 0
+
+    @property
+    def notes_per_minute(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.completed / self.elapsed_seconds * 60
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.completed}/{self.total} formatted, "
+            f"{self.notes_per_minute:.1f} notes/min, "
+            f"{self.queue_depth} ready"
+        )
+        if self.failed:
+            text += f", {self.failed} failed"
+        if self.cancelled:
+            text += f", {self.cancelled} cancelled"
+        if self.cache_hit_rate:
+            text += f", {self.cache_hit_rate:.0%} from cache"
+        if self.tokens_saved:
+            text += f", ~{self.tokens_saved} tokens saved"
+        return text
+
+
+class BatchFormatter:
+    """Formats many notes ahead of review, a bounded number at a time.
+
+    Reviewing flagged notes one by one means waiting on one LLM call per
+    note. The batch formatter runs submitted notes on a pool of
+    `max_workers` threads (the calls are network-bound, so threads
+    overlap them well) and keeps finished suggestions in an in-memory
+    queue keyed by note id, so the review dialog can page through ready
+    suggestions without waiting. Failures are queued too, as
+    suggestions with an error, so one bad response never stalls the
+    batch.
+
+    Notes can be submitted all at once or a look-ahead window at a
+    time, and withdrawn with cancel() when the user moves past them.
+    submit_ids() queues notes by id only, for jobs too large to load
+    every note up front (a whole deck).
+
+    Thread-safe: worker threads fill the queue while the UI thread
+    takes from it.
+    """
+
+    def __init__(
+        self,
+        formatter: NoteFormatter,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._formatter = formatter
+        self._max_workers = max_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._ready: dict[NoteId, FormattingSuggestion] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Submitted notes not cancelled since, in submission order.
+        self._futures: dict[NoteId, Future] = {}
+        # Number of each note's latest submission, so a call still in
+        # flight from before a cancel and resubmit cannot store its
+        # (possibly stale) result under the new submission.
+        self._generations: dict[NoteId, int] = {}
+        self._submitted = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._failed = 0
+        self._started_at: Optional[float] = None
+
+    def submit(self, notes: dict[NoteId, AddonNote]) -> None:
+        """Queue the notes for formatting, in the order given, and
+        return immediately. Notes already submitted are not sent again,
+        so a sliding look-ahead window can be resubmitted freely."""
+        self._submit(
+            {
+                note_id: (lambda note=note: note)
+                for note_id, note in notes.items()
+            }
+        )
+
+    def submit_ids(
+        self,
+        note_ids: list[NoteId],
+        load: Callable[[NoteId], AddonNote],
+    ) -> None:
+        """Like submit(), but each note is loaded with `load` on the
+        worker thread right before it is formatted, so only the notes
+        in flight are held in memory. A note that fails to load is
+        queued as a failed suggestion."""
+        self._submit(
+            {
+                note_id: (lambda note_id=note_id: load(note_id))
+                for note_id in note_ids
+            }
+        )
+
+    def _submit(self, notes: dict[NoteId, Callable[[], AddonNote]]) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="addon-formatter",
+            )
+            self._started_at = self._clock()
+        with self._lock:
+            new = {
+                note_id: note
+                for note_id, note in notes.items()
+                if note_id not in self._futures
+            }
+            for note_id, load in new.items():
+                self._submitted += 1
+                self._generations[note_id] = self._submitted
+                self._futures[note_id] = self._executor.submit(
+                    self._format_one, note_id, load, self._submitted
+                )
+
+    def cancel(self, note_ids: list[NoteId]) -> None:
+        """Withdraw notes the user no longer needs suggestions for.
+        Notes still waiting for a worker are never sent; a call already
+        in flight runs to completion but its result is discarded."""
+        with self._lock:
+            for note_id in note_ids:
+                future = self._futures.pop(note_id, None)
+                if future is None:
+                    continue
+                unused = self._ready.pop(note_id, None) is not None
+                if future.cancel() or unused or not future.done():
+                    self._cancelled += 1
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted note is done (or `timeout`
+        seconds pass); return whether the job finished."""
+        with self._lock:
+            futures = list(self._futures.values())
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def wait_for(
+        self,
+        note_id: NoteId,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 0.1,
+    ) -> Optional[FormattingSuggestion]:
+        """Block until the note's suggestion is ready and take it.
+
+        Checks `is_cancelled` every `poll_interval` seconds; once it
+        returns True the note is cancelled and None is returned. None is
+        also returned if the note was not submitted (or was cancelled,
+        taken, or dropped by shutdown() meanwhile). Afterwards
+        submitting the note formats it afresh.
+        """
+        while True:
+            with self._lock:
+                future = self._futures.get(note_id)
+                suggestion = self._ready.pop(note_id, None)
+                if suggestion is not None:
+                    del self._futures[note_id]
+                    return suggestion
+            if future is None or future.cancelled():
+                return None
+            if is_cancelled is not None and is_cancelled():
+                self.cancel([note_id])
+                return None
+            wait([future], timeout=poll_interval)
+
+    def take(self, note_id: NoteId) -> Optional[FormattingSuggestion]:
+        """Remove and return the note's suggestion, or None if it is not
+        ready yet (or was already taken)."""
+        with self._lock:
+            return self._ready.pop(note_id, None)
+
+    def stats(self) -> BatchFormattingStats:
+        with self._lock:
+            elapsed = (
+                self._clock() - self._started_at
+                if self._started_at is not None
+                else 0.0
+            )
+            return BatchFormattingStats(
+                total=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                queue_depth=len(self._ready),
+                elapsed_seconds=elapsed,
+                cancelled=self._cancelled,
+                cache_hit_rate=self._formatter.cache_hit_rate,
+                tokens_saved=self._formatter.tokens_saved,
+            )
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Drop notes not yet sent to the formatter. Calls already in
+        flight finish in the background unless `wait` is True."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _format_one(
+        self, note_id: NoteId, load: Callable[[], AddonNote], generation: int
+    ) -> None:
+        # Queued from inside the task (not a done-callback) so that
+        # wait() returning guarantees the suggestion is in the queue.
+        note = None
+        try:
+            note = load()
+            suggestion = FormattingSuggestion(
+                note_id, note, self._formatter.format(note)
+            )
+        except Exception as e:
+            suggestion = FormattingSuggestion(note_id, note, None, str(e))
+        with self._lock:
+            if (
+                note_id not in self._futures
+                or self._generations[note_id] != generation
+            ):
+                return  # cancelled (and maybe resubmitted) while in flight
+            self._ready[note_id] = suggestion
+            self._completed += 1
+            if suggestion.formatted is None:
+                self._failed += 1
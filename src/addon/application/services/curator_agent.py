@@ -11,6 +11,7 @@ from ...domain.entities.proposals import ProposedChangeSet
 from ...infrastructure.llm.schemas import (
     AgentAction,
     AgentStep,
+    FindSimilarNotesAction,
     FinishAction,
     ProposeCreateAction,
     ProposeDeleteAction,
@@ -124,6 +125,8 @@ class CuratorAgent:
         tools = self._tools
         if isinstance(action, SearchNotesAction):
             return tools.search_notes(action.query, action.limit)
+        if isinstance(action, FindSimilarNotesAction):
+            return tools.find_similar_notes(action.text, action.limit)
         if isinstance(action, ReadNoteAction):
             return tools.read_note(NoteId(action.note_id))
         if isinstance(action, ProposeEditAction):
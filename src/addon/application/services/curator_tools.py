@@ -1,8 +1,6 @@
 from __future__ import annotations
 
 import dataclasses
-import html
-import re
 
 from ...domain.entities.note import AddonNote, AddonNoteType, NoteId
 from ...domain.entities.proposals import (
@@ -12,13 +10,17 @@ from ...domain.entities.proposals import (
     EditProposal,
     ProposedChangeSet,
 )
+from ...domain.repositories.document_repository import (
+    DocumentRepository,
+    SearchQuery,
+    convert_result_to_addon_note,
+)
 from ...domain.repositories.note_repository import (
     InvalidSearchQueryError,
     NoteNotFoundError,
     NoteRepository,
 )
-
-_TAG_RE = re.compile(r"<[^>]+>")
+from .plain_text import plain_text
 
 
 class CuratorTools:
@@ -40,10 +42,12 @@ class CuratorTools:
         repository: NoteRepository,
         change_set: ProposedChangeSet | None = None,
         snippet_length: int = 120,
+        documents: DocumentRepository | None = None,
     ) -> None:
         self._repository = repository
         self.change_set = change_set or ProposedChangeSet()
         self._snippet_length = snippet_length
+        self._documents = documents
 
     def search_notes(self, query: str, limit: int = 10) -> str:
         """Search the collection; return one line per hit with the note
@@ -60,6 +64,26 @@ class CuratorTools:
             lines.append(f"{note_id}: {self._snippet(note.front)}")
         return "\n".join(lines)
 
+    def find_similar_notes(self, text: str, limit: int = 10) -> str:
+        """Search the document index (e.g. hybrid lexical + dense) for
+        notes similar to free text, paraphrases included; same output
+        format as search_notes."""
+        if self._documents is None:
+            return "error: similarity search is not available"
+        results = self._documents.find_similar(SearchQuery(text, limit))
+        notes = [convert_result_to_addon_note(result) for result in results]
+        # Documents are keyed by guid; notes deleted since indexing are
+        # left out.
+        ids = self._repository.find_ids_by_guid([note.guid for note in notes])
+        lines = [
+            f"{ids[note.guid]}: {self._snippet(note.front)}"
+            for note in notes
+            if note.guid in ids
+        ]
+        if not lines:
+            return f"No notes found similar to: {text!r}"
+        return "\n".join(lines)
+
     def read_note(self, note_id: NoteId) -> str:
         """Return the full content of a note (fields are raw HTML, as
         stored)."""
@@ -96,7 +120,7 @@ class CuratorTools:
         string clears a field.
         """
         try:
-            before = self._repository.get(note_id)
+            before, before_mod = self._snapshot(note_id)
         except NoteNotFoundError:
             return self._not_found(note_id)
         merged_extra = {**before.extra_fields, **(extra_fields or {})}
@@ -109,7 +133,7 @@ class CuratorTools:
         )
         try:
             self.change_set.add_edit(
-                EditProposal(note_id, before, after, rationale)
+                EditProposal(note_id, before, after, rationale, before_mod)
             )
         except ConflictingProposalError as e:
             return f"error: {e}"
@@ -149,12 +173,12 @@ class CuratorTools:
     def propose_delete(self, note_id: NoteId, rationale: str) -> str:
         """Record a proposal to delete a note and its cards."""
         try:
-            before = self._repository.get(note_id)
+            before, before_mod = self._snapshot(note_id)
         except NoteNotFoundError:
             return self._not_found(note_id)
         try:
             self.change_set.add_delete(
-                DeleteProposal(note_id, before, rationale)
+                DeleteProposal(note_id, before, rationale, before_mod)
             )
         except ConflictingProposalError as e:
             return f"error: {e}"
@@ -178,7 +202,7 @@ class CuratorTools:
         to [] and "notetype" to the original note's type.
         """
         try:
-            before = self._repository.get(note_id)
+            before, before_mod = self._snapshot(note_id)
         except NoteNotFoundError:
             return self._not_found(note_id)
         if not new_notes:
@@ -217,7 +241,7 @@ class CuratorTools:
         )
         try:
             self.change_set.add_edit(
-                EditProposal(note_id, before, after, rationale)
+                EditProposal(note_id, before, after, rationale, before_mod)
             )
         except ConflictingProposalError as e:
             return f"error: {e}"
@@ -228,9 +252,19 @@ class CuratorTools:
             f"original edited down, {len(creates)} new note(s) proposed."
         )
 
+    def _snapshot(self, note_id: NoteId) -> tuple[AddonNote, int | None]:
+        """The note and its modification time, for a proposal's `before`
+        and `before_mod`. The time is read first, so an edit made in
+        between makes the proposal stale rather than silently lost.
+
+        Raises:
+            NoteNotFoundError: If no note exists with the given id.
+        """
+        before_mod = self._repository.get_mods([note_id]).get(note_id)
+        return self._repository.get(note_id), before_mod
+
     def _snippet(self, text: str) -> str:
-        plain = _TAG_RE.sub("", html.unescape(text))
-        plain = " ".join(plain.split())
+        plain = plain_text(text)
         if len(plain) > self._snippet_length:
             return plain[: self._snippet_length] + "…"
         return plain
@@ -1,20 +1,49 @@
 from __future__ import annotations
 
+import hashlib
 import html
 import re
+import threading
 from copy import deepcopy
+from enum import Enum
 from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, TypeVar
 
 from ...domain.entities.note import AddonNote, AddonNoteType
-from ...infrastructure.llm.schemas import AddonNoteChanges
+from ...infrastructure.llm.schemas import (
+    AddonNoteChanges,
+    AddonNoteEdits,
+    NoteEdit,
+)
 from ...utils import is_cloze_note
-from ..protocols import CompletionProvider
+from ..protocols import CompletionProvider, FormatterCache
+from .span_masking import SpanMask
 
 if TYPE_CHECKING:
     from anki.notes import Note
     from jinja2 import Template
+    from pydantic import BaseModel
+
+_Response = TypeVar("_Response", bound="BaseModel")
+
+
+class FormatterOutputMode(str, Enum):
+    """How the LLM returns its formatting.
+
+    Attributes:
+        REWRITE: The full new front and back (AddonNoteChanges).
+        EDITS: Targeted replacements applied locally (AddonNoteEdits);
+            far fewer output tokens when the fix is small, with a
+            fallback to REWRITE when the edits do not apply.
+    """
+
+    REWRITE = "rewrite"
+    EDITS = "edits"
+
+
+class InvalidEditError(ValueError):
+    """Raised when an edit script does not apply cleanly to the note."""
 
 
 class AnkiNoteMapper:
@@ -110,12 +139,48 @@ class NoteFormatter:
     of LLM responses and maintains consistency in note formatting across the
     entire collection.
 
+    Images, media, MathJax and long code blocks are masked with short
+    placeholders before prompting and restored afterwards (see
+    span_masking), which shrinks the prompt and the response and
+    guarantees those spans survive unchanged. If the model loses a
+    placeholder, the note is formatted again without masking.
+
+    With a cache, a note whose content was already formatted under the
+    same prompt template and model is answered from the cache instead
+    of the LLM (e.g. after a cancelled review or a repeated click).
+
     Attributes:
         _client: Completion provider for generating formatted note content.
+        _cache: Optional store of earlier LLM responses.
+        _model_name: Part of the cache key, so switching models does not
+            serve another model's results.
+        _output_mode: Whether the LLM rewrites the note or returns edits.
     """
 
-    def __init__(self, client: CompletionProvider) -> None:
+    def __init__(
+        self,
+        client: CompletionProvider,
+        cache: FormatterCache | None = None,
+        model_name: str = "",
+        output_mode: FormatterOutputMode = FormatterOutputMode.REWRITE,
+    ) -> None:
         self._client = client
+        self._cache = cache
+        self._model_name = model_name
+        self._output_mode = output_mode
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Estimated prompt + response tokens avoided by span masking.
+        self.tokens_saved = 0
+        # Edit scripts that did not apply and fell back to a rewrite.
+        self.edit_fallbacks = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of format() calls answered from the cache."""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
 
     def format(self, note: AddonNote) -> AddonNote:
         """Apply AI-powered formatting to improve note quality.
@@ -128,33 +193,116 @@ class NoteFormatter:
         # object as a side effect.
         new_note = deepcopy(note)
 
+        # Mask before any conversion, so spans are restored exactly as
+        # they appear in the original fields.
+        mask = SpanMask()
+        new_note.front = mask.mask(new_note.front)
+        new_note.back = mask.mask(new_note.back)
         new_note = self._convert_br_tag_to_newline(new_note)
 
-        note_content = (
-            f"Front: {new_note.front}\n"
-            f"Back: {new_note.back}\n"
-            f"Tags: {note.tags}\n"
-        )
-        prompt_template = get_prompt_template()
-        prompt = prompt_template.render(note=note_content)
+        suggested_changes = self._suggest_changes(new_note, note.tags)
+        if mask.spans and not mask.is_preserved_in(
+            suggested_changes.front, suggested_changes.back
+        ):
+            # The model dropped or duplicated a placeholder: ask again
+            # with the spans in full.
+            mask = SpanMask()
+            unmasked = self._convert_br_tag_to_newline(deepcopy(note))
+            suggested_changes = self._request(
+                self._note_content(unmasked, note.tags), AddonNoteChanges
+            )
+        with self._lock:
+            # Each masked span is missing from both prompt and response.
+            self.tokens_saved += 2 * mask.tokens_saved
+
+        new_note.front = suggested_changes.front
+        new_note.back = suggested_changes.back
+
+        # After unmasking, so masked images lose their alt text too.
+        new_note.front = mask.unmask(new_note.front)
+        new_note.back = mask.unmask(new_note.back)
+        return self._remove_alt_tags(new_note)
 
-        response = self._client.run(
+    @staticmethod
+    def _note_content(note: AddonNote, tags: Optional[list[str]]) -> str:
+        return f"Front: {note.front}\nBack: {note.back}\nTags: {tags}\n"
+
+    def _suggest_changes(
+        self, note: AddonNote, tags: Optional[list[str]]
+    ) -> AddonNoteChanges:
+        note_content = self._note_content(note, tags)
+        if self._output_mode == FormatterOutputMode.EDITS:
+            edits = self._request(note_content, AddonNoteEdits)
+            try:
+                return apply_note_edits(note, edits.edits)
+            except InvalidEditError:
+                with self._lock:
+                    self.edit_fallbacks += 1
+        return self._request(note_content, AddonNoteChanges)
+
+    def _request(
+        self, note_content: str, schema: type[_Response]
+    ) -> _Response:
+        """Ask the LLM for `schema`-shaped output, via the cache."""
+        if self._cache is None:
+            return schema.model_validate_json(
+                self._complete(note_content, schema)
+            )
+        key = self._cache_key(note_content, schema)
+        cached = self._cache.get(key)
+        with self._lock:
+            if cached is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+        if cached is not None:
+            return schema.model_validate_json(cached)
+        response = self._complete(note_content, schema)
+        # Validate before storing: only well-formed responses are worth
+        # replaying.
+        parsed = schema.model_validate_json(response)
+        self._cache.put(key, response)
+        return parsed
+
+    def _cache_key(self, note_content: str, schema: type[BaseModel]) -> str:
+        # note_content is already normalized (HTML unescaped, <br> as
+        # newlines) and is exactly what the prompt embeds, so equal
+        # content means an equal prompt under the same template.
+        digest = hashlib.sha256()
+        parts = (
+            get_prompt_version(),
+            self._model_name,
+            schema.__name__,
+            note_content,
+        )
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _complete(self, note_content: str, schema: type[BaseModel]) -> str:
+        output_instructions = (
+            _read_prompt("prompt_format_note_edits.md")
+            if schema is AddonNoteEdits
+            else ""
+        )
+        prompt = get_prompt_template().render(
+            note=note_content, output_instructions=output_instructions
+        )
+        return self._client.run(
             prompt=[{"role": "user", "content": prompt}],
             response_format={
                 "type": "json_schema",
                 "json_schema": {
-                    "name": "addon_note_changes",
-                    "schema": AddonNoteChanges.model_json_schema(),
+                    "name": (
+                        "addon_note_edits"
+                        if schema is AddonNoteEdits
+                        else "addon_note_changes"
+                    ),
+                    "schema": schema.model_json_schema(),
                 },
             },
         )
-        suggested_changes = AddonNoteChanges.model_validate_json(response)
-
-        new_note.front = suggested_changes.front
-        new_note.back = suggested_changes.back
-
-        new_note = self._remove_alt_tags(new_note)
-        return new_note
 
     def _convert_br_tag_to_newline(self, note: AddonNote) -> AddonNote:
         note.front = html.unescape(note.front).replace("<br>", "\n")
@@ -167,17 +315,57 @@ class NoteFormatter:
         return note
 
 
+def apply_note_edits(
+    note: AddonNote, edits: list[NoteEdit]
+) -> AddonNoteChanges:
+    """Apply an edit script to the note's front and back.
+
+    `note` holds the fields as the model saw them (newlines, not
+    <br>); the result uses <br> like a full rewrite would.
+
+    Raises:
+        InvalidEditError: If an edit's `find` text is empty or does not
+            occur exactly once in its field (after the edits before it).
+    """
+    fields = {"front": note.front, "back": note.back}
+    for edit in edits:
+        text = fields[edit.field]
+        count = text.count(edit.find) if edit.find else 0
+        if count != 1:
+            raise InvalidEditError(
+                f"{edit.find!r} occurs {count} times in {edit.field}"
+            )
+        fields[edit.field] = text.replace(edit.find, edit.replace)
+    return AddonNoteChanges(
+        front=fields["front"].replace("\n", "<br>"),
+        back=fields["back"].replace("\n", "<br>"),
+    )
+
+
 @lru_cache(maxsize=1)
 def get_prompt_template() -> Template:
     from jinja2 import Template
 
-    path = Path(__file__).parent
-    fpath = path / "prompt_format_note.md"
+    return Template(_read_prompt("prompt_format_note.md"))
+
+
+@lru_cache(maxsize=1)
+def get_prompt_version() -> str:
+    """Short hash of the prompt templates' text: editing a prompt
+    changes the version, which invalidates cached results."""
+    source = _read_prompt("prompt_format_note.md") + _read_prompt(
+        "prompt_format_note_edits.md"
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _read_prompt(name: str) -> str:
+    fpath = Path(__file__).parent / name
     try:
-        prompt_template_str = fpath.read_text()
+        return fpath.read_text()
     except FileNotFoundError:
         raise RuntimeError(f"Prompt template not found: {fpath}")
-    return Template(prompt_template_str)
 
 
 def add_html_tags(s: str) -> str:
@@ -0,0 +1,180 @@
+"""Find near-verbatim copies of notes with MinHash and LSH banding.
+
+Many duplicates are the same note imported twice, or copies that differ
+only in their HTML. Those do not need embeddings to be found: the
+character shingles (overlapping k-character substrings) of their plain
+text are almost the same set, and MinHash estimates the Jaccard
+similarity of two shingle sets from short fixed-size signatures.
+
+LSH banding avoids comparing every pair of signatures. Each signature
+is cut into bands of consecutive values; notes whose values agree on a
+whole band land in the same bucket and become candidate pairs, which
+are then checked against the full signatures. With b bands of r rows,
+a pair of similarity s becomes a candidate with probability
+1 - (1 - s**r)**b: near-certain above (1/b)**(1/r) (~0.71 with the
+defaults) and unlikely well below it.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .plain_text import plain_text
+
+# Multiplier of the rolling polynomial hash of a shingle's characters.
+_BASE = np.uint64(0x100000001B3)
+_SHIFT = np.uint64(32)
+# Shingles hashed per NumPy step: bounds the (num_perm, chunk) uint64
+# matrix to ~64 MB with the default 128 permutations.
+_CHUNK = 1 << 16
+
+
+def normalize(text: str) -> str:
+    """Plain text of a field as compared for near-verbatim copies:
+    tags stripped as in the curator snippets, then lowercased."""
+    return plain_text(text).lower()
+
+
+class MinHashIndex:
+    """MinHash signatures of texts, queried with LSH banding.
+
+    Signatures are kept as one (texts, num_perm) uint32 array, 512
+    bytes per text with the default 128 permutations. Texts without any
+    shingle (empty once tags are stripped) are not indexed.
+
+    Attributes:
+        num_perm: Hash functions per signature; more make the similarity
+            estimate more precise (standard error ~1 / sqrt(num_perm)).
+        bands: LSH bands; must divide num_perm. More bands find pairs of
+            lower similarity, at the cost of more candidates to check.
+        shingle_size: Characters per shingle.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers, as multiply-shift hashing requires.
+        self._a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+        self._a = self._a * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+        self._keys: list[str] = []
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+
+    def add(self, keys: list[str], texts: list[str]) -> None:
+        """Index `texts` under `keys` (one per text)."""
+        codes = [
+            np.frombuffer(normalize(text).encode("utf-32-le"), np.uint32)
+            for text in texts
+        ]
+        kept = [i for i, c in enumerate(codes) if len(c)]
+        self._keys.extend(keys[i] for i in kept)
+        self._signatures = np.concatenate(
+            [self._signatures, self._signatures_of([codes[i] for i in kept])]
+        )
+
+    def similar_pairs(self, threshold: float) -> list[tuple[str, str, float]]:
+        """Pairs of indexed keys whose estimated Jaccard similarity is
+        at least `threshold`, with that estimate, each pair once.
+
+        Only pairs sharing an LSH bucket are checked, so pairs below
+        the banding threshold may be missed.
+        """
+        rows = self.num_perm // self.bands
+        found: dict[tuple[int, int], float] = {}
+        for start in range(0, self.num_perm, rows):
+            for bucket in self._buckets(start, start + rows):
+                members = self._signatures[bucket]
+                for i in range(len(bucket) - 1):
+                    similarities = np.mean(
+                        members[i + 1 :] == members[i], axis=1
+                    )
+                    for j in np.flatnonzero(similarities >= threshold):
+                        found[(bucket[i], bucket[i + 1 + j])] = float(
+                            similarities[j]
+                        )
+        return [
+            (self._keys[first], self._keys[second], similarity)
+            for (first, second), similarity in found.items()
+        ]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _signatures_of(self, codes: list[np.ndarray]) -> np.ndarray:
+        """Signatures of texts given as arrays of character codes,
+        processed in chunks of about _CHUNK characters."""
+        signatures = np.empty((len(codes), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(codes):
+            end, total = start, 0
+            while end < len(codes) and (end == start or total < _CHUNK):
+                total += len(codes[end])
+                end += 1
+            hashes, counts = self._shingle_hashes(codes[start:end])
+            # Multiply-shift hashing: a * x + b wraps modulo 2**64 and
+            # the high 32 bits are the hash value.
+            permuted = self._a[:, None] * hashes[None, :]
+            permuted += self._b[:, None]
+            permuted >>= _SHIFT
+            offsets = np.concatenate([[0], np.cumsum(counts[:-1])])
+            signatures[start:end] = np.minimum.reduceat(
+                permuted, offsets, axis=1
+            ).T
+            start = end
+        return signatures
+
+    def _shingle_hashes(
+        self, codes: list[np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Rolling hashes of every `shingle_size`-character window of
+        the texts, concatenated, and the number of windows per text.
+
+        Texts shorter than a shingle are padded with zeros, so they are
+        a single shingle. Repeated shingles are hashed again rather
+        than deduplicated: they cannot change a minimum.
+        """
+        size = self.shingle_size
+        padded = [
+            c if len(c) >= size else np.pad(c, (0, size - len(c)))
+            for c in codes
+        ]
+        lengths = np.array([len(c) for c in padded])
+        text = np.concatenate(padded).astype(np.uint64)
+        windows = len(text) - size + 1
+        hashes = np.zeros(windows, dtype=np.uint64)
+        for offset in range(size):
+            hashes *= _BASE
+            hashes += text[offset : offset + windows]
+        # Keep the windows lying within one text.
+        starts = np.concatenate([[0], np.cumsum(lengths[:-1])])
+        owner = np.repeat(np.arange(len(padded)), lengths)[:windows]
+        within = np.arange(windows) - starts[owner] <= lengths[owner] - size
+        return hashes[within], lengths - size + 1
+
+    def _buckets(self, start: int, end: int) -> list[list[int]]:
+        """Rows whose signatures agree on columns [start, end), as
+        lists of row numbers, for every bucket of two or more rows."""
+        band = np.ascontiguousarray(self._signatures[:, start:end])
+        keys = band.view(np.dtype((np.void, band.itemsize * (end - start))))
+        _, inverse, counts = np.unique(
+            keys.ravel(), return_inverse=True, return_counts=True
+        )
+        inverse = inverse.ravel()
+        shared = np.flatnonzero(counts[inverse] > 1)
+        order = shared[np.argsort(inverse[shared], kind="stable")]
+        splits = np.flatnonzero(np.diff(inverse[order])) + 1
+        return [
+            bucket.tolist()
+            for bucket in np.split(order, splits)
+            if len(bucket)
+        ]
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import html
+import re
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def plain_text(text: str) -> str:
+    """Visible text of a note field: HTML entities decoded, tags
+    removed and runs of whitespace collapsed to single spaces. A tag
+    separates the words around it ("a<br>b" is "a b")."""
+    return " ".join(_TAG_RE.sub(" ", html.unescape(text)).split())
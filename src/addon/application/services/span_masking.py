@@ -0,0 +1,95 @@
+"""Mask spans the formatter must not touch before prompting the LLM.
+
+Images, embedded media, MathJax and long code blocks are copied
+verbatim by the formatter, yet sent in full they dominate the prompt
+and the model has to echo them back token by token. Masking swaps each
+span for a short placeholder before the prompt is rendered and puts
+the original text back afterwards, so the spans are guaranteed to come
+through formatting byte-for-byte unchanged.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+# Placeholder format: short, ASCII, and unlike anything in Anki markup
+# (cloze uses {{...}}, MathJax \(...\), templates <...>).
+_PLACEHOLDER = "@@P{}@@"
+_PLACEHOLDER_RE = re.compile(r"@@P(\d+)@@")
+
+# Fenced code blocks shorter than this stay visible: the prompt's rules
+# ask the model to normalize short snippets (placeholders, fences).
+MIN_CODE_BLOCK_CHARS = 120
+
+_CODE_BLOCK_RE = re.compile(
+    r"```.*?```|<pre\b[^>]*>.*?</pre>", re.DOTALL | re.IGNORECASE
+)
+_ALWAYS_MASKED_RE = re.compile(
+    r"<img\b[^>]*>"  # images, including inline base64 sources
+    r"|\[sound:[^\]]*\]"  # Anki audio/video
+    r"|data:[\w/+.-]+;base64,[A-Za-z0-9+/=]+"  # bare data URIs
+    r"|\\\(.*?\\\)|\\\[.*?\\\]|\$\$.*?\$\$",  # MathJax inline/display
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text
+    with BPE tokenizers); enough to compare prompt sizes."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class SpanMask:
+    """Placeholders handed out so far and the spans they stand for.
+
+    One mask is shared by all fields of a note so placeholder numbers
+    are unique within the prompt.
+    """
+
+    spans: dict[str, str] = field(default_factory=dict)
+
+    def mask(self, text: str) -> str:
+        """Replace protected spans in `text` with placeholders."""
+        if _PLACEHOLDER_RE.search(text):
+            # The note already contains placeholder-like text; restoring
+            # would be ambiguous, so leave it as is.
+            return text
+
+        def replace(match: re.Match) -> str:
+            span = match.group(0)
+            if span.startswith(("```", "<pre", "<PRE")) and (
+                len(span) < MIN_CODE_BLOCK_CHARS
+            ):
+                return span
+            placeholder = _PLACEHOLDER.format(len(self.spans))
+            self.spans[placeholder] = span
+            return placeholder
+
+        text = _CODE_BLOCK_RE.sub(replace, text)
+        return _ALWAYS_MASKED_RE.sub(replace, text)
+
+    def unmask(self, text: str) -> str:
+        """Put the original spans back in place of their placeholders."""
+        return _PLACEHOLDER_RE.sub(
+            lambda m: self.spans.get(m.group(0), m.group(0)), text
+        )
+
+    def is_preserved_in(self, *texts: str) -> bool:
+        """Whether every placeholder appears exactly once across
+        `texts` — i.e. the model neither dropped nor duplicated a
+        span — and no unknown placeholder was invented."""
+        found = [
+            m.group(0) for t in texts for m in _PLACEHOLDER_RE.finditer(t)
+        ]
+        return sorted(found) == sorted(self.spans)
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated tokens kept out of one copy of the text (the prompt,
+        or the model's echo of it)."""
+        return sum(
+            max(0, estimate_tokens(span) - estimate_tokens(placeholder))
+            for placeholder, span in self.spans.items()
+        )
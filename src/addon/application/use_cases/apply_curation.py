@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional
 
+from ...domain.entities.note import AddonNote, NoteId
 from ...domain.entities.proposals import (
     CreateProposal,
     DeleteProposal,
@@ -10,44 +13,194 @@ from ...domain.entities.proposals import (
 )
 from ...domain.repositories.note_repository import NoteRepository
 
+# Proposals written per bulk call; between chunks the caller gets a
+# progress update and a chance to cancel.
+_CHUNK_SIZE = 50
+
+
+class ApplyCancelledError(Exception):
+    """Raised when applying is cancelled part-way; every write made
+    before the cancellation has been rolled back."""
+
+
+class ApplyStatus(str, Enum):
+    APPLIED = "applied"
+    SKIPPED = "skipped"
+    STALE = "stale"
+
+
+@dataclass(frozen=True)
+class ProposalOutcome:
+    """What happened to one proposal when the batch was applied.
+
+    Attributes:
+        proposal: The proposal this outcome is for.
+        status: Whether the proposal was applied, skipped, or skipped
+            because its note changed after the proposal was made.
+        note_id: The note edited, created or deleted; None if not
+            applied.
+        reason: Why the proposal was not applied; empty if applied.
+    """
+
+    proposal: Proposal
+    status: ApplyStatus
+    note_id: NoteId | None = None
+    reason: str = ""
+
 
 @dataclass(frozen=True)
 class ApplyReport:
-    """Counts of proposals applied to the collection."""
+    """Counts of proposals applied to the collection, plus the outcome
+    of every proposal in the order given."""
 
     edits: int
     creates: int
     deletes: int
+    outcomes: tuple[ProposalOutcome, ...] = ()
+
+    @property
+    def skipped(self) -> list[ProposalOutcome]:
+        return [o for o in self.outcomes if o.status != ApplyStatus.APPLIED]
 
     def __str__(self) -> str:
-        return (
+        text = (
             f"Applied {self.edits} edit(s), {self.creates} create(s), "
             f"{self.deletes} delete(s)"
         )
+        if self.skipped:
+            text += f"; skipped {len(self.skipped)}"
+        return text
 
 
 def apply_proposals(
     repository: NoteRepository,
     proposals: list[Proposal],
     deck_name: str,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
 ) -> ApplyReport:
     """Apply approved proposals to the collection.
 
     Only call this with proposals the user has approved — the function
     applies everything it is given. New notes are created in
-    `deck_name`. Deletions run last so a failure mid-way cannot leave a
-    note both edited and deleted.
+    `deck_name`.
+
+    Writes are batched (one bulk call per kind) inside a single
+    repository transaction: the user can undo the whole batch in one
+    step, and a failing write rolls back the ones before it instead of
+    leaving the batch half-applied. Edits and deletes whose note no
+    longer exists are skipped and reported rather than failing the
+    batch. So are edits and deletes whose note changed after the
+    proposal was made (its modification time is no longer the
+    proposal's `before_mod`, or, for proposals without one, it no
+    longer matches the `before` snapshot): applying them would
+    silently discard the newer change.
+    Deletions run last so a note is never edited after it was deleted.
+
+    Writes go out in chunks so a caller running this off the UI thread
+    can show progress (`on_progress(done, total)` after each chunk) and
+    stop early: when `is_cancelled()` returns True the batch is rolled
+    back and ApplyCancelledError is raised.
     """
-    edits = creates = deletes = 0
-    for proposal in proposals:
-        if isinstance(proposal, EditProposal):
-            repository.update(proposal.note_id, proposal.after)
-            edits += 1
-        elif isinstance(proposal, CreateProposal):
-            repository.add(proposal.note, deck_name)
-            creates += 1
-    for proposal in proposals:
-        if isinstance(proposal, DeleteProposal):
-            repository.remove([proposal.note_id])
-            deletes += 1
-    return ApplyReport(edits, creates, deletes)
+    targets = [
+        p for p in proposals if isinstance(p, (EditProposal, DeleteProposal))
+    ]
+    # One query for the targets' modification times both finds missing
+    # notes and detects stale proposals, however long the review queue
+    # was; notes are only loaded to write them, plus those proposals
+    # recorded without a modification time, compared by content.
+    mods = repository.get_mods(list(dict.fromkeys(p.note_id for p in targets)))
+    unversioned = [
+        p.note_id
+        for p in targets
+        if p.before_mod is None and p.note_id in mods
+    ]
+    contents = (
+        repository.get_many(list(dict.fromkeys(unversioned)))
+        if unversioned
+        else {}
+    )
+
+    outcomes: dict[int, ProposalOutcome] = {}
+    edits: dict[int, EditProposal] = {}
+    creates: dict[int, CreateProposal] = {}
+    deletes: dict[int, DeleteProposal] = {}
+    for i, proposal in enumerate(proposals):
+        if isinstance(proposal, CreateProposal):
+            creates[i] = proposal
+        elif proposal.note_id not in mods:
+            outcomes[i] = ProposalOutcome(
+                proposal, ApplyStatus.SKIPPED, reason="note not found"
+            )
+        elif _is_stale(proposal, mods, contents):
+            outcomes[i] = ProposalOutcome(
+                proposal,
+                ApplyStatus.STALE,
+                reason="note changed since the proposal was made",
+            )
+        elif isinstance(proposal, EditProposal):
+            edits[i] = proposal
+        else:
+            deletes[i] = proposal
+
+    if edits or creates or deletes:
+        created_ids: list[NoteId] = []
+        steps: list[tuple[list, Callable[[list], object]]] = [
+            (
+                list(edits.values()),
+                lambda chunk: repository.update_many(
+                    {p.note_id: p.after for p in chunk}
+                ),
+            ),
+            (
+                list(creates.values()),
+                lambda chunk: created_ids.extend(
+                    repository.add_many([p.note for p in chunk], deck_name)
+                ),
+            ),
+            (
+                list(deletes.values()),
+                lambda chunk: repository.remove([p.note_id for p in chunk]),
+            ),
+        ]
+        total = len(edits) + len(creates) + len(deletes)
+        done = 0
+        with repository.transaction("Apply curation"):
+            for batch, write in steps:
+                for start in range(0, len(batch), _CHUNK_SIZE):
+                    if is_cancelled is not None and is_cancelled():
+                        raise ApplyCancelledError(
+                            f"cancelled after {done} of {total} proposal(s)"
+                        )
+                    chunk = batch[start : start + _CHUNK_SIZE]
+                    write(chunk)
+                    done += len(chunk)
+                    if on_progress is not None:
+                        on_progress(done, total)
+        for i, proposal in edits.items():
+            outcomes[i] = _applied(proposal, proposal.note_id)
+        for (i, proposal), note_id in zip(creates.items(), created_ids):
+            outcomes[i] = _applied(proposal, note_id)
+        for i, proposal in deletes.items():
+            outcomes[i] = _applied(proposal, proposal.note_id)
+
+    return ApplyReport(
+        edits=len(edits),
+        creates=len(creates),
+        deletes=len(deletes),
+        outcomes=tuple(outcomes[i] for i in range(len(proposals))),
+    )
+
+
+def _is_stale(
+    proposal: EditProposal | DeleteProposal,
+    mods: dict[NoteId, int],
+    contents: dict[NoteId, AddonNote],
+) -> bool:
+    if proposal.before_mod is not None:
+        return mods[proposal.note_id] != proposal.before_mod
+    return contents.get(proposal.note_id) != proposal.before
+
+
+def _applied(proposal: Proposal, note_id: NoteId) -> ProposalOutcome:
+    return ProposalOutcome(proposal, ApplyStatus.APPLIED, note_id=note_id)
@@ -1,11 +1,118 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
 
-from ...utils import ensure_collection
+from ...utils import ensure_collection, ensure_db
 
 if TYPE_CHECKING:
-    from anki.collection import Collection
+    from anki.collection import Collection, OpChangesWithCount
+
+_ORANGE_FLAG = 2
+
+# Flags are assigned to cards, not notes: a note is marked for review when
+# any of its cards has the orange flag (2, the low 3 bits of `flags`).
+# One pass over the deck's cards grouped by note answers both "which
+# notes are flagged" and "how many notes are there". The deck condition
+# mirrors Anki's `did:` search (the deck itself, not its children, plus
+# cards moved from it to a filtered deck).
+_REVIEW_NOTES_SQL = (
+    "select nid, max((flags & 7) = 2) from cards"
+    " where did = ? or (odid != 0 and odid = ?)"
+    " group by nid order by nid"
+)
+# The same for every deck at once, from the (deck, original deck, note)
+# groups.
+_ALL_DECKS_REVIEW_NOTES_SQL = (
+    "select did, odid, nid, max((flags & 7) = 2) from cards"
+    " group by did, odid, nid"
+)
+
+
+@dataclass(frozen=True)
+class ReviewNotes:
+    """Notes of a deck marked for review.
+
+    Attributes:
+        flagged_note_ids: Notes with an orange-flagged card, by note id.
+        total_notes: Number of notes in the deck.
+    """
+
+    flagged_note_ids: list[int]
+    total_notes: int
+
+
+class ReviewCountCache:
+    """Review counts per deck, recounted only when invalidated.
+
+    Counting scans every card of the deck; the cache answers repeated
+    requests instantly and relies on hooks (see
+    register_review_count_hooks) to drop counts when cards change.
+    """
+
+    def __init__(self) -> None:
+        self._counts: dict[int, ReviewNotes] = {}
+        # Set when every deck is cached, so get_all() needs no recount.
+        self._all_decks = False
+
+    def get(self, col: Collection, deck_id: int) -> ReviewNotes:
+        if deck_id not in self._counts:
+            self._counts[deck_id] = find_notes_marked_for_review(col, deck_id)
+        return self._counts[deck_id]
+
+    def get_all(self, col: Collection) -> dict[str, ReviewNotes]:
+        """Counts of every deck by name, recounted in a single pass over
+        the collection's cards if any deck is out of date."""
+        decks = {d.id: d.name for d in col.decks.all_names_and_ids()}
+        if not self._all_decks:
+            self._counts.update(find_review_notes_by_deck(col, decks))
+            self._all_decks = True
+        return {
+            name: self._counts[deck_id]
+            for deck_id, name in decks.items()
+            if deck_id in self._counts
+        }
+
+    def invalidate(self, deck_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop the counts of `deck_ids`, or all counts."""
+        self._all_decks = False
+        if deck_ids is None:
+            self._counts.clear()
+            return
+        for deck_id in deck_ids:
+            self._counts.pop(deck_id, None)
+
+
+# Session-wide cache behind the "Count notes marked for review" actions.
+_review_counts = ReviewCountCache()
+
+
+def register_review_count_hooks() -> None:
+    """Keep the review count cache in step with the collection."""
+    from anki import hooks
+    from aqt import gui_hooks
+
+    # Legacy card saves name their deck; anything broader (operations
+    # touching cards or decks, deletions, undo, sync, profile switch)
+    # drops every count.
+    hooks.card_will_flush.append(
+        lambda card: _review_counts.invalidate([card.did, card.odid])
+    )
+    hooks.notes_will_be_deleted.append(
+        lambda col, ids: _review_counts.invalidate()
+    )
+    gui_hooks.operation_did_execute.append(
+        lambda changes, handler: (
+            _review_counts.invalidate()
+            if changes.card or changes.deck
+            else None
+        )
+    )
+    gui_hooks.collection_did_load.append(
+        lambda col: _review_counts.invalidate()
+    )
+    gui_hooks.sync_did_finish.append(_review_counts.invalidate)
 
 
 def display_notes_marked_for_review_count() -> None:
@@ -13,27 +120,72 @@ def display_notes_marked_for_review_count() -> None:
     from aqt.utils import showInfo
 
     col = ensure_collection(mw.col)
-    deck_id = col.decks.current()["id"]
-    query = f"did:{deck_id}"
-    note_ids = col.find_notes(query)
-
-    flagged_notes = 0
-    for note_id in note_ids:
-        if is_note_marked_for_review(col, note_id):
-            flagged_notes += 1
-
-    showInfo(f"Notes marked for review: {flagged_notes}/{len(note_ids)}")
-
-
-def is_note_marked_for_review(col: Collection, note_id: int) -> bool:
-    # NOTE: Flags are assigned to cards, not notes. For this reason, we are
-    # iterating through the cards associated to a note to find if any of them
-    # has an orange (id=2) flag
-    card_ids = col.find_cards(f"nid:{note_id}")
-    for card_id in card_ids:
-        card = col.get_card(card_id)
-        if (
-            card.flags == 2
-        ):  # orange flag, our convention to mark a note for review
-            return True
-    return False
+    review = _review_counts.get(col, col.decks.current()["id"])
+    showInfo(
+        f"Notes marked for review: "
+        f"{len(review.flagged_note_ids)}/{review.total_notes}"
+    )
+
+
+def display_review_counts_for_all_decks() -> None:
+    from aqt import mw
+    from aqt.utils import showText
+
+    col = ensure_collection(mw.col)
+    counts = _review_counts.get_all(col)
+    lines = [
+        f"{name}: {len(review.flagged_note_ids)}/{review.total_notes}"
+        for name, review in sorted(counts.items())
+        if review.total_notes
+    ]
+    showText(
+        "Notes marked for review, by deck:\n\n" + "\n".join(lines),
+        title="Notes marked for review",
+    )
+
+
+def find_notes_marked_for_review(col: Collection, deck_id: int) -> ReviewNotes:
+    """Find the deck's notes marked for review with a single query,
+    instead of loading every card of every note to check its flag."""
+    rows = ensure_db(col).all(_REVIEW_NOTES_SQL, deck_id, deck_id)
+    return ReviewNotes(
+        flagged_note_ids=[nid for nid, flagged in rows if flagged],
+        total_notes=len(rows),
+    )
+
+
+def find_review_notes_by_deck(
+    col: Collection, deck_ids: Iterable[int]
+) -> dict[int, ReviewNotes]:
+    """Review notes of every deck in `deck_ids` from a single query."""
+    notes_by_deck: dict[int, dict[int, bool]] = {
+        deck_id: {} for deck_id in deck_ids
+    }
+    for did, odid, nid, flagged in ensure_db(col).all(
+        _ALL_DECKS_REVIEW_NOTES_SQL
+    ):
+        for deck_id in (did, odid) if odid else (did,):
+            notes = notes_by_deck.get(deck_id)
+            if notes is not None:
+                notes[nid] = notes.get(nid, False) or bool(flagged)
+    return {
+        deck_id: ReviewNotes(
+            flagged_note_ids=sorted(n for n, f in notes.items() if f),
+            total_notes=len(notes),
+        )
+        for deck_id, notes in notes_by_deck.items()
+    }
+
+
+def clear_orange_flags(
+    col: Collection, note_ids: list[int]
+) -> OpChangesWithCount:
+    """Remove the orange flag from every card of the notes, in one
+    collection operation (undoable, returns the number of cards)."""
+    # Not an operation the hooks see when called directly.
+    _review_counts.invalidate()
+    nids = ",".join(str(int(nid)) for nid in note_ids)
+    card_ids = (
+        col.find_cards(f"nid:{nids} flag:{_ORANGE_FLAG}") if nids else []
+    )
+    return col.set_user_flag_for_cards(0, card_ids)
@@ -2,20 +2,30 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 from ...application.services.curator_agent import (
     CurationSession,
     CuratorAgent,
 )
 from ...application.services.curator_tools import CuratorTools
-from ...application.use_cases.apply_curation import apply_proposals
+from ...application.use_cases.apply_curation import (
+    ApplyCancelledError,
+    ApplyReport,
+    apply_proposals,
+)
+from ...application.use_cases.note_index import IndexSyncCancelledError
 from ...domain.entities.note import NoteId
+from ...domain.repositories.document_repository import DocumentRepository
+from ...domain.repositories.note_repository import NoteRepository
 from ...infrastructure.configuration.settings import AddonConfig
 from ...infrastructure.external_services.openai import OpenAIClient
 from ...infrastructure.persistence.anki_note_repository import (
     AnkiNoteRepository,
 )
+from ...infrastructure.services.similarity_factory import (
+    get_similarity_search,
+)
 from ...infrastructure.ui.curation_review import review_proposals
 from ...utils import ensure_collection, ensure_note
 
@@ -40,9 +50,13 @@ def add_curator_button(buttons: list, editor: Editor) -> None:
 
 def on_curator_action(editor: Editor) -> None:
     """Run the curator agent on the editor's note in the background,
-    then let the user review and apply the proposed changes."""
+    then let the user review and apply the proposed changes.
+
+    The similar-note search the agent uses is first brought up to date
+    in its own background op, which shows progress and can be
+    cancelled (the agent then runs without that tool)."""
     from aqt import mw
-    from aqt.operations import QueryOp
+    from aqt.operations import CollectionOp, QueryOp
     from aqt.utils import showInfo, showWarning, tooltip
     from PyQt6.QtWidgets import QInputDialog
 
@@ -63,8 +77,6 @@ def on_curator_action(editor: Editor) -> None:
     repository = AnkiNoteRepository(
         col, config.basic_notetype, config.cloze_notetype
     )
-    tools = CuratorTools(repository)
-    agent = CuratorAgent(OpenAIClient(config), tools)
     seed_note_id = NoteId(note.id)
 
     def on_success(session: CurationSession) -> None:
@@ -81,37 +93,121 @@ def on_curator_action(editor: Editor) -> None:
         if not approved:
             tooltip("No proposals approved")
             return
-        try:
+        deck_name = col.decks.current()["name"]
+
+        def on_progress(done: int, total: int) -> None:
+            mw.taskman.run_on_main(
+                lambda: mw.progress.update(
+                    label=f"Applied {done} of {total} proposal(s)...",
+                    value=done,
+                    max=total,
+                )
+            )
+
+        def apply_op(col: Collection) -> _AppliedCuration:
+            # Runs on a background thread so large change sets do not
+            # freeze the main window.
             report = apply_proposals(
                 repository,
                 approved,
-                deck_name=col.decks.current()["name"],
+                deck_name=deck_name,
+                on_progress=on_progress,
+                is_cancelled=mw.progress.want_cancel,
             )
-        except Exception as e:
-            showWarning(f"Failed to apply changes: {e}")
-            return
-        # Reload the editor's note in place: apply_proposals wrote
-        # through freshly-fetched note objects, so the object the editor
-        # holds (and anything aliasing it, like EditorDialog.review_notes
-        # in the 'Improve note with AI' window) is still the pre-curation
-        # copy. Re-rendering or saving from that stale object would
-        # silently revert the applied edits.
-        try:
-            ensure_note(editor.note).load()
-            editor.loadNote()
-        except Exception:
-            pass
-        mw.reset()
-        tooltip(str(report))
+            return _AppliedCuration(report)
+
+        def on_applied(result: _AppliedCuration) -> None:
+            # Browser, reviewer and deck list refresh themselves from
+            # the op's changes; only the editor's own note object needs
+            # reloading. apply_proposals wrote through freshly-fetched
+            # note objects, so the one the editor holds (and anything
+            # aliasing it, like EditorDialog.review_notes in the 'Improve
+            # note with AI' window) is still the pre-curation copy.
+            # Re-rendering or saving from that stale object would
+            # silently revert the applied edits.
+            try:
+                ensure_note(editor.note).load()
+                editor.loadNote()
+            except Exception:
+                pass
+            tooltip(str(result.report))
+
+        def on_apply_failure(error: Exception) -> None:
+            if isinstance(error, ApplyCancelledError):
+                tooltip("Applying cancelled; no changes were made")
+                return
+            showWarning(f"Failed to apply changes: {error}")
+
+        CollectionOp(parent=mw, op=apply_op).success(on_applied).failure(
+            on_apply_failure
+        ).run_in_background()
 
     def on_failure(error: Exception) -> None:
         showWarning(f"Curation failed: {error}")
 
-    def op(col: Collection) -> CurationSession:
-        # Runs on a background thread; only reads the collection and
-        # calls the LLM — all proposals wait for user review.
-        return agent.run(seed_note_id, instruction)
+    def curate(documents: DocumentRepository | None) -> None:
+        def op(col: Collection) -> CurationSession:
+            # Runs on a background thread; only reads the collection and
+            # calls the LLM — all proposals wait for user review.
+            tools = CuratorTools(repository, documents=documents)
+            agent = CuratorAgent(OpenAIClient(config), tools)
+            return agent.run(seed_note_id, instruction)
+
+        QueryOp(parent=mw, op=op, success=on_success).failure(  # type: ignore[misc]
+            on_failure
+        ).with_progress("Curating cluster with AI...").run_in_background()
+
+    def on_index_progress(done: int, total: int) -> None:
+        mw.taskman.run_on_main(
+            lambda: mw.progress.update(
+                label=f"Indexed {done} of {total} note(s) for search...",
+                value=done,
+                max=total,
+            )
+        )
+
+    def index_op(col: Collection) -> DocumentRepository | None:
+        # The first sync of a session with no saved index embeds the
+        # whole collection; later ones only the notes changed since.
+        return _similarity_search(
+            repository, on_index_progress, mw.progress.want_cancel
+        )
+
+    def on_index_failure(error: Exception) -> None:
+        if isinstance(error, IndexSyncCancelledError):
+            tooltip("Indexing cancelled; curating without similar notes")
+            curate(None)
+            return
+        showWarning(f"Indexing notes for search failed: {error}")
+
+    QueryOp(parent=mw, op=index_op, success=curate).failure(  # type: ignore[misc]
+        on_index_failure
+    ).with_progress("Indexing notes for search...").run_in_background()
+
+
+def _similarity_search(
+    notes: NoteRepository,
+    on_progress: Callable[[int, int], None],
+    is_cancelled: Callable[[], bool],
+) -> DocumentRepository | None:
+    """The similar-note search for the agent's find_similar_notes tool;
+    None (the tool then reports it unavailable) if the embedding model
+    cannot be loaded."""
+    try:
+        return get_similarity_search(notes, on_progress, is_cancelled)
+    except (ImportError, OSError):
+        return None
+
+
+class _AppliedCuration:
+    """Result of the apply CollectionOp: the report, plus the `changes`
+    CollectionOp broadcasts so open screens refresh only what changed
+    (instead of a full mw.reset())."""
+
+    def __init__(self, report: ApplyReport) -> None:
+        from anki.collection import OpChanges
 
-    QueryOp(parent=mw, op=op, success=on_success).failure(  # type: ignore[misc]
-        on_failure
-    ).with_progress("Curating cluster with AI...").run_in_background()
+        self.report = report
+        self.changes: OpChanges = OpChanges(
+            note_text=True, card=True, browser_table=True
+        )
@@ -1,12 +1,30 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from ...domain.entities.note import AddonCollection, AddonNote
 from ...domain.repositories.document_repository import (
     DocumentRepository,
     SearchQuery,
     convert_addon_note_to_document,
     convert_document_to_addon_note,
+    document_id_for_note,
 )
+from ..services.minhash import MinHashIndex
+
+
+@dataclass(frozen=True)
+class DuplicateGroup:
+    """Notes that are near-duplicates of each other.
+
+    Attributes:
+        notes: The notes in the group, in collection order (at least two).
+        similarity: Highest similarity score between two notes of the
+            group; groups are ranked by it.
+    """
+
+    notes: list[AddonNote]
+    similarity: float
 
 
 class SimilarNoteFinder:
@@ -44,17 +62,30 @@ class SimilarNoteFinder:
     ) -> None:
         self._collection = collection
         self._repository = repository
+        # Ids of the documents stored by the last load_collection().
+        self._loaded_ids: set[str] = set()
 
     def load_collection(self) -> None:
         """Bulk-load all notes from the collection into the repository.
 
         Must be called before `find_duplicates()` if the repository needs
-        to be populated. Calling it multiple times re-loads from scratch.
+        to be populated. Calling it again stores only what changed (the
+        repository skips unchanged documents) and removes the documents
+        of notes that left the collection since the previous call.
+        Documents are keyed by note guid, which Anki does not keep for
+        deleted notes, so documents a persistent index kept from notes
+        deleted before this finder's first load stay;
+        find_duplicate_groups() ignores them.
         """
         documents = [
             convert_addon_note_to_document(note) for note in self._collection
         ]
         self._repository.store_batch(documents)
+        loaded_ids = {doc.id for doc in documents}
+        stale = self._loaded_ids - loaded_ids
+        if stale:
+            self._repository.remove(sorted(stale))
+        self._loaded_ids = loaded_ids
 
     def find_duplicates(self, note: AddonNote) -> list[AddonNote]:
         if note.tags:
@@ -69,3 +100,114 @@ class SimilarNoteFinder:
             ]
         else:
             return []
+
+    def find_duplicate_groups(
+        self, threshold: float = 0.9, neighbors: int = 5
+    ) -> list[DuplicateGroup]:
+        """Group all near-duplicate notes of the collection.
+
+        Looks up the `neighbors` most similar notes of every note in one
+        batched kNN job (the collection must be loaded), keeps the pairs
+        scoring at least `threshold`, and merges overlapping pairs into
+        groups: if A~B and B~C, then A, B and C form one group even if A
+        and C score below the threshold.
+
+        Locally, use a NumpyDocumentRepository: the kNN job takes ~6 s
+        at 20k notes with it, while Qdrant's local mode grows
+        quadratically (~4 minutes at 5k; see
+        scripts/bench_duplicate_groups.py).
+
+        Returns:
+            Groups ranked by their highest pair similarity, then size.
+        """
+        notes = {
+            document_id_for_note(note.guid): note for note in self._collection
+        }
+        doc_ids = list(notes)
+        groups = _UnionFind(doc_ids)
+        for doc_id, results in zip(
+            doc_ids, self._repository.find_neighbors(doc_ids, neighbors)
+        ):
+            for result in results:
+                other = result.document.id
+                # Documents of notes no longer in the collection are
+                # ignored.
+                if result.relevance_score >= threshold and other in notes:
+                    groups.union(doc_id, other, result.relevance_score)
+        return _ranked_groups(notes, groups)
+
+    def find_verbatim_duplicate_groups(
+        self, threshold: float = 0.8
+    ) -> list[DuplicateGroup]:
+        """Group notes that are near-verbatim copies of each other.
+
+        A cheap first pass before find_duplicate_groups(): compares the
+        plain text of the notes (front and back, HTML stripped) with
+        MinHash signatures and LSH banding, so notes imported twice or
+        differing only in their markup are found without computing any
+        embedding; the collection does not need to be loaded. Pairs
+        whose estimated Jaccard similarity of character shingles is at
+        least `threshold` are merged into groups as in
+        find_duplicate_groups().
+
+        Returns:
+            Groups ranked by their highest pair similarity (the
+            Jaccard estimate), then size.
+        """
+        notes = {
+            document_id_for_note(note.guid): note for note in self._collection
+        }
+        index = MinHashIndex()
+        index.add(
+            list(notes),
+            [f"{note.front}\n{note.back}" for note in notes.values()],
+        )
+        groups = _UnionFind(list(notes))
+        for first, second, similarity in index.similar_pairs(threshold):
+            groups.union(first, second, similarity)
+        return _ranked_groups(notes, groups)
+
+
+def _ranked_groups(
+    notes: dict[str, AddonNote], groups: _UnionFind
+) -> list[DuplicateGroup]:
+    """The groups of two or more notes, ranked by their highest pair
+    similarity, then size."""
+    members: dict[str, list[AddonNote]] = {}
+    for doc_id in notes:
+        members.setdefault(groups.find(doc_id), []).append(notes[doc_id])
+    ranked = [
+        DuplicateGroup(group, groups.similarity[root])
+        for root, group in members.items()
+        if len(group) > 1
+    ]
+    ranked.sort(key=lambda g: (g.similarity, len(g.notes)), reverse=True)
+    return ranked
+
+
+class _UnionFind:
+    """Disjoint sets of document ids, tracking each set's highest
+    similarity (path halving, union by size)."""
+
+    def __init__(self, items: list[str]) -> None:
+        self._parent = {item: item for item in items}
+        self._size = dict.fromkeys(items, 1)
+        self.similarity = dict.fromkeys(items, 0.0)
+
+    def find(self, item: str) -> str:
+        while self._parent[item] != item:
+            self._parent[item] = self._parent[self._parent[item]]
+            item = self._parent[item]
+        return item
+
+    def union(self, a: str, b: str, similarity: float) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            if self._size[root_a] < self._size[root_b]:
+                root_a, root_b = root_b, root_a
+            self._parent[root_b] = root_a
+            self._size[root_a] += self._size[root_b]
+            self.similarity[root_a] = max(
+                self.similarity[root_a], self.similarity[root_b]
+            )
+        self.similarity[root_a] = max(self.similarity[root_a], similarity)
@@ -2,9 +2,22 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from ...application.services.batch_formatter import (
+    BatchFormatter,
+    FormattingSuggestion,
+)
 from ...application.services.formatter_service import AnkiNoteMapper
+from ...application.use_cases.note_counter import clear_orange_flags
+from ...domain.entities.note import AddonNote, NoteId
+from ...infrastructure.configuration.settings import (
+    AddonConfig,
+    read_clear_flags_at_session_end,
+)
+from ...infrastructure.persistence.anki_note_repository import (
+    AnkiNoteRepository,
+)
 from ...infrastructure.persistence.training_dataset import (
     create_training_dataset,
 )
@@ -13,6 +26,7 @@ from ...infrastructure.ui.editor import EditorDialog
 from ...utils import ensure_collection, ensure_note
 
 if TYPE_CHECKING:
+    from anki.notes import Note
     from aqt.editor import Editor
 
 
@@ -23,10 +37,18 @@ def open_review_editor() -> None:
     - It adds buttons for saving changes, skipping to the next note, or
       canceling the editing session
     - It implements handlers for each button's functionality
+
+    While the user reviews, the next `formatter_lookahead` flagged
+    notes, or every flagged note in the deck if it is 0, are formatted
+    in the background (see BatchFormatter); each note opens with its AI
+    suggestion already applied when it is ready, or gets it as soon as
+    it arrives, after asking if the user has started editing the note.
     """
     from aqt import mw
     from aqt.editor import Editor
-    from aqt.utils import showInfo
+    from aqt.operations import CollectionOp
+    from aqt.utils import askUser, showInfo, tooltip
+    from PyQt6.QtCore import QTimer
     from PyQt6.QtWidgets import (
         QDialog,
         QHBoxLayout,
@@ -56,12 +78,77 @@ def open_review_editor() -> None:
     # Initialize training dataset for storing examples
     training_dataset = create_training_dataset()
 
+    # Format flagged notes ahead of the user
+    defer_flags = _clear_flags_at_session_end()
+    batch, lookahead = _create_batch_formatter()
+    if batch is not None and lookahead == 0:
+        # Whole-deck job: submit ids only, workers load each note right
+        # before formatting it (the backend serializes collection
+        # access), so the deck is never held in memory at once.
+        batch.submit_ids(
+            [NoteId(i) for i in editor_state.remaining_note_ids()],
+            AnkiNoteRepository(col).get,
+        )
+
     # Load an Editor widget
     editor_widget = QWidget(dialog)
     editor = Editor(mw, editor_widget, dialog)
-    editor.setNote(editor_state.current_note())
     layout.addWidget(editor.widget)
 
+    # Only the note on screen is held here, so notes the review moved
+    # past can be released (see LazyNoteList.release_before).
+    shown: Optional[Note] = None
+
+    def show_note(note: Note) -> None:
+        """Load the note into the editor and prefetch suggestions for
+        the notes after it. The editor state has already backed up the
+        original fields, so Skip and Cancel still restore them."""
+        nonlocal shown
+        if batch is not None:
+            # The note being left no longer needs a suggestion.
+            if shown is not None:
+                batch.cancel([NoteId(shown.id)])
+            if lookahead:
+                upcoming = [note] + editor_state.upcoming_notes(lookahead)
+                batch.submit(
+                    {
+                        NoteId(n.id): AnkiNoteMapper.to_addon_note(n)
+                        for n in upcoming
+                    }
+                )
+        shown = note
+        editor.setNote(note)
+        preview_suggestion(note)
+
+    def preview_suggestion(note: Note) -> None:
+        """Merge the note's suggestion into the editor once it is ready,
+        polling while the user is still on that note."""
+        if batch is None or shown is not note:
+            return
+        dialog.setWindowTitle(f"Standalone Editor ({batch.stats()})")
+        suggestion = batch.take(NoteId(note.id))
+        if suggestion is None:
+            QTimer.singleShot(250, lambda: preview_suggestion(note))
+        elif suggestion.formatted is None:
+            tooltip(f"AI suggestion failed: {suggestion.error}")
+        else:
+            formatted = suggestion.formatted
+            # Save the editor's fields into the note first, so edits
+            # made while waiting are seen (and not overwritten).
+            editor.saveNow(lambda: apply_suggestion(note, formatted))
+
+    def apply_suggestion(note: Note, formatted: AddonNote) -> None:
+        if shown is not note:
+            return
+        if not editor_state.is_unchanged(note) and not askUser(
+            "The AI suggestion is ready. Replace your edits with it?"
+        ):
+            return
+        AnkiNoteMapper.merge_addon_changes(note, formatted)
+        editor.loadNote()
+
+    show_note(editor_state.current_note())
+
     # Create button layout with manual buttons
     button_layout = QHBoxLayout()
     save_button = QPushButton("Save")
@@ -92,13 +179,16 @@ def open_review_editor() -> None:
             updated_fields=updated_fields,
         )
 
-        current_note = editor_state.strip_orange_flag(current_note)
+        if defer_flags:
+            current_note = editor_state.defer_strip_orange_flag(current_note)
+        else:
+            current_note = editor_state.strip_orange_flag(current_note)
         current_note.flush()
 
         # Then handle navigation to next note
         if editor_state.has_next_note():
-            next_note = editor_state.move_to_next_note()
-            editor.setNote(next_note)
+            next_note = ensure_note(editor_state.move_to_next_note())
+            show_note(next_note)
         else:
             # No more notes to review
             dialog.accept()
@@ -115,8 +205,8 @@ def open_review_editor() -> None:
 
         # Then handle navigation to next note
         if editor_state.has_next_note():
-            next_note = editor_state.move_to_next_note()
-            editor.setNote(next_note)
+            next_note = ensure_note(editor_state.move_to_next_note())
+            show_note(next_note)
         else:
             # No more notes to review
             dialog.accept()
@@ -128,8 +218,8 @@ def open_review_editor() -> None:
 
         # Then handle navigation to next note
         if editor_state.has_next_note():
-            next_note = editor_state.move_to_next_note()
-            editor.setNote(next_note)
+            next_note = ensure_note(editor_state.move_to_next_note())
+            show_note(next_note)
         else:
             # No more notes to review
             dialog.accept()
@@ -152,6 +242,42 @@ def open_review_editor() -> None:
     # Run as a "modal" dialog
     dialog.exec()
 
+    # Notes saved this session (including before a Cancel) lose their
+    # flag in one background operation.
+    note_ids = editor_state.take_deferred_flag_note_ids()
+    if note_ids:
+        CollectionOp(
+            parent=mw, op=lambda col: clear_orange_flags(col, note_ids)
+        ).success(
+            lambda out: tooltip(f"Cleared the flag on {out.count} cards")
+        ).run_in_background()
+
+    if batch is not None:
+        # Stop the polling and drop prefetches the user will not see.
+        shown = None
+        batch.shutdown()
+        tooltip(f"AI formatting: {batch.stats()}")
+
+
+def _create_batch_formatter() -> tuple[BatchFormatter | None, int]:
+    """Return the batch formatter and look-ahead for a review session;
+    no formatter if the LLM server is not configured (the review
+    editor still works without it)."""
+    from aqt import mw
+
+    try:
+        config = AddonConfig(mw.addonManager)
+        batch = BatchFormatter(get_formatter(), config.formatter_concurrency)
+    except (RuntimeError, ValueError):
+        return None, 0
+    return batch, config.formatter_lookahead
+
+
+def _clear_flags_at_session_end() -> bool:
+    from aqt import mw
+
+    return read_clear_flags_at_session_end(mw.addonManager)
+
 
 def add_custom_button(buttons, editor: Editor) -> None:
     """Add button to retrieve AI suggestions to Editor."""
@@ -168,27 +294,110 @@ def add_custom_button(buttons, editor: Editor) -> None:
 
 
 def on_custom_action(editor: Editor) -> None:
-    from aqt.utils import askUser, tooltip
+    """Format the editor's note in the background and preview the result
+    once it arrives. The progress dialog can be closed to cancel; clicks
+    while the note is already being formatted join that request."""
+    from aqt import mw
+    from aqt.operations import QueryOp
+    from aqt.utils import askUser, showWarning, tooltip
 
     note = ensure_note(editor.note)
+    note_id = NoteId(note.id)
+    if note_id in _formatting:
+        tooltip("Already formatting this note with AI...")
+        return
 
     # Convert to domain model
     original_addon_note = AnkiNoteMapper.to_addon_note(note)
+    batch = _get_editor_batch()
+    batch.submit({note_id: original_addon_note})
+    _formatting.add(note_id)
+
+    def op(_col) -> FormattingSuggestion | None:
+        # Runs off the UI thread; only waits on the formatter.
+        return batch.wait_for(note_id, is_cancelled=mw.progress.want_cancel)
+
+    def on_success(suggestion: FormattingSuggestion | None) -> None:
+        mw.progress.finish()
+        _formatting.discard(note_id)
+        if suggestion is None:
+            tooltip("AI formatting cancelled")
+            return
+        if suggestion.formatted is None:
+            showWarning(f"AI formatting failed: {suggestion.error}")
+            return
+        if editor.note is None or editor.note.id != note.id:
+            tooltip("AI formatting discarded: the editor moved on")
+            return
+
+        # Temporarily merge changes into note for preview
+        AnkiNoteMapper.merge_addon_changes(editor.note, suggestion.formatted)
+        editor.loadNote()
+
+        # Ask the user if they want to keep the changes
+        if askUser("Apply changes?"):
+            col = ensure_collection(editor.mw.col)
+            col.update_note(editor.note)
+            tooltip("Changes applied")
+        else:
+            # User rejected changes, restore by merging original back
+            AnkiNoteMapper.merge_addon_changes(
+                editor.note, original_addon_note
+            )
+            editor.loadNote()
+
+    def on_failure(exc: Exception) -> None:
+        mw.progress.finish()
+        _formatting.discard(note_id)
+        showWarning(f"AI formatting failed: {exc}")
+
+    # Progress is driven by hand rather than with_progress(): that would
+    # hold the collection for the whole LLM call, queueing every other
+    # background op behind it.
+    mw.progress.start(label="Formatting note with AI...", parent=editor.widget)
+    QueryOp(parent=editor.widget, op=op, success=on_success).failure(  # type: ignore[misc]
+        on_failure
+    ).without_collection().run_in_background()
+
+
+# Formatter for the editor button, shared across editors until the
+# profile closes, what it was built from, and the notes it is working on
+# (only touched from the UI thread).
+_editor_batch: BatchFormatter | None = None
+_editor_batch_settings: tuple | None = None
+_formatting: set[NoteId] = set()
+
+
+def _get_editor_batch() -> BatchFormatter:
+    """The editor button's batch formatter, rebuilt once no note is
+    being formatted if the formatter or its concurrency changed."""
+    global _editor_batch, _editor_batch_settings
+    from aqt import mw
 
-    # Format using pure domain logic (formatter is a session-level singleton)
+    config = AddonConfig(mw.addonManager)
     formatter = get_formatter()
-    formatted_addon_note = formatter.format(original_addon_note)
-
-    # Temporarily merge changes into note for preview
-    note = AnkiNoteMapper.merge_addon_changes(note, formatted_addon_note)
-    editor.loadNote()
-
-    # Ask the user if they want to keep the changes
-    if askUser("Apply changes?"):
-        col = ensure_collection(editor.mw.col)
-        col.update_note(note)
-        tooltip("Changes applied")
-    else:
-        # User rejected changes, restore by merging original AddonNote back
-        note = AnkiNoteMapper.merge_addon_changes(note, original_addon_note)
-        editor.loadNote()
+    settings = (formatter, config.formatter_concurrency)
+    if _editor_batch is None or (
+        settings != _editor_batch_settings and not _formatting
+    ):
+        if _editor_batch is not None:
+            _editor_batch.shutdown()
+        _editor_batch = BatchFormatter(formatter, config.formatter_concurrency)
+        _editor_batch_settings = settings
+    return _editor_batch
+
+
+def register_editor_batch_hooks() -> None:
+    """Stop the editor button's formatter threads with the profile."""
+    from aqt import gui_hooks
+
+    gui_hooks.profile_will_close.append(_shutdown_editor_batch)
+
+
+def _shutdown_editor_batch() -> None:
+    global _editor_batch, _editor_batch_settings
+    if _editor_batch is not None:
+        # Drops queued notes; their wait_for() calls return None.
+        _editor_batch.shutdown()
+    _editor_batch = None
+    _editor_batch_settings = None
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from ...domain.entities.note import NoteId
+from ...domain.repositories.document_repository import (
+    DocumentRepository,
+    convert_addon_note_to_document,
+)
+from ...domain.repositories.note_repository import (
+    ChangeWatermark,
+    NoteRepository,
+)
+
+
+class IndexSyncCancelledError(Exception):
+    """Raised when a sync is cancelled part-way. The documents stored
+    before the cancellation stay; the next sync stores the rest."""
+
+
+class NoteIndex:
+    """Keeps a document repository in step with the notes of a collection.
+
+    The first sync() stores every note; later ones ask the note
+    repository which notes were added, edited or deleted since the
+    previous sync (changes_since), store only the added and edited
+    ones, and remove the documents of the deleted ones. Documents are
+    keyed by note guid, which is gone once a note is deleted, so the
+    index remembers the document id of each note it stored.
+
+    The watermark and document ids can be saved with the documents and
+    passed back in, so a later session resumes from the saved state.
+
+    Attributes:
+        documents: The repository kept in step.
+    """
+
+    def __init__(
+        self,
+        documents: DocumentRepository,
+        batch_size: int = 1000,
+        watermark: Optional[ChangeWatermark] = None,
+        doc_ids: Optional[dict[NoteId, str]] = None,
+    ) -> None:
+        self.documents = documents
+        self._batch_size = batch_size
+        self._watermark = watermark
+        self._doc_ids: dict[NoteId, str] = dict(doc_ids or {})
+
+    @property
+    def watermark(self) -> Optional[ChangeWatermark]:
+        """Where the last completed sync left off; None before it."""
+        return self._watermark
+
+    @property
+    def doc_ids(self) -> dict[NoteId, str]:
+        """Document id of each note stored, keyed by note id."""
+        return dict(self._doc_ids)
+
+    def sync(
+        self,
+        notes: NoteRepository,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """Bring the documents up to date with `notes`, loading `batch_size`
+        notes at a time.
+
+        After each batch the caller gets `on_progress(done, total)` and
+        a chance to stop: when `is_cancelled()` returns True,
+        IndexSyncCancelledError is raised.
+
+        Returns:
+            The number of notes added, edited or deleted since the
+            previous sync (all notes on the first).
+        """
+        changes = notes.changes_since(self._watermark)
+        # Deletions first, so a cancelled sync leaves no document of a
+        # deleted note behind.
+        deleted = [
+            self._doc_ids.pop(note_id)
+            for note_id in changes.removed
+            if note_id in self._doc_ids
+        ]
+        if deleted:
+            self.documents.remove(deleted)
+        changed = changes.added + changes.updated
+        for start in range(0, len(changed), self._batch_size):
+            if is_cancelled is not None and is_cancelled():
+                raise IndexSyncCancelledError(
+                    f"cancelled after {start} of {len(changed)} note(s)"
+                )
+            documents = []
+            stale = []
+            batch = notes.get_many(changed[start : start + self._batch_size])
+            for note_id, note in batch.items():
+                document = convert_addon_note_to_document(note)
+                previous = self._doc_ids.get(note_id, document.id)
+                if previous != document.id:
+                    # The note's guid changed (e.g. on re-import).
+                    stale.append(previous)
+                self._doc_ids[note_id] = document.id
+                documents.append(document)
+            self.documents.store_batch(documents)
+            if stale:
+                self.documents.remove(stale)
+            if on_progress is not None:
+                on_progress(
+                    min(start + self._batch_size, len(changed)), len(changed)
+                )
+        self._watermark = changes.watermark
+        return len(changes)
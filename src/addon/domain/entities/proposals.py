@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterator, Union
+from typing import Iterator, Optional, Union
 
 from .note import AddonNote, NoteId
 
@@ -11,13 +11,16 @@ class EditProposal:
     """Proposed modification of an existing note.
 
     Stores a snapshot of the note at proposal time (`before`) so the
-    change can be reviewed as a diff and stale proposals detected.
+    change can be reviewed as a diff, and the note's modification time
+    then (`before_mod`) so stale proposals are detected without
+    re-reading the note; without it, `before` is compared instead.
     """
 
     note_id: NoteId
     before: AddonNote
     after: AddonNote
     rationale: str
+    before_mod: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -30,12 +33,13 @@ class CreateProposal:
 
 @dataclass(frozen=True)
 class DeleteProposal:
-    """Proposed deletion of an existing note (`before` is the snapshot
-    at proposal time)."""
+    """Proposed deletion of an existing note (`before` and `before_mod`
+    are the snapshot at proposal time, as in EditProposal)."""
 
     note_id: NoteId
     before: AddonNote
     rationale: str
+    before_mod: Optional[int] = None
 
 
 Proposal = Union[EditProposal, CreateProposal, DeleteProposal]
@@ -60,39 +64,49 @@ class ProposedChangeSet:
     """
 
     def __init__(self) -> None:
-        self._proposals: list[Proposal] = []
+        # Ordered log keyed by insertion sequence number: dicts keep
+        # insertion order, so iteration follows the order proposals were
+        # recorded while a superseded edit is still dropped in O(1).
+        self._log: dict[int, Proposal] = {}
+        self._next_seq = 0
+        # Per-note indexes over the log, so conflict checks do not scan
+        # it. The invariants guarantee at most one pending edit per note.
+        self._pending_edits: dict[NoteId, int] = {}
+        self._deleted: set[NoteId] = set()
 
     def add_edit(self, proposal: EditProposal) -> None:
         self._ensure_not_deleted(proposal.note_id)
         self._remove_pending_edits(proposal.note_id)
-        self._proposals.append(proposal)
+        self._pending_edits[proposal.note_id] = self._append(proposal)
 
     def add_create(self, proposal: CreateProposal) -> None:
-        self._proposals.append(proposal)
+        self._append(proposal)
 
     def add_delete(self, proposal: DeleteProposal) -> None:
         self._ensure_not_deleted(proposal.note_id)
         self._remove_pending_edits(proposal.note_id)
-        self._proposals.append(proposal)
+        self._deleted.add(proposal.note_id)
+        self._append(proposal)
+
+    def _append(self, proposal: Proposal) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._log[seq] = proposal
+        return seq
 
     def _ensure_not_deleted(self, note_id: NoteId) -> None:
-        if any(
-            isinstance(p, DeleteProposal) and p.note_id == note_id
-            for p in self._proposals
-        ):
+        if note_id in self._deleted:
             raise ConflictingProposalError(
                 f"note {note_id} is already proposed for deletion"
             )
 
     def _remove_pending_edits(self, note_id: NoteId) -> None:
-        self._proposals = [
-            p
-            for p in self._proposals
-            if not (isinstance(p, EditProposal) and p.note_id == note_id)
-        ]
+        seq = self._pending_edits.pop(note_id, None)
+        if seq is not None:
+            del self._log[seq]
 
     def __iter__(self) -> Iterator[Proposal]:
-        return iter(self._proposals)
+        return iter(self._log.values())
 
     def __len__(self) -> int:
-        return len(self._proposals)
+        return len(self._log)
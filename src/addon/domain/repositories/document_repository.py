@@ -1,9 +1,17 @@
 import dataclasses
 from dataclasses import dataclass
-from typing import Any, Protocol
-from uuid import uuid4
+from typing import Any, Optional, Protocol
+from uuid import UUID, uuid5
 
-from ..entities.note import AddonNote
+from ..entities.note import AddonNote, AddonNoteType
+
+# Namespace for document ids derived from note guids (any fixed UUID
+# works; changing it would orphan every stored document).
+_NOTE_DOCUMENT_NAMESPACE = UUID("5f0c3a52-9d5e-4d8e-8a39-6a4f2c1b7e10")
+
+# Metadata keys (AddonNote fields) that searches can be filtered on;
+# repositories index them (e.g. Qdrant payload indexes).
+FILTERABLE_FIELDS = ("deck_name", "tags", "notetype")
 
 
 class DocumentNotFoundError(Exception):
@@ -32,6 +40,39 @@ class Document:
     metadata: dict[str, Any]
 
 
+@dataclass(frozen=True)
+class SearchFilter:
+    """Restricts a search to the notes of a deck, with a tag, or of a
+    notetype.
+
+    Every condition that is set must hold. Repositories apply the filter
+    while searching, so a filtered search still returns up to
+    `max_results` matching documents rather than the matching part of
+    an unfiltered top list.
+
+    Attributes:
+        deck: Exact deck name (subdecks are other decks).
+        tag: A tag the note must have.
+        notetype: The note's abstract note type.
+    """
+
+    deck: Optional[str] = None
+    tag: Optional[str] = None
+    notetype: Optional[AddonNoteType] = None
+
+    def conditions(self) -> list[tuple[str, str]]:
+        """(metadata key, required value) of each condition set; for
+        "tags" the value must be one of the list's items."""
+        conditions = []
+        if self.deck is not None:
+            conditions.append(("deck_name", self.deck))
+        if self.tag is not None:
+            conditions.append(("tags", self.tag))
+        if self.notetype is not None:
+            conditions.append(("notetype", self.notetype.value))
+        return conditions
+
+
 @dataclass
 class SearchQuery:
     """Represents a search query for finding similar documents.
@@ -42,10 +83,12 @@ class SearchQuery:
     Attributes:
         text: The query text to search for.
         max_results: Maximum number of results to return (default: 5).
+        filter: Only search documents matching it (default: all).
     """
 
     text: str
     max_results: int = 5
+    filter: Optional[SearchFilter] = None
 
 
 @dataclass
@@ -76,13 +119,27 @@ class DocumentRepository(Protocol):
     def store(self, document: Document) -> None: ...
 
     def store_batch(self, documents: list[Document]) -> None:
-        """Should be more efficient than individual store() calls."""
+        """Should be more efficient than individual store() calls.
+        Documents replace stored ones with the same id (upsert)."""
+        ...
+
+    def remove(self, doc_ids: list[str]) -> None:
+        """Delete the documents with these ids; ids not stored are
+        ignored."""
         ...
 
     def find_similar(self, query: SearchQuery) -> list[SearchResult]:
         """Returns results ordered by relevance score (descending)."""
         ...
 
+    def find_neighbors(
+        self, doc_ids: list[str], max_results: int
+    ) -> list[list[SearchResult]]:
+        """For each stored document, its most similar stored documents
+        (itself excluded), ordered by relevance score (descending).
+        Should batch the lookups rather than search one at a time."""
+        ...
+
     def find_by_id(self, doc_id: str) -> Document:
         """Retrieve a document by its unique identifier.
 
@@ -95,19 +152,29 @@ class DocumentRepository(Protocol):
 def convert_addon_note_to_document(note: AddonNote) -> Document:
     """Combines front/back/tags into searchable content; preserves
     original in metadata.
+
+    The id is derived from the note's guid, so converting the same note
+    again yields the same document id and storing it replaces the old
+    document instead of adding a duplicate.
     """
     tags = ""
     if note.tags:
         tags = " ".join([t for t in note.tags])
     extras = " ".join(note.extra_fields.values())
     return Document(
-        id=str(uuid4()),
+        id=document_id_for_note(note.guid),
         content=f"{note.front} {note.back} {tags} {extras}",
         source="",
         metadata=dataclasses.asdict(note),
     )
 
 
+def document_id_for_note(guid: str) -> str:
+    """Stable document id (a UUID, as vector stores like Qdrant require)
+    for the note with this guid."""
+    return str(uuid5(_NOTE_DOCUMENT_NAMESPACE, guid))
+
+
 def convert_document_to_addon_note(document: Document) -> AddonNote:
     """Reconstructs from metadata - assumes document was created via
     convert_addon_note_to_document.
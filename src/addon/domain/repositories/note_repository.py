@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Protocol
+from dataclasses import dataclass
+from typing import ContextManager, Optional, Protocol
 
 from ..entities.note import AddonNote, NoteId
 
@@ -13,6 +14,43 @@ class InvalidSearchQueryError(Exception):
     """Raised when the backend cannot parse a search query."""
 
 
+@dataclass(frozen=True)
+class ChangeWatermark:
+    """Position in the collection's change history.
+
+    Returned by NoteRepository.changes_since; callers store it and pass
+    it back on the next call to get only what changed in between.
+
+    Attributes:
+        mod: Highest note modification time seen (Anki: epoch seconds).
+        note_ids: Ids of the notes that existed at that point, so notes
+            removed since then can be reported.
+    """
+
+    mod: int = 0
+    note_ids: frozenset[NoteId] = frozenset()
+
+
+@dataclass(frozen=True)
+class NoteChanges:
+    """Notes added, updated or removed since a ChangeWatermark.
+
+    Attributes:
+        added: Ids of notes not present at the previous watermark.
+        updated: Ids of notes present before and modified since.
+        removed: Ids of notes present before and gone now.
+        watermark: Pass this to the next changes_since call.
+    """
+
+    added: list[NoteId]
+    updated: list[NoteId]
+    removed: list[NoteId]
+    watermark: ChangeWatermark
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.removed)
+
+
 class NoteRepository(Protocol):
     """Repository port for notes in the user's collection.
 
@@ -36,6 +74,22 @@ class NoteRepository(Protocol):
         """
         ...
 
+    def get_many(self, note_ids: list[NoteId]) -> dict[NoteId, AddonNote]:
+        """Retrieve several notes at once, keyed by id. Ids that do not
+        exist are left out of the result instead of raising."""
+        ...
+
+    def get_mods(self, note_ids: list[NoteId]) -> dict[NoteId, int]:
+        """Modification time of each note (Anki's `mod`, in seconds),
+        keyed by id, read without loading the notes. Ids that do not
+        exist are left out of the result."""
+        ...
+
+    def find_ids_by_guid(self, guids: list[str]) -> dict[str, NoteId]:
+        """Ids of the notes with these guids (AddonNote.guid), keyed by
+        guid. Guids without a note are left out of the result."""
+        ...
+
     def update(self, note_id: NoteId, note: AddonNote) -> None:
         """Replace the content of an existing note (fields and tags).
 
@@ -44,10 +98,24 @@ class NoteRepository(Protocol):
         """
         ...
 
+    def update_many(self, notes: dict[NoteId, AddonNote]) -> None:
+        """Replace the content of several existing notes in one write.
+
+        Raises:
+            NoteNotFoundError: If any id does not exist; nothing is
+                written in that case.
+        """
+        ...
+
     def add(self, note: AddonNote, deck_name: str) -> NoteId:
         """Store a new note in the given deck; return its id."""
         ...
 
+    def add_many(self, notes: list[AddonNote], deck_name: str) -> list[NoteId]:
+        """Store several new notes in the given deck in one write;
+        return their ids in the order given."""
+        ...
+
     def remove(self, note_ids: list[NoteId]) -> None:
         """Delete notes (and their cards) from the collection.
 
@@ -55,3 +123,26 @@ class NoteRepository(Protocol):
             NoteNotFoundError: If any id does not exist.
         """
         ...
+
+    def transaction(self, label: str) -> ContextManager[None]:
+        """Group the writes made inside the block into one step the user
+        can undo as a whole (named `label`). If the block raises, every
+        write made inside it is rolled back before the error propagates.
+        """
+        ...
+
+    def changes_since(
+        self, watermark: Optional[ChangeWatermark] = None
+    ) -> NoteChanges:
+        """Return the notes added, updated or removed since `watermark`.
+
+        Without a watermark every note is reported as added. Derived
+        data (indexes, counts) can store the returned watermark and
+        update itself in O(changes) instead of re-reading every note.
+
+        Delivery is at-least-once: a note may be reported as updated
+        more than once (e.g. one modified in the same clock tick the
+        watermark was taken), so callers must treat updates as
+        idempotent.
+        """
+        ...
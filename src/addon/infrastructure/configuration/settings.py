@@ -32,6 +32,32 @@ class AddonConfig:
             basic notes. Must use the standard "Front"/"Back" fields.
         cloze_notetype: Name of the Anki notetype used when creating
             cloze notes. Must use the standard "Text"/"Back Extra" fields.
+        formatter_concurrency: How many notes the batch formatter sends
+            to the LLM server at once when preparing flagged notes for
+            review (at least 1).
+        formatter_lookahead: How many notes past the current one the
+            review editor formats ahead of the user; 0 formats every
+            flagged note in the deck in the background as soon as the
+            review starts.
+        formatter_cache_max_mb: Size budget of the on-disk cache of
+            formatter results; least recently used entries are evicted
+            beyond it. 0 disables the cache.
+        formatter_output_mode: "rewrite" to have the LLM return the
+            whole formatted note, or "edits" to have it return targeted
+            replacements that are applied locally (falling back to a
+            rewrite when they do not apply).
+        clear_flags_at_session_end: When True, the review editor clears
+            the orange flags of saved notes in one batch when the
+            session ends, rather than as each note is saved.
+        embedding_model: Name of the sentence-transformers model that
+            embeds notes for the curator's similar-note search.
+        rerank_model: Name of a cross-encoder (e.g.
+            "cross-encoder/stsb-TinyBERT-L4") that rescores similar-note
+            candidates on CPU; None (the default) disables reranking.
+        rerank_candidates: How many top candidates of the vector search
+            the cross-encoder rescores (k).
+        rerank_min_score: Candidates scoring below this after reranking
+            are dropped; None keeps them all.
     """
 
     def __init__(self, config_provider: ConfigProvider) -> None:
@@ -55,7 +81,7 @@ class AddonConfig:
 
         mode = raw.get("openai_mode", "v1/chat/completions")
         self.url = f"http://{host}:{port}/{mode}"
-        self.model_name = model_name
+        self.model_name = str(model_name)
         self.temperature = float(raw.get("openai_temperature", 0.0))
         self.max_tokens = int(raw.get("openai_max_tokens", 200))
 
@@ -77,3 +103,65 @@ class AddonConfig:
         # Notetypes used when the curator creates notes
         self.basic_notetype = raw.get("basic_notetype_name", "Basic")
         self.cloze_notetype = raw.get("cloze_notetype_name", "Cloze")
+
+        # Parallel formatter requests when preparing a review session
+        self.formatter_concurrency = int(raw.get("formatter_concurrency", 4))
+        self.formatter_lookahead = int(raw.get("formatter_lookahead", 5))
+        if self.formatter_concurrency < 1:
+            raise ValueError(
+                "formatter_concurrency must be at least 1, got "
+                f"{self.formatter_concurrency}"
+            )
+        if self.formatter_lookahead < 0:
+            raise ValueError(
+                "formatter_lookahead must not be negative, got "
+                f"{self.formatter_lookahead}"
+            )
+        self.formatter_cache_max_mb = float(
+            raw.get("formatter_cache_max_mb", 20)
+        )
+        self.formatter_output_mode = raw.get(
+            "formatter_output_mode", "rewrite"
+        )
+        if self.formatter_output_mode not in ("rewrite", "edits"):
+            raise ValueError(
+                "formatter_output_mode must be 'rewrite' or 'edits', got "
+                f"{self.formatter_output_mode!r}"
+            )
+
+        # Review editor: clear flags of saved notes in one end-of-session
+        # batch instead of per note
+        self.clear_flags_at_session_end = _clear_flags_at_session_end(raw)
+
+        # Similar-note search: embedding model and optional
+        # cross-encoder rerank stage
+        self.embedding_model = str(
+            raw.get(
+                "embedding_model", "sentence-transformers/all-MiniLM-L6-v2"
+            )
+        )
+        self.rerank_model = raw.get("rerank_model") or None
+        self.rerank_candidates = int(raw.get("rerank_candidates", 20))
+        self.rerank_min_score = (
+            float(raw["rerank_min_score"])
+            if raw.get("rerank_min_score") is not None
+            else None
+        )
+
+
+def read_clear_flags_at_session_end(config_provider: ConfigProvider) -> bool:
+    """Read clear_flags_at_session_end alone, without requiring the LLM
+    settings AddonConfig validates: the review editor needs it even when
+    no formatter can be built.
+
+    Raises:
+        RuntimeError: If the addon config is not initialized.
+    """
+    raw = config_provider.getConfig("anki-addon")
+    if raw is None:
+        raise RuntimeError("Addon config not initialized")
+    return _clear_flags_at_session_end(raw)
+
+
+def _clear_flags_at_session_end(raw: dict) -> bool:
+    return bool(raw.get("clear_flags_at_session_end", False))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import Union
+from typing import Any, Union
 
 import requests
 import requests.exceptions
@@ -71,6 +71,7 @@ class OpenAIClient:
         if self._config.min_p is not None:
             optional_params["min_p"] = self._config.min_p
 
+        payload: dict[str, Any]
         if self._is_chat_completion:
             payload = {
                 "model": self._config.model_name,
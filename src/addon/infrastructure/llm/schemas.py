@@ -19,12 +19,42 @@ class AddonNoteChanges(BaseModel):
     back: str
 
 
+class NoteEdit(BaseModel):
+    """One targeted replacement within a note field.
+
+    Attributes:
+        field: Which field to edit ("front" or "back").
+        find: Text copied verbatim from the field; must occur exactly
+            once in it.
+        replace: Text to put in its place.
+    """
+
+    field: Literal["front", "back"]
+    find: str
+    replace: str
+
+
+class AddonNoteEdits(BaseModel):
+    """Pydantic schema for the formatter's edit-script output mode:
+    a list of replacements, applied in order, instead of the full
+    rewritten note. Much shorter than AddonNoteChanges when the fix is
+    small."""
+
+    edits: list[NoteEdit]
+
+
 class SearchNotesAction(BaseModel):
     action: Literal["search_notes"]
     query: str
     limit: int = 10
 
 
+class FindSimilarNotesAction(BaseModel):
+    action: Literal["find_similar_notes"]
+    text: str
+    limit: int = 10
+
+
 class ReadNoteAction(BaseModel):
     action: Literal["read_note"]
     note_id: int
@@ -85,6 +115,7 @@ class FinishAction(BaseModel):
 
 AgentAction = Union[
     SearchNotesAction,
+    FindSimilarNotesAction,
     ReadNoteAction,
     ProposeEditAction,
     ProposeCreateAction,
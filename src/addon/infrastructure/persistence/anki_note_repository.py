@@ -1,19 +1,65 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, cast
 
 from ...application.services.formatter_service import AnkiNoteMapper
 from ...domain.entities.note import AddonNote, AddonNoteType, NoteId
 from ...domain.repositories.note_repository import (
+    ChangeWatermark,
     InvalidSearchQueryError,
+    NoteChanges,
     NoteNotFoundError,
 )
+from ...utils import ensure_db
 
 if TYPE_CHECKING:
-    from anki.collection import Collection
+    from anki.collection import AddNoteRequest, Collection, UndoStatus
+    from anki.decks import DeckId
+    from anki.models import NotetypeDict, NotetypeId
     from anki.notes import Note
     from anki.notes import NoteId as AnkiNoteId
 
+# Values bound per `in (...)` query, below SQLite's parameter limit.
+_GUID_CHUNK = 500
+
+
+class _NoteRow:
+    """Read-only stand-in for anki.notes.Note built from a row of the
+    notes table, with the part of the Note interface AnkiNoteMapper
+    reads (fields by name, guid, tags, note_type())."""
+
+    def __init__(
+        self, guid: str, notetype: NotetypeDict, flds: str, tags: str
+    ) -> None:
+        self.guid = guid
+        self.tags = tags.split()
+        self._notetype = notetype
+        names = [field["name"] for field in notetype["flds"]]
+        self._fields = dict(zip(names, flds.split("\x1f")))
+
+    def note_type(self) -> NotetypeDict:
+        return self._notetype
+
+    def keys(self) -> list[str]:
+        return list(self._fields)
+
+    def __getitem__(self, key: str) -> str:
+        return self._fields[key]
+
+
+@dataclass
+class _AddNoteRequest:
+    """Structural stand-in for anki.collection.AddNoteRequest, which
+    Collection.add_notes only reads by attribute. Importing anki just
+    to build requests would cost ~1s at runtime."""
+
+    note: Note
+    deck_id: DeckId
+
 
 class AnkiNoteRepository:
     """NoteRepository adapter over a live Anki collection.
@@ -24,6 +70,10 @@ class AnkiNoteRepository:
     (basic/cloze) to a concrete Anki notetype via the configured names;
     those notetypes must use the standard field names ("Front"/"Back"
     resp. "Text"/"Back Extra"), as AnkiNoteMapper assumes them.
+
+    Notes read from the collection carry the deck of their first card
+    (its home deck while it sits in a filtered deck) as `deck_name`, so
+    documents built from them can be filtered by deck.
     """
 
     def __init__(
@@ -51,14 +101,172 @@ class AnkiNoteRepository:
         return [NoteId(int(nid)) for nid in note_ids[:limit]]
 
     def get(self, note_id: NoteId) -> AddonNote:
-        return AnkiNoteMapper.to_addon_note(self._get_anki_note(note_id))
+        note = AnkiNoteMapper.to_addon_note(self._get_anki_note(note_id))
+        note.deck_name = self._deck_names([note_id]).get(note_id)
+        return note
+
+    def get_many(self, note_ids: list[NoteId]) -> dict[NoteId, AddonNote]:
+        # Read from the notes table rather than with one get_note per
+        # id: a chunk of notes costs one query, and no Note is built.
+        rows: dict[NoteId, _NoteRow] = {}
+        notetypes: dict[int, NotetypeDict] = {}
+        for start in range(0, len(note_ids), _GUID_CHUNK):
+            chunk = note_ids[start : start + _GUID_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for nid, guid, mid, flds, tags in ensure_db(self._col).all(
+                "select id, guid, mid, flds, tags from notes "
+                f"where id in ({placeholders})",
+                *chunk,
+            ):
+                if mid not in notetypes:
+                    notetypes[mid] = self._notetype(mid)
+                rows[NoteId(int(nid))] = _NoteRow(
+                    guid, notetypes[mid], flds, tags
+                )
+        notes = {
+            note_id: AnkiNoteMapper.to_addon_note(cast("Note", rows[note_id]))
+            for note_id in note_ids
+            if note_id in rows
+        }
+        deck_names = self._deck_names(list(notes))
+        for note_id, note in notes.items():
+            note.deck_name = deck_names.get(note_id)
+        return notes
+
+    def get_mods(self, note_ids: list[NoteId]) -> dict[NoteId, int]:
+        mods = {}
+        # One indexed query per chunk over the notes table, as in
+        # changes_since: no Note objects are built.
+        for start in range(0, len(note_ids), _GUID_CHUNK):
+            chunk = note_ids[start : start + _GUID_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for nid, mod in ensure_db(self._col).all(
+                f"select id, mod from notes where id in ({placeholders})",
+                *chunk,
+            ):
+                mods[NoteId(int(nid))] = int(mod)
+        return mods
+
+    def find_ids_by_guid(self, guids: list[str]) -> dict[str, NoteId]:
+        ids = {}
+        # Chunked to stay below SQLite's limit on bound parameters.
+        for start in range(0, len(guids), _GUID_CHUNK):
+            chunk = guids[start : start + _GUID_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for guid, nid in ensure_db(self._col).all(
+                f"select guid, id from notes where guid in ({placeholders})",
+                *chunk,
+            ):
+                ids[guid] = NoteId(int(nid))
+        return ids
 
     def update(self, note_id: NoteId, note: AddonNote) -> None:
         anki_note = self._get_anki_note(note_id)
         AnkiNoteMapper.merge_addon_changes(anki_note, note, include_tags=True)
         self._col.update_note(anki_note)
 
+    def update_many(self, notes: dict[NoteId, AddonNote]) -> None:
+        if not notes:
+            return
+        missing = set(notes) - self._existing(list(notes))
+        if missing:
+            raise NoteNotFoundError(f"notes {sorted(missing)} not found")
+        anki_notes = []
+        for note_id, note in notes.items():
+            anki_note = self._col.get_note(cast("AnkiNoteId", note_id))
+            AnkiNoteMapper.merge_addon_changes(
+                anki_note, note, include_tags=True
+            )
+            anki_notes.append(anki_note)
+        # One backend op for the whole batch instead of one per note.
+        self._col.update_notes(anki_notes)
+
     def add(self, note: AddonNote, deck_name: str) -> NoteId:
+        anki_note, deck_id = self._new_anki_note(note, deck_name)
+        self._col.add_note(anki_note, deck_id)
+        return NoteId(anki_note.id)
+
+    def add_many(self, notes: list[AddonNote], deck_name: str) -> list[NoteId]:
+        if not notes:
+            return []
+        requests = [
+            _AddNoteRequest(*self._new_anki_note(note, deck_name))
+            for note in notes
+        ]
+        self._col.add_notes(cast("list[AddNoteRequest]", requests))
+        return [NoteId(request.note.id) for request in requests]
+
+    def remove(self, note_ids: list[NoteId]) -> None:
+        missing = set(note_ids) - self._existing(note_ids)
+        if missing:
+            raise NoteNotFoundError(f"notes {sorted(missing)} not found")
+        # cast: anki's NoteId/DeckId are NewTypes over int; the cast is
+        # free at runtime and avoids importing anki for the conversion.
+        self._col.remove_notes(cast("list[AnkiNoteId]", note_ids))
+
+    @contextmanager
+    def transaction(self, label: str) -> Generator[None]:
+        # Every backend op inside the block is merged into one custom
+        # undo entry; on failure that entry is undone, which rolls back
+        # the writes that already went through.
+        before = self._col.undo_status()
+        undo_target = self._col.add_custom_undo_entry(label)
+        try:
+            yield
+        except BaseException:
+            self._col.merge_undo_entries(undo_target)
+            self._col.undo()
+            self._discard_redo(label, before)
+            raise
+        self._col.merge_undo_entries(undo_target)
+
+    def _discard_redo(self, label: str, before: UndoStatus) -> None:
+        """Drop the rolled-back batch from the redo stack, so Edit >
+        Redo cannot re-apply what the user abandoned."""
+        # Any new undo step clears the redo stack. The empty step is
+        # then folded into the one preceding the transaction, leaving
+        # the undo history as it was; with no such step it stays, and
+        # undoing it changes nothing.
+        self._col.add_custom_undo_entry(label)
+        if before.undo:
+            self._col.merge_undo_entries(before.last_step)
+
+    def changes_since(
+        self, watermark: Optional[ChangeWatermark] = None
+    ) -> NoteChanges:
+        watermark = watermark or ChangeWatermark()
+        # A single query over the notes table for (id, mod): no Note
+        # objects are built, so the cost is one indexed scan regardless
+        # of how much the caller then has to re-derive.
+        rows = ensure_db(self._col).all("select id, mod from notes")
+        added: list[NoteId] = []
+        updated: list[NoteId] = []
+        current_ids = set()
+        max_mod = watermark.mod
+        for nid, mod in rows:
+            note_id = NoteId(nid)
+            current_ids.add(note_id)
+            if note_id not in watermark.note_ids:
+                added.append(note_id)
+            elif mod > watermark.mod:
+                updated.append(note_id)
+            max_mod = max(max_mod, mod)
+        removed = sorted(watermark.note_ids - current_ids)
+        # Anki's mod has one-second resolution: a note edited later in
+        # the second this feed was read would share the watermark's mod
+        # and be missed. Holding the watermark back while that second is
+        # still open re-reports such notes once instead.
+        max_mod = min(max_mod, int(time.time()) - 1)
+        return NoteChanges(
+            added=added,
+            updated=updated,
+            removed=removed,
+            watermark=ChangeWatermark(max_mod, frozenset(current_ids)),
+        )
+
+    def _new_anki_note(
+        self, note: AddonNote, deck_name: str
+    ) -> tuple[Note, DeckId]:
         notetype_name = (
             self._cloze_notetype
             if note.notetype == AddonNoteType.CLOZE
@@ -75,15 +283,7 @@ class AnkiNoteRepository:
             raise RuntimeError(f"Deck {deck_name!r} not found.")
         anki_note = self._col.new_note(notetype)
         AnkiNoteMapper.merge_addon_changes(anki_note, note, include_tags=True)
-        self._col.add_note(anki_note, deck_id)
-        return NoteId(anki_note.id)
-
-    def remove(self, note_ids: list[NoteId]) -> None:
-        for note_id in note_ids:
-            self._ensure_exists(note_id)
-        # cast: anki's NoteId/DeckId are NewTypes over int; the cast is
-        # free at runtime and avoids importing anki for the conversion.
-        self._col.remove_notes(cast("list[AnkiNoteId]", note_ids))
+        return anki_note, deck_id
 
     def _get_anki_note(self, note_id: NoteId) -> Note:
         self._ensure_exists(note_id)
@@ -95,3 +295,35 @@ class AnkiNoteRepository:
         # avoids importing anki.errors in the happy path.
         if not self._col.find_notes(f"nid:{note_id}"):
             raise NoteNotFoundError(f"note {note_id} not found")
+
+    def _notetype(self, mid: int) -> NotetypeDict:
+        notetype = self._col.models.get(cast("NotetypeId", mid))
+        if notetype is None:
+            raise RuntimeError(f"Notetype {mid} not found.")
+        return notetype
+
+    def _deck_names(self, note_ids: list[NoteId]) -> dict[NoteId, str]:
+        """Deck name of each note's first card (by template order), in
+        one query over the cards table per chunk of ids."""
+        if not note_ids:
+            return {}
+        names = {d.id: d.name for d in self._col.decks.all_names_and_ids()}
+        deck_names: dict[NoteId, str] = {}
+        for start in range(0, len(note_ids), _GUID_CHUNK):
+            chunk = note_ids[start : start + _GUID_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for nid, did, odid in ensure_db(self._col).all(
+                "select nid, did, odid from cards "
+                f"where nid in ({placeholders}) order by nid, ord",
+                *chunk,
+            ):
+                # odid is the home deck of a card in a filtered deck.
+                deck_names.setdefault(NoteId(int(nid)), names[odid or did])
+        return deck_names
+
+    def _existing(self, note_ids: list[NoteId]) -> set[NoteId]:
+        # One search for the whole batch: nid: accepts a comma list.
+        if not note_ids:
+            return set()
+        query = "nid:" + ",".join(str(note_id) for note_id in note_ids)
+        return {NoteId(int(nid)) for nid in self._col.find_notes(query)}
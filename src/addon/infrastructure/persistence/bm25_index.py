@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from ...application.services.plain_text import plain_text
+from ...domain.repositories.document_repository import (
+    Document,
+    SearchFilter,
+)
+from .payload_index import PayloadIndex
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a note field, HTML tags removed."""
+    return _TOKEN_RE.findall(plain_text(text).lower())
+
+
+class BM25Index:
+    """In-memory inverted index ranking documents with Okapi BM25.
+
+    Finds exact terms (names, identifiers, rare words) that dense
+    embeddings tend to blur. Each document gets a slot number; postings
+    map each term to the term frequency in every slot containing it.
+    A query scores only the postings of its terms, as NumPy arrays
+    (built on first use and rebuilt when the term's postings change):
+    common words appear in most notes, and looping over their postings
+    in Python would dominate the query time.
+
+    Attributes:
+        k1: Term frequency saturation.
+        b: Document length normalization (0 = none, 1 = full).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, int]] = {}
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._slots: dict[str, int] = {}
+        # Indexed by slot; removed documents leave None and length 0.
+        self._documents: list[Optional[Document]] = []
+        self._lengths: list[int] = []
+        self._norms: Optional[np.ndarray] = None
+        self._payload = PayloadIndex()
+
+    def add(self, documents: list[Document]) -> None:
+        """Index `documents`, replacing those with the same id."""
+        for doc in documents:
+            self.remove(doc.id)
+            slot = self._slots[doc.id] = len(self._documents)
+            self._documents.append(doc)
+            terms = Counter(tokenize(doc.content))
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[slot] = count
+                self._arrays.pop(term, None)
+            self._lengths.append(sum(terms.values()))
+            self._payload.add(slot, doc)
+        self._norms = None
+
+    def remove(self, doc_id: str) -> None:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        doc = self._documents[slot]
+        assert doc is not None
+        for term in set(tokenize(doc.content)):
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+        self._payload.remove(slot, doc)
+        self._documents[slot] = None
+        self._lengths[slot] = 0
+        self._norms = None
+
+    def search(
+        self, text: str, limit: int, where: Optional[SearchFilter] = None
+    ) -> list[tuple[Document, float]]:
+        """The `limit` best-scoring documents for `text` (among those
+        matching `where`, if given), best first; documents sharing no
+        term with it are never returned."""
+        count = len(self._slots)
+        terms = [t for t in set(tokenize(text)) if t in self._postings]
+        if count == 0 or not terms or limit <= 0:
+            return []
+        norms = self._length_norms()
+        scores = np.zeros(len(self._documents), dtype=np.float32)
+        for term in terms:
+            slots, frequencies = self._term_arrays(term)
+            idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+            scores[slots] += (
+                idf
+                * frequencies
+                * (self.k1 + 1)
+                / (frequencies + norms[slots])
+            )
+        allowed = None if where is None else self._payload.positions(where)
+        if allowed is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            mask[allowed] = True
+            scores[~mask] = 0
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[
+                np.argpartition(-scores[matched], limit - 1)[:limit]
+            ]
+        best = matched[np.argsort(-scores[matched], kind="stable")]
+        return [
+            (self._documents[slot], float(scores[slot]))  # type: ignore[misc]
+            for slot in best.tolist()
+        ]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _term_arrays(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64),
+                np.fromiter(postings.values(), dtype=np.float32),
+            )
+        return arrays
+
+    def _length_norms(self) -> np.ndarray:
+        """k1 * (1 - b + b * length / average length) of every slot."""
+        if self._norms is None:
+            lengths = np.asarray(self._lengths, dtype=np.float32)
+            average = lengths.sum() / max(len(self._slots), 1)
+            self._norms = self.k1 * (
+                1 - self.b + self.b * lengths / max(average, 1e-9)
+            )
+        return self._norms
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Optional, Union, overload
+
+import numpy as np
+
+from ...infrastructure.protocols import EmbeddingModel
+
+_VECTORS_FILE = "embeddings.f32"
+_INDEX_FILE = "embeddings.keys"
+
+
+class MemmapEmbeddingCache:
+    """Embeddings keyed by a hash of the model id and the text.
+
+    Vectors are rows of a float32 file memory-mapped with NumPy, so
+    opening the cache maps it instead of reading it into memory. A
+    sidecar text file lists the key of each row, in row order, after a
+    header naming the model. Both files only grow by appending (the
+    vectors file doubling in size at a time), so storing a vector costs
+    one row whatever the size of the cache. Rows of notes that were
+    edited or deleted stay behind until `compact()` rewrites the files
+    without them.
+
+    A different model id (or embedding size) in the sidecar starts the
+    cache afresh, since the old vectors are of no use to the new model.
+    Only one instance may have a directory open at a time.
+    """
+
+    def __init__(
+        self,
+        directory: Union[Path, str],
+        model_id: str,
+        dim: int,
+        initial_rows: int = 1024,
+    ) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._model_id = model_id
+        self._dim = dim
+        self._lock = threading.Lock()
+        self._rows, self._next_row = self._read_index()
+        self._vectors = self._open(max(initial_rows, self._next_row))
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{self._model_id}\0{text}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, keys: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """The cached vector of each key (a copy, not a view of the
+        mapped file), or None if not cached."""
+        with self._lock:
+            return [
+                np.array(self._vectors[row]) if row is not None else None
+                for row in (self._rows.get(key) for key in keys)
+            ]
+
+    def put(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Cache `vectors`, one row per key."""
+        with self._lock:
+            added = []
+            for key, vector in zip(keys, vectors):
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._next_row
+                    if row == len(self._vectors):
+                        self._unmap()
+                        self._vectors = self._open(2 * row)
+                    self._rows[key] = row
+                    self._next_row += 1
+                    added.append(key)
+                self._vectors[row] = vector
+            self._append_index(added)
+
+    def compact(self, keep: Iterable[str]) -> int:
+        """Rewrite the cache keeping only the rows of the keys in `keep`.
+
+        Returns:
+            The number of rows dropped.
+        """
+        with self._lock:
+            live = [k for k in dict.fromkeys(keep) if k in self._rows]
+            dropped = len(self._rows) - len(live)
+            if dropped == 0:
+                return 0
+            vectors = np.array(
+                self._vectors[[self._rows[k] for k in live]], dtype=np.float32
+            ).reshape(len(live), self._dim)
+            self._unmap()
+            tmp = self._dir / f"{_VECTORS_FILE}.tmp"
+            tmp.write_bytes(vectors.tobytes())
+            os.replace(tmp, self._dir / _VECTORS_FILE)
+            self._write_index(live)
+            self._rows = {k: row for row, k in enumerate(live)}
+            self._next_row = len(live)
+            self._vectors = self._open(max(1, len(live)))
+            return dropped
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _unmap(self) -> None:
+        """Flush and drop the mapping of the vectors file, which must
+        not be mapped while it is resized or replaced (Windows refuses
+        both). get() hands out copies, so no other view keeps it
+        mapped."""
+        self._vectors.flush()
+        del self._vectors
+
+    def _open(self, rows: int) -> np.memmap:
+        """Map the vectors file, growing it to at least `rows` rows."""
+        path = self._dir / _VECTORS_FILE
+        size = rows * self._dim * 4
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(
+            path, dtype=np.float32, mode="r+", shape=(rows, self._dim)
+        )
+
+    def _read_index(self) -> tuple[dict[str, int], int]:
+        """Row of each key, and the number of rows in use."""
+        path = self._dir / _INDEX_FILE
+        if path.exists():
+            header, *keys = path.read_text().splitlines()
+            if json.loads(header) == self._header():
+                return {key: row for row, key in enumerate(keys)}, len(keys)
+        (self._dir / _VECTORS_FILE).unlink(missing_ok=True)
+        self._write_index([])
+        return {}, 0
+
+    def _append_index(self, keys: list[str]) -> None:
+        # Vectors first: a key is never listed before its row is written.
+        self._vectors.flush()
+        with open(self._dir / _INDEX_FILE, "a") as f:
+            f.writelines(f"{key}\n" for key in keys)
+
+    def _write_index(self, keys: list[str]) -> None:
+        tmp = self._dir / f"{_INDEX_FILE}.tmp"
+        tmp.write_text(
+            "".join(
+                f"{line}\n" for line in [json.dumps(self._header())] + keys
+            )
+        )
+        os.replace(tmp, self._dir / _INDEX_FILE)
+
+    def _header(self) -> dict:
+        return {"model_id": self._model_id, "dim": self._dim}
+
+
+class CachedEmbeddingModel:
+    """EmbeddingModel that only encodes texts missing from the cache.
+
+    Only lists of texts, which repositories pass when storing documents,
+    are added to the cache. A single text is how repositories encode a
+    search query: it is served from the cache if there, but never added,
+    so queries do not accumulate in it.
+
+    Remembers every key of a list it served, so after encoding the whole
+    collection `compact()` drops the rows of notes that no longer exist
+    (or whose content changed).
+
+    Implements EmbeddingModel protocol.
+    """
+
+    def __init__(
+        self, encoder: EmbeddingModel, cache: MemmapEmbeddingCache
+    ) -> None:
+        self._encoder = encoder
+        self._cache = cache
+        self._used: dict[str, None] = {}
+        self.encoded = 0
+
+    @overload
+    def encode(self, sentences: str, batch_size: int = ...) -> np.ndarray: ...
+
+    @overload
+    def encode(
+        self, sentences: list[str], batch_size: int = ...
+    ) -> np.ndarray: ...
+
+    def encode(
+        self, sentences: Union[str, list[str]], batch_size: int = 32
+    ) -> np.ndarray:
+        if isinstance(sentences, str):
+            (cached,) = self._cache.get([self._cache.key(sentences)])
+            if cached is not None:
+                return cached
+            return np.asarray(
+                self._encoder.encode([sentences], batch_size=batch_size),
+                dtype=np.float32,
+            )[0]
+        keys = [self._cache.key(text) for text in sentences]
+        self._used.update(dict.fromkeys(keys))
+        cached = self._cache.get(keys)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        vectors = np.empty(
+            (len(sentences), self.get_sentence_embedding_dimension()),
+            dtype=np.float32,
+        )
+        if missing:
+            encoded = np.asarray(
+                self._encoder.encode(
+                    [sentences[i] for i in missing], batch_size=batch_size
+                ),
+                dtype=np.float32,
+            )
+            self._cache.put([keys[i] for i in missing], encoded)
+            vectors[missing] = encoded
+            self.encoded += len(missing)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                vectors[i] = vector
+        return vectors
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._encoder.get_sentence_embedding_dimension()
+
+    def compact(self) -> int:
+        """Drop cached rows not used since this model was created.
+
+        Only call it after encoding the full collection (e.g. after
+        SimilarNoteFinder.load_collection()), or live rows are lost.
+
+        Returns:
+            The number of rows dropped.
+        """
+        return self._cache.compact(self._used)
+
+
+def create_embedding_cache(model_id: str, dim: int) -> MemmapEmbeddingCache:
+    """Factory function to create the default embedding cache."""
+    # Stored next to the training dataset, outside the addon folder.
+    addon_dir = Path(__file__).parents[4]
+    return MemmapEmbeddingCache(
+        addon_dir / "data" / "embedding_cache", model_id, dim
+    )
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+
+@dataclass(frozen=True)
+class FormatterCacheStats:
+    """Size of a formatter cache (the hit rate is tracked by
+    NoteFormatter, which knows what each lookup was for).
+
+    Attributes:
+        entries: Number of cached results.
+        size_bytes: Total size of the cached values.
+    """
+
+    entries: int
+    size_bytes: int
+
+
+class SqliteFormatterCache:
+    """FormatterCache adapter persisting results in a SQLite file.
+
+    Entries are evicted least-recently-used first once the values add up
+    to more than `max_bytes`. SQLite keeps the cache across Anki
+    sessions and handles concurrent access from the batch formatter's
+    worker threads (serialized here through one connection and a lock).
+
+    Implements FormatterCache protocol.
+    """
+
+    def __init__(
+        self, path: Union[Path, str], max_bytes: int = 20_000_000
+    ) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "create table if not exists formatter_cache ("
+            " key text primary key,"
+            " value text not null,"
+            " size integer not null,"
+            " last_used integer not null)"
+        )
+        self._conn.execute(
+            "create index if not exists formatter_cache_last_used"
+            " on formatter_cache (last_used)"
+        )
+        self._conn.commit()
+        # Logical clock for recency: strictly increasing, so eviction
+        # order does not depend on wall-clock resolution.
+        (self._clock,) = self._conn.execute(
+            "select coalesce(max(last_used), 0) from formatter_cache"
+        ).fetchone()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "select value from formatter_cache where key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "update formatter_cache set last_used = ? where key = ?",
+                (self._tick(), key),
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "insert or replace into formatter_cache"
+                " (key, value, size, last_used) values (?, ?, ?, ?)",
+                (key, value, size, self._tick()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> FormatterCacheStats:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "select count(*), coalesce(sum(size), 0) from formatter_cache"
+            ).fetchone()
+            return FormatterCacheStats(entries, size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute(
+            "select coalesce(sum(size), 0) from formatter_cache"
+        ).fetchone()
+        if total <= self._max_bytes:
+            return
+        rows = self._conn.execute(
+            "select key, size from formatter_cache order by last_used"
+        )
+        evicted = []
+        for key, size in rows:
+            if total <= self._max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany(
+            "delete from formatter_cache where key = ?", evicted
+        )
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+
+def create_formatter_cache(max_bytes: int) -> SqliteFormatterCache:
+    """Factory function to create the default formatter cache."""
+    # Stored next to the training dataset, outside the addon folder.
+    addon_dir = Path(__file__).parents[4]
+    return SqliteFormatterCache(
+        addon_dir / "data" / "formatter_cache.sqlite3", max_bytes
+    )
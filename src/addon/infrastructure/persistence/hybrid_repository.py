@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import dataclasses
+
+from ...domain.repositories.document_repository import (
+    Document,
+    DocumentRepository,
+    SearchQuery,
+    SearchResult,
+)
+from .bm25_index import BM25Index
+
+
+class HybridDocumentRepository(DocumentRepository):
+    """Document repository combining lexical and dense search.
+
+    Wraps a dense repository (Qdrant, NumPy) and keeps a BM25 index of
+    the same documents in memory. find_similar() takes the top
+    `candidates` of both and merges them with reciprocal rank fusion:
+    a document scores sum(1 / (rrf_k + rank)) over the lists it appears
+    in, so paraphrases found only by the embeddings and exact terms
+    found only by BM25 both surface, and documents found by both rank
+    first. Relevance scores are these fused scores, not similarities.
+    A query's filter applies to both searches.
+
+    Everything else (neighbors, lookups by id) is the dense
+    repository's. The lexical index is rebuilt from what is stored in
+    each session, e.g. by SimilarNoteFinder.load_collection().
+
+    Implements DocumentRepository protocol.
+    """
+
+    def __init__(
+        self,
+        dense: DocumentRepository,
+        lexical: BM25Index | None = None,
+        rrf_k: int = 60,
+        candidates: int = 50,
+    ) -> None:
+        self._dense = dense
+        self._lexical = lexical if lexical is not None else BM25Index()
+        self._rrf_k = rrf_k
+        self._candidates = candidates
+
+    def store(self, document: Document) -> None:
+        self.store_batch([document])
+
+    def store_batch(self, documents: list[Document]) -> None:
+        self._dense.store_batch(documents)
+        self._lexical.add(documents)
+
+    def remove(self, doc_ids: list[str]) -> None:
+        self._dense.remove(doc_ids)
+        for doc_id in doc_ids:
+            self._lexical.remove(doc_id)
+
+    def find_similar(self, query: SearchQuery) -> list[SearchResult]:
+        depth = max(self._candidates, query.max_results)
+        dense = [
+            result.document
+            for result in self._dense.find_similar(
+                dataclasses.replace(query, max_results=depth)
+            )
+        ]
+        lexical = [
+            doc
+            for doc, _ in self._lexical.search(query.text, depth, query.filter)
+        ]
+        return self._fuse([dense, lexical])[: query.max_results]
+
+    def find_neighbors(
+        self, doc_ids: list[str], max_results: int
+    ) -> list[list[SearchResult]]:
+        return self._dense.find_neighbors(doc_ids, max_results)
+
+    def find_by_id(self, doc_id: str) -> Document:
+        return self._dense.find_by_id(doc_id)
+
+    def _fuse(self, rankings: list[list[Document]]) -> list[SearchResult]:
+        scores: dict[str, float] = {}
+        documents: dict[str, Document] = {}
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking, start=1):
+                scores[doc.id] = scores.get(doc.id, 0.0) + 1 / (
+                    self._rrf_k + rank
+                )
+                documents.setdefault(doc.id, doc)
+        ranked = sorted(scores, key=lambda doc_id: -scores[doc_id])
+        return [SearchResult(documents[d], scores[d]) for d in ranked]
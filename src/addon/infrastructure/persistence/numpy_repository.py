@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from ...domain.repositories.document_repository import (
+    Document,
+    DocumentNotFoundError,
+    DocumentRepository,
+    SearchFilter,
+    SearchQuery,
+    SearchResult,
+)
+from ...infrastructure.protocols import EmbeddingModel
+from .payload_index import PayloadIndex
+
+_VECTORS_FILE = "vectors.npy"
+_DOCUMENTS_FILE = "documents.json"
+
+# Queries scored at once, bounding the (queries x documents) score
+# matrix to a few hundred MB at 100k documents.
+_QUERY_BLOCK = 512
+
+# Rows of a float16 matrix converted to float32 at a time for scoring.
+_SCORE_BLOCK = 16_384
+
+
+class NumpyDocumentRepository(DocumentRepository):
+    """Document repository doing exact cosine search over a NumPy matrix.
+
+    Vectors are normalized when stored and kept as the rows of one
+    contiguous matrix, so a search is a matrix product followed by a
+    top-k selection (argpartition, then sorting only the k best). For
+    collections up to ~100k notes this is fast enough, exact, and does
+    not import qdrant_client, which is slow to import.
+
+    `dtype="float16"` halves the memory of the matrix; scores are still
+    computed in float32 a block of rows at a time, which makes queries
+    slower than with float32 storage.
+
+    Filtered queries score only the rows matching the filter, looked up
+    in an in-memory payload index.
+
+    Implements DocumentRepository protocol.
+    """
+
+    def __init__(
+        self,
+        encoder: EmbeddingModel,
+        batch_size: int = 64,
+        dtype: str = "float32",
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if dtype not in ("float32", "float16"):
+            raise ValueError(
+                f"dtype must be 'float32' or 'float16', got {dtype!r}"
+            )
+        self._encoder = encoder
+        self._batch_size = batch_size
+        self._documents: list[Document] = []
+        self._rows: dict[str, int] = {}
+        self._payload = PayloadIndex()
+        # Grown by doubling; only the first len(self._documents) rows
+        # are in use.
+        self._vectors = np.empty(
+            (0, encoder.get_sentence_embedding_dimension()), dtype=dtype
+        )
+
+    def store(self, document: Document) -> None:
+        self.store_batch([document])
+
+    def store_batch(self, documents: list[Document]) -> None:
+        # Later documents with the same id win, as with upserts.
+        changed = [
+            doc
+            for doc in {doc.id: doc for doc in documents}.values()
+            if self._stored(doc.id) != doc
+        ]
+        # Documents whose content is unchanged keep their vector.
+        to_embed = [
+            doc
+            for doc in changed
+            if getattr(self._stored(doc.id), "content", None) != doc.content
+        ]
+        vectors = self._embed([doc.content for doc in to_embed])
+
+        new = [doc for doc in changed if doc.id not in self._rows]
+        self._reserve(len(self._documents) + len(new))
+        for doc in changed:
+            row = self._rows.get(doc.id)
+            if row is None:
+                row = self._rows[doc.id] = len(self._documents)
+                self._documents.append(doc)
+            else:
+                self._payload.remove(row, self._documents[row])
+                self._documents[row] = doc
+            self._payload.add(row, doc)
+        for doc, vector in zip(to_embed, vectors):
+            self._vectors[self._rows[doc.id]] = vector
+
+    def remove(self, doc_ids: list[str]) -> None:
+        for doc_id in doc_ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            self._payload.remove(row, self._documents[row])
+            # The last row moves into the freed one, keeping the rows in
+            # use contiguous.
+            last = len(self._documents) - 1
+            moved = self._documents.pop()
+            if row != last:
+                self._payload.remove(last, moved)
+                self._documents[row] = moved
+                self._vectors[row] = self._vectors[last]
+                self._rows[moved.id] = row
+                self._payload.add(row, moved)
+
+    def find_similar(self, query: SearchQuery) -> list[SearchResult]:
+        return self.find_similar_batch([query])[0]
+
+    def find_similar_batch(
+        self, queries: list[SearchQuery]
+    ) -> list[list[SearchResult]]:
+        """find_similar() for many queries, embedded in one encoder call
+        and scored a block of queries (with the same filter) per matrix
+        product."""
+        if len(queries) == 1:
+            # One text, as encoders expect a search query (see
+            # CachedEmbeddingModel).
+            vectors = self._normalize(
+                np.asarray(
+                    self._encoder.encode(queries[0].text), dtype=np.float32
+                )[None]
+            )
+        else:
+            vectors = self._embed([query.text for query in queries])
+        by_filter: dict[Optional[SearchFilter], list[int]] = {}
+        for i, query in enumerate(queries):
+            by_filter.setdefault(query.filter, []).append(i)
+        results: list[list[SearchResult]] = [[] for _ in queries]
+        for where, indexes in by_filter.items():
+            rows = None if where is None else self._payload.positions(where)
+            for start in range(0, len(indexes), _QUERY_BLOCK):
+                block = indexes[start : start + _QUERY_BLOCK]
+                scores = self._scores(vectors[block], rows)
+                top = self._top_k(
+                    scores, max(queries[i].max_results for i in block), rows
+                )
+                for i, hits in zip(block, top):
+                    results[i] = hits[: queries[i].max_results]
+        return results
+
+    def find_neighbors(
+        self, doc_ids: list[str], max_results: int
+    ) -> list[list[SearchResult]]:
+        rows = [self._row(doc_id) for doc_id in doc_ids]
+        neighbors = []
+        for start in range(0, len(rows), _QUERY_BLOCK):
+            block = rows[start : start + _QUERY_BLOCK]
+            scores = self._scores(self._vectors[block].astype(np.float32))
+            # A document is not its own neighbor.
+            scores[np.arange(len(block)), block] = -np.inf
+            neighbors += self._top_k(
+                scores, min(max_results, len(self._documents) - 1)
+            )
+        return neighbors
+
+    def find_by_id(self, doc_id: str) -> Document:
+        return self._documents[self._row(doc_id)]
+
+    def documents(self) -> list[Document]:
+        """The stored documents, in row order."""
+        return list(self._documents)
+
+    def save(self, directory: Union[Path, str]) -> None:
+        """Write the vectors (.npy) and the documents (JSON) to
+        `directory`."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / _VECTORS_FILE, self._vectors[: len(self)])
+        (directory / _DOCUMENTS_FILE).write_text(
+            json.dumps([dataclasses.asdict(d) for d in self._documents])
+        )
+
+    @classmethod
+    def load(
+        cls,
+        directory: Union[Path, str],
+        encoder: EmbeddingModel,
+        batch_size: int = 64,
+    ) -> NumpyDocumentRepository:
+        """Open a repository written by save(), in the dtype it was
+        saved with.
+
+        Raises:
+            ValueError: If the vectors do not match the encoder's size.
+        """
+        directory = Path(directory)
+        vectors = np.load(directory / _VECTORS_FILE)
+        if vectors.shape[1] != encoder.get_sentence_embedding_dimension():
+            raise ValueError(
+                f"Saved vectors have {vectors.shape[1]} dimensions, the "
+                f"encoder {encoder.get_sentence_embedding_dimension()}"
+            )
+        repository = cls(encoder, batch_size, str(vectors.dtype))
+        repository._vectors = vectors
+        repository._documents = [
+            Document(**d)
+            for d in json.loads((directory / _DOCUMENTS_FILE).read_text())
+        ]
+        for row, doc in enumerate(repository._documents):
+            repository._rows[doc.id] = row
+            repository._payload.add(row, doc)
+        return repository
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _stored(self, doc_id: str) -> Optional[Document]:
+        row = self._rows.get(doc_id)
+        return None if row is None else self._documents[row]
+
+    def _row(self, doc_id: str) -> int:
+        try:
+            return self._rows[doc_id]
+        except KeyError:
+            raise DocumentNotFoundError(
+                f"Document with id '{doc_id}' not found"
+            ) from None
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        """Normalized float32 vectors of `texts`, one row per text."""
+        if not texts:
+            return np.empty((0, self._vectors.shape[1]), dtype=np.float32)
+        return self._normalize(
+            np.asarray(
+                self._encoder.encode(texts, batch_size=self._batch_size),
+                dtype=np.float32,
+            )
+        )
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= len(self._vectors):
+            return
+        grown = np.empty(
+            (max(rows, 2 * len(self._vectors)), self._vectors.shape[1]),
+            dtype=self._vectors.dtype,
+        )
+        grown[: len(self)] = self._vectors[: len(self)]
+        self._vectors = grown
+
+    def _scores(
+        self, queries: np.ndarray, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Cosine similarity of each query (row) to each document, or
+        to the documents of `rows` only."""
+        matrix = (
+            self._vectors[: len(self)] if rows is None else self._vectors[rows]
+        )
+        if matrix.dtype == np.float32:
+            return queries @ matrix.T
+        scores = np.empty((len(queries), len(matrix)), dtype=np.float32)
+        for start in range(0, len(matrix), _SCORE_BLOCK):
+            block = matrix[start : start + _SCORE_BLOCK].astype(np.float32)
+            scores[:, start : start + len(block)] = queries @ block.T
+        return scores
+
+    def _top_k(
+        self,
+        scores: np.ndarray,
+        k: int,
+        rows: Optional[np.ndarray] = None,
+    ) -> list[list[SearchResult]]:
+        """The k best documents of each row of `scores`, best first;
+        column j of `scores` is document `rows[j]` when given."""
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in scores]
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        if rows is not None:
+            best = rows[best]
+        return [
+            [
+                SearchResult(self._documents[row], float(score))
+                for row, score in zip(doc_rows, row_scores)
+            ]
+            for doc_rows, row_scores in zip(
+                best.tolist(), best_scores.tolist()
+            )
+        ]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import Optional
+
+import numpy as np
+
+from ...domain.repositories.document_repository import (
+    FILTERABLE_FIELDS,
+    Document,
+    SearchFilter,
+)
+
+
+class PayloadIndex:
+    """Inverted index from filterable metadata values to positions.
+
+    The in-memory counterpart of Qdrant's payload indexes, for
+    repositories that keep documents in numbered positions (matrix
+    rows, BM25 slots): for each (key, value) of FILTERABLE_FIELDS, the
+    positions of the documents having it. A filtered search then scores
+    only the positions matching the filter, instead of scoring
+    everything and discarding what does not match.
+    """
+
+    def __init__(self) -> None:
+        self._positions: dict[tuple[str, object], set[int]] = {}
+        # Sorted arrays of positions, built on first use and dropped
+        # when the set changes.
+        self._arrays: dict[tuple[str, object], np.ndarray] = {}
+
+    def add(self, position: int, document: Document) -> None:
+        for entry in _entries(document):
+            self._positions.setdefault(entry, set()).add(position)
+            self._arrays.pop(entry, None)
+
+    def remove(self, position: int, document: Document) -> None:
+        for entry in _entries(document):
+            positions = self._positions.get(entry)
+            if positions is None:
+                continue
+            positions.discard(position)
+            if not positions:
+                del self._positions[entry]
+            self._arrays.pop(entry, None)
+
+    def positions(self, where: SearchFilter) -> Optional[np.ndarray]:
+        """Sorted positions of the documents matching `where`, or None
+        if it sets no condition (every position matches)."""
+        conditions = where.conditions()
+        if not conditions:
+            return None
+        matching = [self._array(entry) for entry in conditions]
+        matching.sort(key=len)
+        result = matching[0]
+        for array in matching[1:]:
+            result = np.intersect1d(result, array, assume_unique=True)
+        return result
+
+    def _array(self, entry: tuple[str, object]) -> np.ndarray:
+        array = self._arrays.get(entry)
+        if array is None:
+            array = self._arrays[entry] = np.array(
+                sorted(self._positions.get(entry, ())), dtype=np.int64
+            )
+        return array
+
+
+def _entries(document: Document) -> set[tuple[str, object]]:
+    """(key, value) of each filterable metadata value of `document`;
+    list values (tags) give one entry per item, enum members (notetype)
+    their value, as in SearchFilter.conditions()."""
+    entries = set()
+    for key in FILTERABLE_FIELDS:
+        value = document.metadata.get(key)
+        if isinstance(value, Enum):
+            value = value.value
+        if isinstance(value, list):
+            entries.update((key, item) for item in value)
+        elif value is not None:
+            entries.add((key, value))
+    return entries
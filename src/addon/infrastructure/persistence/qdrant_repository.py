@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
+import warnings
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, cast
 
 from ...domain.repositories.document_repository import (
+    FILTERABLE_FIELDS,
     Document,
     DocumentNotFoundError,
     DocumentRepository,
+    SearchFilter,
     SearchQuery,
     SearchResult,
 )
@@ -15,20 +21,87 @@ if TYPE_CHECKING:
     # These dependencies are needed for type checking. We do not import these
     # dependencies at the top of file because they have slow side effects that
     # significantly increase the test suite execution time.
-    from qdrant_client.models import PointStruct
+    import numpy as np
+    from qdrant_client.models import Filter, PointStruct
+
+
+@dataclass(frozen=True)
+class VectorIndexConfig:
+    """How a Qdrant collection is provisioned.
+
+    Only a Qdrant server applies this configuration. Qdrant's local mode
+    (":memory:" or a path, as used by create_document_repository)
+    searches exhaustively and ignores the HNSW, on-disk and
+    quantization settings.
+
+    The defaults suit a personal collection (up to ~100k notes) held in
+    RAM. Trade-offs, estimated for a 50k-note, 384-dimension index (RAM
+    figures are computed from the storage sizes; int8 recall was
+    simulated with NumPy by scripts/bench_vector_index.py, not measured
+    on a Qdrant server; HNSW recall and latency were not measured):
+
+    - `hnsw_m` / `hnsw_ef_construct`: more graph links and a wider build
+      search raise recall at a given query latency, at the cost of
+      build time and ~8 * m bytes of RAM per note (~6.4 MB at m=16).
+    - `on_disk`: original vectors are memory-mapped from disk instead of
+      held in RAM, saving 4 * dimension bytes per note (~77 MB of the
+      default's ~83 MB); queries touching cold pages get slower.
+    - `quantize`: an int8 copy of each vector (1 byte per dimension,
+      kept in RAM) is searched first. Alone it finds ~90% of the true
+      top 10; Qdrant rescores candidates with the originals, which
+      brought recall back to ~100% in the simulation. Combined with
+      `on_disk` the index needs ~26 MB of RAM.
+
+    Attributes:
+        distance: Qdrant distance name ("Cosine", "Dot", "Euclid").
+        hnsw_m: Links per node in the HNSW graph.
+        hnsw_ef_construct: Candidates considered while building it.
+        on_disk: Keep original vectors on disk rather than in RAM.
+        quantize: Add int8 scalar quantization.
+    """
+
+    distance: str = "Cosine"
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    on_disk: bool = False
+    quantize: bool = False
 
 
 class QdrantDocumentRepository(DocumentRepository):
-    """Vector database adapter using Qdrant."""
+    """Vector database adapter using Qdrant.
+
+    store_batch() embeds and upserts `batch_size` documents at a time:
+    one encoder call per chunk uses the model's batched inference, and
+    chunking bounds memory when loading a whole collection. Documents
+    already stored unchanged are skipped, and ones whose content (hence
+    vector) is unchanged reuse the stored vector, so reloading a
+    persistent index (see create_document_repository) embeds only what
+    changed.
+
+    The collection is created on first use if it does not exist, sized
+    for the encoder's embeddings and set up per `index_config`, with a
+    keyword payload index on each filterable metadata field (deck,
+    tags, notetype): Qdrant applies a query's filter during the HNSW
+    search, using the indexes to pick matching points, so filtered
+    queries neither scan the whole collection nor lose results to
+    post-filtering.
+    """
 
     def __init__(
         self,
         encoder: EmbeddingModel,
         client: QdrantDriver | None = None,
         collection_name: str = "docs",
+        batch_size: int = 64,
+        index_config: VectorIndexConfig | None = None,
     ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
         self._collection_name = collection_name
         self._encoder = encoder
+        self._batch_size = batch_size
+        self._index_config = index_config or VectorIndexConfig()
+        self._provisioned = False
         self._client: QdrantDriver
         if client is None:
             from qdrant_client import QdrantClient as _QdrantClient
@@ -37,44 +110,181 @@ class QdrantDocumentRepository(DocumentRepository):
         else:
             self._client = client
 
-    def _create_point(self, document: Document) -> "PointStruct":
+    def _create_point(
+        self, document: Document, vector: Sequence[float] | np.ndarray
+    ) -> "PointStruct":
         from qdrant_client.models import PointStruct
 
         return PointStruct(
             id=document.id,
-            vector=cast(list[float], self._vectorize(document.content)),
-            payload={
-                "content": document.content,
-                "source": document.source,
-                "metadata": document.metadata,
-            },
+            vector=_as_list(vector),
+            payload=_payload(document),
         )
 
+    def _ensure_collection(self) -> None:
+        """Create the collection if it does not exist yet."""
+        if self._provisioned:
+            return
+        if not self._client.collection_exists(self._collection_name):
+            from qdrant_client.models import (
+                Distance,
+                HnswConfigDiff,
+                ScalarQuantization,
+                ScalarQuantizationConfig,
+                ScalarType,
+                VectorParams,
+            )
+
+            config = self._index_config
+            self._client.create_collection(
+                collection_name=self._collection_name,
+                vectors_config=VectorParams(
+                    size=self._encoder.get_sentence_embedding_dimension(),
+                    distance=Distance(config.distance),
+                    on_disk=config.on_disk,
+                ),
+                hnsw_config=HnswConfigDiff(
+                    m=config.hnsw_m, ef_construct=config.hnsw_ef_construct
+                ),
+                quantization_config=(
+                    ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True,
+                        )
+                    )
+                    if config.quantize
+                    else None
+                ),
+            )
+            self._create_payload_indexes()
+        self._provisioned = True
+
+    def _create_payload_indexes(self) -> None:
+        from qdrant_client.models import PayloadSchemaType
+
+        with warnings.catch_warnings():
+            # Local mode warns that it ignores payload indexes (it
+            # searches exhaustively, like it ignores the HNSW settings).
+            warnings.filterwarnings(
+                "ignore", message="Payload indexes have no effect"
+            )
+            for field in FILTERABLE_FIELDS:
+                self._client.create_payload_index(
+                    collection_name=self._collection_name,
+                    field_name=f"metadata.{field}",
+                    field_schema=PayloadSchemaType.KEYWORD,
+                )
+
     def store(self, document: Document) -> None:
-        point = self._create_point(document)
-        self._client.upsert(
-            collection_name=self._collection_name, points=[point]
-        )
+        self.store_batch([document])
 
     def store_batch(self, documents: list[Document]) -> None:
-        if not documents:
-            return
-        points = [self._create_point(doc) for doc in documents]
-        self._client.upsert(
-            collection_name=self._collection_name, points=points
-        )
+        self._ensure_collection()
+        for start in range(0, len(documents), self._batch_size):
+            chunk = documents[start : start + self._batch_size]
+            stored = {
+                doc_id: (payload, vector)
+                for doc_id, payload, vector in map(
+                    _point_fields,
+                    self._client.retrieve(
+                        collection_name=self._collection_name,
+                        ids=[doc.id for doc in chunk],
+                        with_payload=True,
+                        with_vectors=True,
+                    ),
+                )
+            }
+            points = []
+            to_embed = []
+            for doc in chunk:
+                payload, vector = stored.get(doc.id, ({}, None))
+                if payload == _payload(doc):
+                    continue
+                if (
+                    vector is not None
+                    and payload.get("content") == doc.content
+                ):
+                    points.append(self._create_point(doc, vector))
+                else:
+                    to_embed.append(doc)
+            if to_embed:
+                vectors = self._encoder.encode(
+                    [doc.content for doc in to_embed],
+                    batch_size=self._batch_size,
+                )
+                points += [
+                    self._create_point(doc, vector)
+                    for doc, vector in zip(to_embed, vectors)
+                ]
+            if points:
+                self._client.upsert(
+                    collection_name=self._collection_name, points=points
+                )
+
+    def remove(self, doc_ids: list[str]) -> None:
+        from qdrant_client.models import PointIdsList
+
+        self._ensure_collection()
+        for start in range(0, len(doc_ids), self._batch_size):
+            self._client.delete(
+                collection_name=self._collection_name,
+                points_selector=PointIdsList(
+                    points=list(doc_ids[start : start + self._batch_size])
+                ),
+            )
 
     def find_similar(self, query: SearchQuery) -> list[SearchResult]:
+        self._ensure_collection()
         results = self._client.query_points(
             collection_name=self._collection_name,
-            query=self._vectorize(query.text),
+            query=_as_list(self._vectorize(query.text)),
+            query_filter=(
+                None if query.filter is None else _qdrant_filter(query.filter)
+            ),
             limit=query.max_results,
         )
         return [
             self._qdrant_hit_to_search_result(hit) for hit in results.points
         ]
 
+    def find_neighbors(
+        self, doc_ids: list[str], max_results: int
+    ) -> list[list[SearchResult]]:
+        from qdrant_client.models import QueryRequest
+
+        self._ensure_collection()
+        neighbors = []
+        for start in range(0, len(doc_ids), self._batch_size):
+            chunk = doc_ids[start : start + self._batch_size]
+            # Querying by point id searches with the stored vector:
+            # nothing is embedded again.
+            responses = self._client.query_batch_points(
+                collection_name=self._collection_name,
+                requests=[
+                    # One extra hit in case the document itself is
+                    # returned.
+                    QueryRequest(
+                        query=doc_id, limit=max_results + 1, with_payload=True
+                    )
+                    for doc_id in chunk
+                ],
+            )
+            for doc_id, response in zip(chunk, responses):
+                results = [
+                    self._qdrant_hit_to_search_result(hit)
+                    for hit in response.points
+                ]
+                neighbors.append(
+                    [r for r in results if r.document.id != doc_id][
+                        :max_results
+                    ]
+                )
+        return neighbors
+
     def find_by_id(self, doc_id: str) -> Document:
+        self._ensure_collection()
         result = self._client.retrieve(
             collection_name=self._collection_name, ids=[doc_id]
         )
@@ -84,7 +294,7 @@ class QdrantDocumentRepository(DocumentRepository):
             )
         return self._qdrant_point_to_document(result[0])
 
-    def _vectorize(self, text: str) -> list[int]:
+    def _vectorize(self, text: str) -> np.ndarray:
         return self._encoder.encode(text)
 
     def _qdrant_hit_to_search_result(self, hit) -> SearchResult:
@@ -127,3 +337,84 @@ class QdrantDocumentRepository(DocumentRepository):
             source=payload.get("source", ""),
             metadata=payload.get("metadata", {}),
         )
+
+
+def _as_list(vector: Sequence[float] | np.ndarray) -> list[float]:
+    """Plain floats for Qdrant (encoders may return NumPy arrays)."""
+    tolist = getattr(vector, "tolist", None)
+    return tolist() if tolist is not None else list(vector)
+
+
+def _payload(document: Document) -> dict:
+    return {
+        "content": document.content,
+        "source": document.source,
+        "metadata": document.metadata,
+    }
+
+
+def _qdrant_filter(where: SearchFilter) -> "Filter":
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    # On a list field (tags), MatchValue matches any of its items.
+    return Filter(
+        must=[
+            FieldCondition(
+                key=f"metadata.{key}", match=MatchValue(value=value)
+            )
+            for key, value in where.conditions()
+        ]
+    )
+
+
+def _point_fields(point) -> tuple[str, dict, Optional[Sequence[float]]]:
+    """Id, payload ({} if missing) and vector of a retrieved point
+    (dict or object, depending on the Qdrant client version)."""
+    if isinstance(point, dict):
+        return (
+            str(point.get("id", "")),
+            point.get("payload") or {},
+            point.get("vector"),
+        )
+    return str(point.id), point.payload or {}, getattr(point, "vector", None)
+
+
+def create_document_repository(
+    encoder: EmbeddingModel,
+    batch_size: int = 64,
+    collection_name: str = "notes",
+    index_config: VectorIndexConfig | None = None,
+    embedding_model_id: str | None = None,
+) -> QdrantDocumentRepository:
+    """Factory function to create the default, persistent repository.
+
+    Uses Qdrant's local on-disk mode, so the index survives Anki
+    sessions: reopening it loads the stored vectors instead of embedding
+    every note again. The collection is created on first use.
+
+    With `embedding_model_id` (the encoder's model name), embeddings are
+    also kept in a content-hash cache, so notes are not re-encoded when
+    the index is rebuilt (e.g. after changing `index_config`).
+    """
+    from qdrant_client import QdrantClient
+
+    from .embedding_cache import CachedEmbeddingModel, create_embedding_cache
+
+    if embedding_model_id is not None:
+        encoder = CachedEmbeddingModel(
+            encoder,
+            create_embedding_cache(
+                embedding_model_id, encoder.get_sentence_embedding_dimension()
+            ),
+        )
+
+    # Stored next to the training dataset, outside the addon folder.
+    addon_dir = Path(__file__).parents[4]
+    client = QdrantClient(path=str(addon_dir / "data" / "vector_index"))
+    return QdrantDocumentRepository(
+        encoder,
+        cast(QdrantDriver, client),
+        collection_name,
+        batch_size,
+        index_config,
+    )
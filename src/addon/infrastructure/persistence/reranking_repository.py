@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+from ...domain.repositories.document_repository import (
+    Document,
+    DocumentRepository,
+    SearchQuery,
+    SearchResult,
+)
+from ...infrastructure.protocols import CrossEncoderModel
+
+if TYPE_CHECKING:
+    from ..configuration.settings import AddonConfig
+
+
+class RerankingDocumentRepository(DocumentRepository):
+    """Document repository rescoring another one's results with a
+    cross-encoder.
+
+    Embedding similarity compares two vectors computed separately, and
+    on short cards many unrelated notes land close together. A
+    cross-encoder reads the query and the candidate together and scores
+    the pair, which is far more precise but too slow to run on the whole
+    collection, so it only rescores the top `candidates` (k) of the
+    wrapped repository. Results below `min_score` are dropped.
+
+    Pairs are scored in batches of `batch_size`, and scores are cached
+    by a hash of the pair (up to `cache_size` pairs, least recently used
+    evicted first), so the same duplicate check is not scored twice.
+
+    Relevance scores are the cross-encoder's, on its own scale (e.g.
+    0-1 for the STS-trained models).
+
+    Implements DocumentRepository protocol.
+    """
+
+    def __init__(
+        self,
+        base: DocumentRepository,
+        model: CrossEncoderModel,
+        candidates: int = 20,
+        min_score: Optional[float] = None,
+        batch_size: int = 32,
+        cache_size: int = 100_000,
+    ) -> None:
+        if candidates < 1:
+            raise ValueError("candidates must be at least 1")
+        self._base = base
+        self._model = model
+        self._candidates = candidates
+        self._min_score = min_score
+        self._batch_size = batch_size
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, float] = OrderedDict()
+        self.scored_pairs = 0
+
+    def store(self, document: Document) -> None:
+        self._base.store(document)
+
+    def store_batch(self, documents: list[Document]) -> None:
+        self._base.store_batch(documents)
+
+    def remove(self, doc_ids: list[str]) -> None:
+        self._base.remove(doc_ids)
+
+    def find_similar(self, query: SearchQuery) -> list[SearchResult]:
+        candidates = self._base.find_similar(
+            dataclasses.replace(
+                query, max_results=max(self._candidates, query.max_results)
+            )
+        )
+        return self._rerank(query.text, candidates)[: query.max_results]
+
+    def find_neighbors(
+        self, doc_ids: list[str], max_results: int
+    ) -> list[list[SearchResult]]:
+        candidates = self._base.find_neighbors(
+            doc_ids, max(self._candidates, max_results)
+        )
+        documents = {
+            doc_id: self._base.find_by_id(doc_id) for doc_id in doc_ids
+        }
+        # Score every pair of the job together, so batches are full.
+        self._score(
+            [
+                (documents[doc_id].content, result.document.content)
+                for doc_id, results in zip(doc_ids, candidates)
+                for result in results
+            ]
+        )
+        return [
+            self._rerank(documents[doc_id].content, results)[:max_results]
+            for doc_id, results in zip(doc_ids, candidates)
+        ]
+
+    def find_by_id(self, doc_id: str) -> Document:
+        return self._base.find_by_id(doc_id)
+
+    def _rerank(
+        self, text: str, candidates: list[SearchResult]
+    ) -> list[SearchResult]:
+        scores = self._score([(text, r.document.content) for r in candidates])
+        reranked = [
+            SearchResult(result.document, score)
+            for result, score in zip(candidates, scores)
+            if self._min_score is None or score >= self._min_score
+        ]
+        reranked.sort(key=lambda result: -result.relevance_score)
+        return reranked
+
+    def _score(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """Cross-encoder score of each pair, from the cache when
+        possible."""
+        keys = [_pair_key(pair) for pair in pairs]
+        missing = {
+            key: pair
+            for key, pair in zip(keys, pairs)
+            if key not in self._cache
+        }
+        if missing:
+            scores = self._model.predict(
+                list(missing.values()), batch_size=self._batch_size
+            )
+            self.scored_pairs += len(missing)
+            for key, score in zip(missing, scores):
+                self._cache[key] = float(score)
+        results = []
+        for key in keys:
+            self._cache.move_to_end(key)
+            results.append(self._cache[key])
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+
+def _pair_key(pair: tuple[str, str]) -> str:
+    query, candidate = pair
+    return hashlib.sha256(f"{query}\0{candidate}".encode("utf-8")).hexdigest()
+
+
+def create_cross_encoder(model_name: str) -> CrossEncoderModel:
+    """Factory function to load a cross-encoder for CPU inference.
+
+    Runs through ONNX Runtime (the sentence-transformers[onnx] extra),
+    which is faster than PyTorch on CPU for these small models.
+    """
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, backend="onnx", device="cpu")
+
+
+def create_reranking_repository(
+    base: DocumentRepository, config: AddonConfig
+) -> DocumentRepository:
+    """Wrap `base` with the rerank stage configured by the user, or
+    return it unchanged when reranking is off."""
+    if config.rerank_model is None:
+        return base
+    return RerankingDocumentRepository(
+        base,
+        create_cross_encoder(config.rerank_model),
+        candidates=config.rerank_candidates,
+        min_score=config.rerank_min_score,
+    )
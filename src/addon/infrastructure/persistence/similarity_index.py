@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from ...application.use_cases.note_index import NoteIndex
+from ...domain.entities.note import NoteId
+from ...domain.repositories.document_repository import DocumentRepository
+from ...domain.repositories.note_repository import (
+    ChangeWatermark,
+    NoteRepository,
+)
+from ..configuration.settings import AddonConfig
+from .bm25_index import BM25Index
+from .embedding_cache import CachedEmbeddingModel
+from .hybrid_repository import HybridDocumentRepository
+from .numpy_repository import NumpyDocumentRepository
+from .reranking_repository import create_reranking_repository
+
+_STATE_FILE = "note_index.json"
+
+
+class SimilarityIndex:
+    """Similar-note search over the collection, saved between sessions.
+
+    Notes are embedded into an exact NumPy index (Qdrant's local mode is
+    far slower at collection size) and searched together with a BM25
+    index by HybridDocumentRepository, wrapped with the configured
+    rerank stage. A NoteIndex keeps them in step with the collection.
+
+    After a sync that changed anything, the NumPy index and the
+    NoteIndex state are written to `directory`. An index opened on the
+    same directory and embedding model resumes from them, so a new
+    session only encodes the notes changed since; the BM25 index is
+    rebuilt from the saved documents. A missing or unreadable save, or
+    one made with another embedding model, is rebuilt from scratch.
+    """
+
+    def __init__(
+        self,
+        directory: Union[Path, str],
+        encoder: CachedEmbeddingModel,
+        config: AddonConfig,
+    ) -> None:
+        self._directory = Path(directory)
+        self._encoder = encoder
+        self._model = config.embedding_model
+        saved = self._load()
+        # Built from scratch: the first sync encodes every note.
+        self._rebuilding = saved is None
+        dense, watermark, doc_ids = saved or (
+            NumpyDocumentRepository(encoder),
+            None,
+            None,
+        )
+        lexical = BM25Index()
+        lexical.add(dense.documents())
+        self._dense = dense
+        self._index = NoteIndex(
+            create_reranking_repository(
+                HybridDocumentRepository(dense, lexical), config
+            ),
+            watermark=watermark,
+            doc_ids=doc_ids,
+        )
+
+    @property
+    def documents(self) -> DocumentRepository:
+        return self._index.documents
+
+    def sync(
+        self,
+        notes: NoteRepository,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """NoteIndex.sync(), then save the index if anything changed.
+
+        Raises:
+            IndexSyncCancelledError: If `is_cancelled()` returned True;
+                nothing is saved.
+        """
+        changed = self._index.sync(notes, on_progress, is_cancelled)
+        if self._rebuilding:
+            # Every live note was just encoded: drop the cached vectors
+            # of notes deleted or edited since the cache was filled.
+            self._encoder.compact()
+            self._rebuilding = False
+        if changed:
+            self.save()
+        return changed
+
+    def save(self) -> None:
+        """Write the NumPy index, then the NoteIndex state."""
+        watermark = self._index.watermark or ChangeWatermark()
+        self._dense.save(self._directory)
+        state = {
+            "embedding_model": self._model,
+            "mod": watermark.mod,
+            "note_ids": sorted(watermark.note_ids),
+            "doc_ids": {str(k): v for k, v in self._index.doc_ids.items()},
+        }
+        # Replaced atomically: a crash leaves the previous state, which
+        # the next sync catches up from.
+        tmp = self._directory / f"{_STATE_FILE}.tmp"
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self._directory / _STATE_FILE)
+
+    def _load(
+        self,
+    ) -> Optional[
+        tuple[NumpyDocumentRepository, ChangeWatermark, dict[NoteId, str]]
+    ]:
+        try:
+            state = json.loads((self._directory / _STATE_FILE).read_text())
+            if state["embedding_model"] != self._model:
+                return None
+            dense = NumpyDocumentRepository.load(
+                self._directory, self._encoder
+            )
+            watermark = ChangeWatermark(
+                int(state["mod"]),
+                frozenset(NoteId(int(n)) for n in state["note_ids"]),
+            )
+            doc_ids = {
+                NoteId(int(k)): str(v) for k, v in state["doc_ids"].items()
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return dense, watermark, doc_ids
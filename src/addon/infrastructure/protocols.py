@@ -7,7 +7,11 @@ implementations. mypy verifies both real and fake implementations satisfy them.
 
 from __future__ import annotations
 
-from typing import Any, Protocol
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Protocol, overload
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class ConfigProvider(Protocol):
@@ -40,13 +44,37 @@ class HttpClient(Protocol):
 
 
 class EmbeddingModel(Protocol):
-    """Minimal contract for a text embedding model."""
+    """Minimal contract for a text embedding model.
+
+    Mirrors SentenceTransformer.encode: one text gives one vector; a list
+    gives a (texts, dimension) array, computed `batch_size` texts per
+    forward pass (far faster than one call per text).
+    """
+
+    @overload
+    def encode(self, sentences: str, batch_size: int = ...) -> np.ndarray: ...
 
-    def encode(self, text: str) -> list[int]: ...
+    @overload
+    def encode(
+        self, sentences: list[str], batch_size: int = ...
+    ) -> np.ndarray: ...
 
     def get_sentence_embedding_dimension(self) -> int: ...
 
 
+class CrossEncoderModel(Protocol):
+    """Minimal contract for a cross-encoder (pair scoring) model.
+
+    Mirrors sentence_transformers.CrossEncoder.predict: one relevance
+    score per (query, candidate) pair, computed `batch_size` pairs per
+    forward pass.
+    """
+
+    def predict(
+        self, sentences: list[tuple[str, str]], batch_size: int = ...
+    ) -> Sequence[float]: ...
+
+
 class QdrantQueryResponse(Protocol):
     """Minimal response from Qdrant query_points."""
 
@@ -64,18 +92,38 @@ class QdrantDriver(Protocol):
         self, collection_name: str, **kwargs: object
     ) -> object: ...
 
+    def collection_exists(
+        self, collection_name: str, **kwargs: object
+    ) -> bool: ...
+
     def create_collection(
         self, collection_name: str, vectors_config: object, **kwargs: object
     ) -> object: ...
 
+    def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: object,
+        **kwargs: object,
+    ) -> object: ...
+
     def upsert(
         self, collection_name: str, points: object, **kwargs: object
     ) -> None: ...
 
+    def delete(
+        self, collection_name: str, points_selector: object, **kwargs: object
+    ) -> object: ...
+
     def query_points(
         self, collection_name: str, query: object, limit: int, **kwargs: object
     ) -> QdrantQueryResponse: ...
 
+    def query_batch_points(
+        self, collection_name: str, requests: list[object], **kwargs: object
+    ) -> list[QdrantQueryResponse]: ...
+
     def retrieve(
         self, collection_name: str, ids: list[str], **kwargs: object
     ) -> list[object]: ...
@@ -1,22 +1,55 @@
 from __future__ import annotations
 
-from ...application.services.formatter_service import NoteFormatter
+from ...application.services.formatter_service import (
+    FormatterOutputMode,
+    NoteFormatter,
+)
 from ...infrastructure.configuration.settings import AddonConfig
 from ...infrastructure.external_services.openai import OpenAIClient
+from ...infrastructure.persistence.formatter_cache import (
+    create_formatter_cache,
+)
 
-# Module-level cache: populated on first call, reused for the session.
+# Module-level cache: populated on first call, reused for the session
+# until the settings it was built from change.
 _cached_formatter: NoteFormatter | None = None
+_cached_settings: tuple | None = None
 
 
 def get_formatter() -> NoteFormatter:
-    """Return the singleton NoteFormatter, creating it lazily on first call."""
-    global _cached_formatter
-    if _cached_formatter is not None:
-        return _cached_formatter
-
+    """Return the session's NoteFormatter, creating it lazily on first
+    call and again after the user changes the LLM or formatter config."""
+    global _cached_formatter, _cached_settings
     from aqt import mw
 
     config = AddonConfig(mw.addonManager)
+    settings = (
+        config.url,
+        config.model_name,
+        config.temperature,
+        config.max_tokens,
+        config.top_p,
+        config.top_k,
+        config.min_p,
+        config.reasoning,
+        config.preserve_thinking,
+        config.formatter_cache_max_mb,
+        config.formatter_output_mode,
+    )
+    if _cached_formatter is not None and settings == _cached_settings:
+        return _cached_formatter
+
     client = OpenAIClient(config)
-    _cached_formatter = NoteFormatter(client)
+    cache = (
+        create_formatter_cache(int(config.formatter_cache_max_mb * 1e6))
+        if config.formatter_cache_max_mb > 0
+        else None
+    )
+    _cached_formatter = NoteFormatter(
+        client,
+        cache,
+        config.model_name,
+        FormatterOutputMode(config.formatter_output_mode),
+    )
+    _cached_settings = settings
     return _cached_formatter
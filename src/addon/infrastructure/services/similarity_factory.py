@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Optional, cast
+
+from ...domain.repositories.document_repository import DocumentRepository
+from ...domain.repositories.note_repository import NoteRepository
+from ...infrastructure.configuration.settings import AddonConfig
+from ...infrastructure.persistence.embedding_cache import (
+    CachedEmbeddingModel,
+    create_embedding_cache,
+)
+from ...infrastructure.persistence.similarity_index import SimilarityIndex
+from ...infrastructure.protocols import EmbeddingModel
+
+# Module-level cache: built on first call, rebuilt when the settings it
+# was built from change, and kept in sync for the session. Calls run on
+# background threads, hence the lock.
+_cached_index: SimilarityIndex | None = None
+_cached_settings: tuple | None = None
+_lock = threading.Lock()
+
+
+def get_similarity_search(
+    notes: NoteRepository,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+) -> DocumentRepository:
+    """Return the session's similarity search over the collection,
+    first brought up to date with `notes` (see SimilarityIndex.sync).
+
+    The index is saved under the addon's data folder and loaded from
+    there in later sessions. Loading the models and the first sync of a
+    collection take a while: call this off the main thread.
+
+    Raises:
+        ImportError: If sentence-transformers is not installed.
+        OSError: If the embedding or rerank model cannot be loaded.
+        IndexSyncCancelledError: If `is_cancelled()` returned True.
+    """
+    global _cached_index, _cached_settings
+    from aqt import mw
+
+    config = AddonConfig(mw.addonManager)
+    settings = (
+        config.embedding_model,
+        config.rerank_model,
+        config.rerank_candidates,
+        config.rerank_min_score,
+    )
+    with _lock:
+        if _cached_index is None or settings != _cached_settings:
+            _cached_index = _create_similarity_index(config)
+            _cached_settings = settings
+        _cached_index.sync(notes, on_progress, is_cancelled)
+        return _cached_index.documents
+
+
+def _create_similarity_index(config: AddonConfig) -> SimilarityIndex:
+    encoder = create_embedding_model(config.embedding_model)
+    cached = CachedEmbeddingModel(
+        encoder,
+        create_embedding_cache(
+            config.embedding_model,
+            encoder.get_sentence_embedding_dimension(),
+        ),
+    )
+    # Stored next to the embedding cache, outside the addon folder.
+    addon_dir = Path(__file__).parents[4]
+    return SimilarityIndex(
+        addon_dir / "data" / "similarity_index", cached, config
+    )
+
+
+def create_embedding_model(model_name: str) -> EmbeddingModel:
+    """Factory function to load a sentence embedding model for CPU
+    inference, through ONNX Runtime like create_cross_encoder."""
+    from sentence_transformers import SentenceTransformer
+
+    return cast(
+        EmbeddingModel,
+        SentenceTransformer(model_name, backend="onnx", device="cpu"),
+    )
@@ -1,12 +1,69 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Optional, Union, cast, overload
 
-from ...application.use_cases.note_counter import is_note_marked_for_review
+from ...application.use_cases.note_counter import (
+    clear_orange_flags,
+    find_notes_marked_for_review,
+)
 
 if TYPE_CHECKING:
     from anki.collection import Collection
-    from anki.notes import Note
+    from anki.notes import Note, NoteId
+
+
+class LazyNoteList(Sequence["Note"]):
+    """Review notes by position, loaded from the collection on demand.
+
+    Only the note ids are held up front; a Note is loaded the first time
+    its position is read, together with the next `read_ahead` notes, and
+    then kept, so the editor keeps editing the same object. Notes the
+    review has moved past can be dropped with release_before().
+    """
+
+    def __init__(
+        self, col: Collection, note_ids: list[int], read_ahead: int = 3
+    ) -> None:
+        self._col = col
+        self.note_ids = note_ids
+        self._read_ahead = read_ahead
+        self._loaded: dict[int, Note] = {}
+
+    def __len__(self) -> int:
+        return len(self.note_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Note: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Note]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Note, list[Note]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("review note index out of range")
+        if index not in self._loaded:
+            end = min(index + 1 + self._read_ahead, len(self))
+            for i in range(index, end):
+                if i not in self._loaded:
+                    self._loaded[i] = self._col.get_note(
+                        cast("NoteId", self.note_ids[i])
+                    )
+        return self._loaded[index]
+
+    @property
+    def loaded_count(self) -> int:
+        """Number of Note objects currently held in memory."""
+        return len(self._loaded)
+
+    def release_before(self, index: int) -> None:
+        """Drop the loaded notes before `index`."""
+        for i in [i for i in self._loaded if i < index]:
+            del self._loaded[i]
 
 
 class EditorDialog:
@@ -32,11 +89,14 @@ class EditorDialog:
 
     Attributes:
         col: Reference to Anki's collection for note and card operations.
-        review_notes: List of all notes that need to be reviewed/edited.
+        review_notes: All notes that need to be reviewed/edited, loaded
+            lazily as the review reaches them (see LazyNoteList).
         _current_index: Private tracker of which note is currently being
             edited (internal).
         _original_fields: Private backup of original field content for
             current note (internal).
+        _deferred_flag_note_ids: Saved notes whose orange flag is
+            cleared at the end of the session (internal).
 
     Raises:
         ValueError: When no notes are found that are marked for review
@@ -55,6 +115,7 @@ class EditorDialog:
         self.review_notes = self._get_all_notes_to_review()
         self._current_index = 0
         self._original_fields: dict[str, str] = {}
+        self._deferred_flag_note_ids: list[int] = []
 
         if not self.review_notes:
             raise ValueError("No notes marked for review")
@@ -62,18 +123,12 @@ class EditorDialog:
     def __len__(self) -> int:
         return len(self.review_notes)
 
-    def _get_all_notes_to_review(self) -> list[Note]:
-        """Retrieve all notes marked for review."""
+    def _get_all_notes_to_review(self) -> LazyNoteList:
+        """Retrieve all notes marked for review (ids only; the notes load
+        as the review reaches them)."""
         deck_id = self.col.decks.current()["id"]
-        query = f"did:{deck_id}"
-        note_ids = self.col.find_notes(query)
-
-        review_notes = []
-        for note_id in note_ids:
-            if is_note_marked_for_review(self.col, note_id):
-                review_notes.append(self.col.get_note(note_id))
-
-        return review_notes
+        review = find_notes_marked_for_review(self.col, deck_id)
+        return LazyNoteList(self.col, review.flagged_note_ids)
 
     def get_note_fields_with_tags(self, note: Note) -> dict[str, str]:
         """Extract all fields and tags from note.
@@ -92,6 +147,11 @@ class EditorDialog:
         self._original_fields = self.get_note_fields_with_tags(note)
         return note
 
+    def is_unchanged(self, note: Note) -> bool:
+        """Whether the note's fields and tags still match the backup
+        taken by current_note(), i.e. the user has not edited it."""
+        return self.get_note_fields_with_tags(note) == self._original_fields
+
     def backup_current_note(self) -> Note:
         note = self.review_notes[self._current_index]
         for field_name, original_content in self._original_fields.items():
@@ -111,9 +171,22 @@ class EditorDialog:
     def has_next_note(self) -> bool:
         return self._current_index < len(self.review_notes) - 1
 
+    def upcoming_notes(self, count: int) -> list[Note]:
+        """The next `count` notes after the current one, in review
+        order, without moving to them or touching the backup."""
+        start = self._current_index + 1
+        return self.review_notes[start : start + count]
+
+    def remaining_note_ids(self) -> list[int]:
+        """Ids of the current note and every note after it, in review
+        order, without loading the notes."""
+        return self.review_notes.note_ids[self._current_index :]
+
     def move_to_next_note(self) -> Optional[Note]:
         if self.has_next_note():
             self._current_index += 1
+            # The review only moves forward: earlier notes are done.
+            self.review_notes.release_before(self._current_index)
             # NOTE: It's important to execute the `current_note()` method
             # because it also updates the backup for the current note
             current_note = self.current_note()
@@ -121,14 +194,25 @@ class EditorDialog:
         return None
 
     def strip_orange_flag(self, current_note: Note) -> Note:
-        card_ids = self.col.find_cards(f"nid:{current_note.id}")
-        for card_id in card_ids:
-            card = self.col.get_card(card_id)
-            if card.flags == 2:
-                card.flags = 0
-                card.flush()
+        clear_orange_flags(self.col, [current_note.id])
         return current_note
 
+    def defer_strip_orange_flag(self, current_note: Note) -> Note:
+        """Queue the note's orange flag for removal at the end of the
+        session (see take_deferred_flag_note_ids), instead of writing
+        its cards now."""
+        self._deferred_flag_note_ids.append(current_note.id)
+        return current_note
+
+    def take_deferred_flag_note_ids(self) -> list[int]:
+        """Notes queued by defer_strip_orange_flag, emptying the queue;
+        pass them to clear_orange_flags in one operation."""
+        note_ids, self._deferred_flag_note_ids = (
+            self._deferred_flag_note_ids,
+            [],
+        )
+        return note_ids
+
     def save_note_keep_flag(self, current_note: Note) -> Note:
         """Save note without removing the orange flag."""
         # Just flush the note, keeping flags intact
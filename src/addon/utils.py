@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from anki.collection import Collection
+    from anki.dbproxy import DBProxy
     from anki.notes import Note
 
 
@@ -13,6 +14,12 @@ def ensure_collection(col: Optional[Collection]) -> Collection:
     return col
 
 
+def ensure_db(col: Collection) -> DBProxy:
+    if col.db is None:
+        raise RuntimeError("Collection database not open")
+    return col.db
+
+
 def ensure_note(note: Optional[Note]) -> Note:
     if note is None:
         raise RuntimeError("Note not initialized")
@@ -1,4 +1,6 @@
+import copy
 import re
+from types import SimpleNamespace
 
 from addon.infrastructure.protocols import ConfigProvider
 
@@ -22,6 +24,19 @@ class FakeCollection:
         self.cards = {}  # card_id -> card
         self.decks = FakeDeckManager()
         self.models = FakeModelsManager()
+        self.db = FakeDB(self)
+        self._clock = 0
+        # Custom undo entries: (name, snapshot of notes and cards), with
+        # their step numbers; undone entries move to the redo stack.
+        self.undo_entries = []
+        self.redo_entries = []
+        self._undo_steps = []
+        self._last_step = 0
+
+    def _tick(self) -> int:
+        """Stand-in for Anki's mod timestamps: strictly increasing."""
+        self._clock += 1
+        return self._clock
 
     def get_note(self, note_id):
         return self.notes.get(note_id)
@@ -34,10 +49,10 @@ class FakeCollection:
         # Supports nid:<id>, did:<id>, and plain text terms (all terms
         # must appear, case-insensitive, across fields and tags).
         # Combined queries are not supported (no caller uses them).
-        m = re.search(r"\bnid:(\d+)", query)
+        m = re.search(r"\bnid:([\d,]+)", query)
         if m:
-            note_id = int(m.group(1))
-            return [note_id] if note_id in self.notes else []
+            note_ids = [int(nid) for nid in m.group(1).split(",")]
+            return [nid for nid in note_ids if nid in self.notes]
         m = re.search(r"\bdid:(\d+)", query)
         if m:
             if int(m.group(1)) == self.decks.current()["id"]:
@@ -61,12 +76,55 @@ class FakeCollection:
         )
 
     def add_note(self, note, deck_id):
+        note.mod = self._tick()
         self.notes[note.id] = note
 
+    def add_notes(self, requests):
+        for request in requests:
+            # Real Anki assigns ids on add; new_note ids would collide
+            # when several notes are created before any is added.
+            request.note.id = max(self.notes, default=0) + 1
+            self.add_note(request.note, request.deck_id)
+
     def update_note(self, note):
+        note.mod = self._tick()
         self.notes[note.id] = note
         note.flush()
 
+    def update_notes(self, notes):
+        for note in notes:
+            self.update_note(note)
+
+    def add_custom_undo_entry(self, name):
+        # As in Anki, a new undoable step clears the redo stack.
+        self.redo_entries.clear()
+        snapshot = copy.deepcopy((self.notes, self.cards))
+        self._last_step += 1
+        self.undo_entries.append((name, snapshot))
+        self._undo_steps.append(self._last_step)
+        return self._last_step
+
+    def merge_undo_entries(self, target):
+        # Writes since the entry was added already belong to it; later
+        # entries are folded into it.
+        if target not in self._undo_steps:
+            raise ValueError("target undo op not found")
+        keep = self._undo_steps.index(target) + 1
+        del self.undo_entries[keep:]
+        del self._undo_steps[keep:]
+
+    def undo(self):
+        self._undo_steps.pop()
+        name, (self.notes, self.cards) = self.undo_entries.pop()
+        self.redo_entries.append(name)
+
+    def undo_status(self):
+        return SimpleNamespace(
+            undo=self.undo_entries[-1][0] if self.undo_entries else "",
+            redo=self.redo_entries[-1] if self.redo_entries else "",
+            last_step=self._undo_steps[-1] if self._undo_steps else 0,
+        )
+
     def remove_notes(self, note_ids):
         for note_id in note_ids:
             self.notes.pop(note_id, None)
@@ -77,18 +135,101 @@ class FakeCollection:
         }
 
     def find_cards(self, query):
-        # Simple implementation that returns card IDs for a note ID
-        # Parse query like "nid:1" to get note_id
-        if query.startswith("nid:"):
-            note_id = int(query[4:])
-            # Return list of card IDs associated with this note ID
-            # In a real implementation, you'd look up the actual relationships
+        # Supports "nid:<id>[,<id>...]", optionally followed by
+        # "flag:<n>" to keep only cards with that flag.
+        m = re.fullmatch(r"nid:([\d,]+)(?: flag:(\d))?", query)
+        if not m:
+            return []
+        note_ids = {int(nid) for nid in m.group(1).split(",")}
+        return [
+            card_id
+            for card_id, card in self.cards.items()
+            if getattr(card, "note_id", None) in note_ids
+            and (m.group(2) is None or card.flags == int(m.group(2)))
+        ]
+
+    def set_user_flag_for_cards(self, flag, card_ids):
+        for card_id in card_ids:
+            card = self.cards[card_id]
+            card.flags = flag
+            card.flush()
+        return SimpleNamespace(count=len(card_ids))
+
+
+class FakeDB:
+    """Answers the raw SQL statements the adapters issue. Anything else
+    raises, so a new query fails loudly until the fake learns it."""
+
+    def __init__(self, collection):
+        self._col = collection
+        self.queries = []
+
+    def all(self, sql, *args):
+        self.queries.append(sql)
+        if sql == "select id, mod from notes":
+            return [[nid, note.mod] for nid, note in self._col.notes.items()]
+        if sql.startswith("select id, mod from notes where id in"):
+            return [
+                [nid, note.mod]
+                for nid, note in self._col.notes.items()
+                if nid in args
+            ]
+        if sql.startswith("select id, guid, mid, flds, tags from notes"):
+            # Each note is its own notetype, registered under its id.
+            rows = []
+            for nid, note in self._col.notes.items():
+                if nid in args:
+                    self._col.models.by_id[nid] = {
+                        "type": note.note_type()["type"],
+                        "flds": [{"name": key} for key in note.keys()],
+                    }
+                    fields = "\x1f".join(str(note[key]) for key in note.keys())
+                    rows.append(
+                        [nid, note.guid, nid, fields, " ".join(note.tags)]
+                    )
+            return rows
+        if sql.startswith("select nid, did, odid from cards where nid in"):
+            # Card ids stand in for template order; cards without a
+            # deck belong to the current deck.
             return [
-                card_id
-                for card_id, card in self.cards.items()
-                if getattr(card, "note_id", None) == note_id
+                [
+                    card.note_id,
+                    card.deck_id or self._col.decks.current()["id"],
+                    0,
+                ]
+                for card in sorted(
+                    self._col.cards.values(), key=lambda c: (c.note_id, c.id)
+                )
+                if card.note_id in args
             ]
-        return []
+        if sql.startswith("select guid, id from notes where guid in"):
+            return [
+                [note.guid, nid]
+                for nid, note in self._col.notes.items()
+                if note.guid in args
+            ]
+        if sql.startswith("select did, odid, nid, max((flags & 7) = 2)"):
+            # Cards carry no deck: all belong to the current deck.
+            deck_id = self._col.decks.current()["id"]
+            return [
+                [deck_id, 0, nid, flagged]
+                for nid, flagged in self._review_notes()
+            ]
+        if sql.startswith("select nid, max((flags & 7) = 2) from cards"):
+            # Cards carry no deck: all belong to the current deck.
+            if args[0] != self._col.decks.current()["id"]:
+                return []
+            return self._review_notes()
+        raise NotImplementedError(f"FakeDB does not support: {sql}")
+
+    def _review_notes(self):
+        flagged = {}
+        for card in self._col.cards.values():
+            if card.note_id in self._col.notes:
+                flagged[card.note_id] = max(
+                    flagged.get(card.note_id, 0), int(card.flags == 2)
+                )
+        return sorted([nid, f] for nid, f in flagged.items())
 
 
 def _note_text(note) -> str:
@@ -114,6 +255,11 @@ class FakeModelsManager:
         if notetypes is None:
             notetypes = [self._BASIC, self._CLOZE]
         self._notetypes = notetypes
+        # Notetypes by id, as registered by FakeDB.
+        self.by_id = {}
+
+    def get(self, notetype_id):
+        return self.by_id.get(notetype_id)
 
     def by_name(self, name):
         for notetype in self._notetypes:
@@ -125,13 +271,22 @@ class FakeModelsManager:
 class FakeDeckManager:
     def __init__(self):
         self.current_deck = {"id": 1, "name": "Default"}
+        # Decks besides the current one, as {"id": ..., "name": ...}.
+        self.other_decks = []
 
     def current(self):
         return self.current_deck
 
+    def all_names_and_ids(self):
+        return [
+            SimpleNamespace(**deck)
+            for deck in [self.current_deck, *self.other_decks]
+        ]
+
     def id_for_name(self, name):
-        if name == self.current_deck["name"]:
-            return self.current_deck["id"]
+        for deck in [self.current_deck, *self.other_decks]:
+            if name == deck["name"]:
+                return deck["id"]
         return None
 
 
@@ -150,6 +305,7 @@ class FakeNote:
             "flds": [{"name": k} for k in self._fields.keys()],
         }
         self.tags = []
+        self.mod = 0
         self._was_flushed = False
 
     def note_type(self) -> dict:
@@ -177,10 +333,11 @@ class FakeCard:
     Only implements the essential functionality needed for basic operations.
     """
 
-    def __init__(self, card_id, note_id, flags=0) -> None:
+    def __init__(self, card_id, note_id, flags=0, deck_id=None) -> None:
         self.id = card_id
         self.note_id = note_id
         self.flags = flags
+        self.deck_id = deck_id
         self._was_flushed = False
 
     def flush(self) -> None:
@@ -14,11 +14,18 @@ from addon.domain.repositories.document_repository import (
 class FakeDocumentRepository(DocumentRepository):
     """Fake document repository for domain-level tests.
 
-    Records search queries for verification and always returns empty results.
+    Records search queries and removed ids for verification and always
+    returns empty results; find_neighbors() answers from the configured
+    `neighbors`.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self, neighbors: dict[str, list[SearchResult]] | None = None
+    ) -> None:
         self.captured_queries: list[str] = []
+        self.neighbors = neighbors or {}
+        self.neighbor_calls = 0
+        self.removed_ids: list[str] = []
 
     def store(self, document: Document) -> None:
         pass
@@ -26,9 +33,18 @@ class FakeDocumentRepository(DocumentRepository):
     def store_batch(self, documents: list[Document]) -> None:
         pass
 
+    def remove(self, doc_ids: list[str]) -> None:
+        self.removed_ids.extend(doc_ids)
+
     def find_similar(self, query: SearchQuery) -> list[SearchResult]:
         self.captured_queries.append(query.text)
         return []
 
+    def find_neighbors(
+        self, doc_ids: list[str], max_results: int
+    ) -> list[list[SearchResult]]:
+        self.neighbor_calls += 1
+        return [self.neighbors.get(d, [])[:max_results] for d in doc_ids]
+
     def find_by_id(self, doc_id: str) -> Document:
         raise DocumentNotFoundError(f"Document with id '{doc_id}' not found")
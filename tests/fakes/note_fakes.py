@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import copy
 import dataclasses
+from contextlib import contextmanager
+from typing import Iterator
 
 from addon.domain.entities.note import AddonNote, NoteId
 from addon.domain.repositories.note_repository import (
+    ChangeWatermark,
     InvalidSearchQueryError,
+    NoteChanges,
     NoteNotFoundError,
     NoteRepository,
 )
@@ -28,6 +33,11 @@ class FakeNoteRepository(NoteRepository):
     def __init__(self, notes: dict[int, AddonNote] | None = None) -> None:
         self._notes: dict[int, AddonNote] = dict(notes or {})
         self._next_id = max(self._notes, default=0) + 1
+        # Logical clock standing in for modification times.
+        self._clock = 0
+        self._mods: dict[int, int] = {note_id: 0 for note_id in self._notes}
+        # Labels of the transactions that committed, oldest first.
+        self.transactions: list[str] = []
 
     def search(self, query: str, limit: int = 10) -> list[NoteId]:
         clauses = _parse_query(query)
@@ -52,20 +62,91 @@ class FakeNoteRepository(NoteRepository):
         except KeyError:
             raise NoteNotFoundError(f"note {note_id} not found")
 
+    def get_many(self, note_ids: list[NoteId]) -> dict[NoteId, AddonNote]:
+        return {
+            note_id: self._notes[note_id]
+            for note_id in note_ids
+            if note_id in self._notes
+        }
+
+    def get_mods(self, note_ids: list[NoteId]) -> dict[NoteId, int]:
+        return {
+            note_id: self._mods[note_id]
+            for note_id in note_ids
+            if note_id in self._mods
+        }
+
+    def find_ids_by_guid(self, guids: list[str]) -> dict[str, NoteId]:
+        wanted = set(guids)
+        return {
+            note.guid: NoteId(note_id)
+            for note_id, note in self._notes.items()
+            if note.guid in wanted
+        }
+
     def update(self, note_id: NoteId, note: AddonNote) -> None:
         self.get(note_id)
         self._notes[note_id] = note
+        self._mods[note_id] = self._tick()
+
+    def update_many(self, notes: dict[NoteId, AddonNote]) -> None:
+        missing = set(notes) - set(self._notes)
+        if missing:
+            raise NoteNotFoundError(f"notes {sorted(missing)} not found")
+        for note_id, note in notes.items():
+            self.update(note_id, note)
 
     def add(self, note: AddonNote, deck_name: str) -> NoteId:
         note_id = NoteId(self._next_id)
         self._next_id += 1
         self._notes[note_id] = dataclasses.replace(note, deck_name=deck_name)
+        self._mods[note_id] = self._tick()
         return note_id
 
+    def add_many(self, notes: list[AddonNote], deck_name: str) -> list[NoteId]:
+        return [self.add(note, deck_name) for note in notes]
+
     def remove(self, note_ids: list[NoteId]) -> None:
         for note_id in note_ids:
             self.get(note_id)
             del self._notes[note_id]
+            del self._mods[note_id]
+
+    @contextmanager
+    def transaction(self, label: str) -> Iterator[None]:
+        snapshot = copy.deepcopy(
+            (self._notes, self._mods, self._next_id, self._clock)
+        )
+        try:
+            yield
+        except BaseException:
+            self._notes, self._mods, self._next_id, self._clock = snapshot
+            raise
+        self.transactions.append(label)
+
+    def changes_since(
+        self, watermark: ChangeWatermark | None = None
+    ) -> NoteChanges:
+        watermark = watermark or ChangeWatermark()
+        added = [NoteId(n) for n in self._mods if n not in watermark.note_ids]
+        updated = [
+            NoteId(n)
+            for n, mod in self._mods.items()
+            if n in watermark.note_ids and mod > watermark.mod
+        ]
+        removed = sorted(watermark.note_ids - set(self._mods))
+        return NoteChanges(
+            added=added,
+            updated=updated,
+            removed=removed,
+            watermark=ChangeWatermark(
+                self._clock, frozenset(NoteId(n) for n in self._mods)
+            ),
+        )
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
 
 
 def _haystack(note: AddonNote) -> str:
@@ -1,9 +1,10 @@
 """Test doubles for Qdrant interactions.
 
-Two fakes at different levels:
+Fakes at different levels:
 
 - FakeSentenceTransformer: fakes the embedding model. Avoids 20+ second library
   loading overhead caused by SentenceTransformer during test execution.
+- FakeCrossEncoder: fakes the reranking model, scoring pairs by word overlap.
 - FakeQdrantClient: fakes the Qdrant client. Enables testing without running
   an actual Qdrant server.
 """
@@ -12,30 +13,63 @@ from __future__ import annotations
 
 from typing import Any
 
-from addon.infrastructure.protocols import EmbeddingModel, QdrantDriver
+from addon.infrastructure.protocols import (
+    CrossEncoderModel,
+    EmbeddingModel,
+    QdrantDriver,
+)
 
 
 class FakeSentenceTransformer(EmbeddingModel):
     """Fake embedding model for tests.
 
-    Returns a fixed 7-dimensional embedding regardless of input.
+    Returns a fixed 7-dimensional embedding regardless of input, and
+    records how many texts each call encoded.
     """
 
     def __init__(self, model_name_or_path: str = "fake") -> None:
         self._embedding = [0, 0, 0, 0, 0, 0, 0]
+        self.encode_calls: list[int] = []
 
-    def encode(self, text: str) -> list[int]:
-        return self._embedding
+    def encode(self, sentences, batch_size: int = 32):  # type: ignore[override]
+        if isinstance(sentences, str):
+            self.encode_calls.append(1)
+            return self._embedding
+        self.encode_calls.append(len(sentences))
+        return [self._embedding for _ in sentences]
 
     def get_sentence_embedding_dimension(self) -> int:
         return len(self._embedding)
 
 
+class FakeCrossEncoder(CrossEncoderModel):
+    """Fake cross-encoder for tests.
+
+    Scores a pair by the word overlap of its texts (Jaccard), and
+    records how many pairs each call scored.
+    """
+
+    def __init__(self) -> None:
+        self.predict_calls: list[int] = []
+
+    def predict(
+        self, sentences: list[tuple[str, str]], batch_size: int = 32
+    ) -> list[float]:
+        self.predict_calls.append(len(sentences))
+        scores = []
+        for a, b in sentences:
+            words_a, words_b = set(a.lower().split()), set(b.lower().split())
+            union = words_a | words_b
+            scores.append(len(words_a & words_b) / len(union) if union else 0)
+        return scores
+
+
 class FakeQdrantClient(QdrantDriver):
     """Fake Qdrant client for unit tests.
 
     Accepts pre-configured search responses (as mock point dicts) and tracks
-    stored documents.
+    stored documents, payload indexes and the filters queries were sent
+    with.
     """
 
     def __init__(
@@ -48,26 +82,57 @@ class FakeQdrantClient(QdrantDriver):
         if stored_documents:
             self._stored_docs = {doc.id: doc for doc in stored_documents}
         self._points: dict[str, _MockPoint] = {}
+        self.upsert_sizes: list[int] = []
+        # Created collections: name -> create_collection arguments.
+        self.collections: dict[str, dict[str, object]] = {}
+        # Payload indexes: collection name -> indexed field names.
+        self.payload_indexes: dict[str, list[str]] = {}
+        self.query_filters: list[object] = []
 
     def get_collection(self, collection_name: str, **kwargs: object) -> dict:
         return {"status": "green"}
 
+    def collection_exists(
+        self, collection_name: str, **kwargs: object
+    ) -> bool:
+        return collection_name in self.collections
+
     def create_collection(
         self, collection_name: str, vectors_config: object, **kwargs: object
     ) -> None:
-        pass
+        self.collections[collection_name] = {
+            "vectors_config": vectors_config,
+            **kwargs,
+        }
+
+    def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: object,
+        **kwargs: object,
+    ) -> None:
+        self.payload_indexes.setdefault(collection_name, []).append(field_name)
 
     def upsert(
         self, collection_name: str, points: object, **kwargs: object
     ) -> None:
+        self.upsert_sizes.append(len(points))  # type: ignore[arg-type]
         for point in points:  # type: ignore[misc]
             self._points[str(point.id)] = _MockPoint(
-                id=point.id, payload=point.payload
+                id=point.id, payload=point.payload, vector=point.vector
             )
 
+    def delete(
+        self, collection_name: str, points_selector: object, **kwargs: object
+    ) -> None:
+        for point_id in points_selector.points:  # type: ignore[attr-defined]
+            self._points.pop(str(point_id), None)
+
     def query_points(
         self, collection_name: str, query: object, limit: int, **kwargs: object
     ) -> _MockQueryResponse:
+        self.query_filters.append(kwargs.get("query_filter"))
         if not self._search_responses:
             return _MockQueryResponse([])
 
@@ -78,6 +143,18 @@ class FakeQdrantClient(QdrantDriver):
         ]
         return _MockQueryResponse(mock_points)
 
+    def query_batch_points(
+        self, collection_name: str, requests: list[object], **kwargs: object
+    ) -> list[_MockQueryResponse]:
+        return [
+            self.query_points(
+                collection_name,
+                query=request.query,  # type: ignore[attr-defined]
+                limit=request.limit,  # type: ignore[attr-defined]
+            )
+            for request in requests
+        ]
+
     def retrieve(
         self, collection_name: str, ids: list[str], **kwargs: object
     ) -> list[object]:
@@ -89,9 +166,10 @@ class FakeQdrantClient(QdrantDriver):
 class _MockPoint:
     """Minimal PointStruct stand-in."""
 
-    def __init__(self, id: str, payload: dict) -> None:
+    def __init__(self, id: str, payload: dict, vector: object = None) -> None:
         self.id = id
         self.payload = payload
+        self.vector = vector
 
 
 class _MockScoredPoint:
@@ -2,7 +2,14 @@ import uuid
 
 import pytest
 
-from addon.domain.repositories.document_repository import Document, SearchQuery
+from addon.domain.entities.note import AddonNote, AddonNoteType
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchFilter,
+    SearchQuery,
+    convert_addon_note_to_document,
+    document_id_for_note,
+)
 from addon.infrastructure.persistence.qdrant_repository import (
     QdrantDocumentRepository,
 )
@@ -109,3 +116,73 @@ def test_basic_similarity_search(repo: QdrantDocumentRepository) -> None:
         assert hasattr(result, "document")
         assert hasattr(result, "relevance_score")
         assert isinstance(result.relevance_score, (int, float))
+
+
+@pytest.mark.slow
+def test_filtered_search_matches_note_metadata(
+    repo: QdrantDocumentRepository,
+) -> None:
+    # Given
+    notes = [
+        AddonNote("front", "back", tags=["cell"], deck_name="Biology"),
+        AddonNote(
+            "front",
+            "back",
+            tags=["cell", "energy"],
+            deck_name="Biology",
+            notetype=AddonNoteType.CLOZE,
+        ),
+        AddonNote("front", "back", tags=["energy"], deck_name="Physics"),
+    ]
+    repo.store_batch([convert_addon_note_to_document(n) for n in notes])
+
+    def found(where: SearchFilter) -> set[str]:
+        results = repo.find_similar(SearchQuery("front", 10, where))
+        return {r.document.metadata["guid"] for r in results}
+
+    # When / Then
+    assert found(SearchFilter(deck="Biology")) == {
+        notes[0].guid,
+        notes[1].guid,
+    }
+    assert found(SearchFilter(tag="energy")) == {notes[1].guid, notes[2].guid}
+    assert found(SearchFilter(notetype=AddonNoteType.CLOZE)) == {notes[1].guid}
+
+
+def test_reopened_on_disk_index_keeps_documents(encoder, tmp_path) -> None:
+    """A persistent index reopened in a new client still holds the
+    documents, and storing them again embeds nothing."""
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, VectorParams
+
+    # Given
+    client = QdrantClient(path=str(tmp_path))
+    client.create_collection(
+        collection_name="notes",
+        vectors_config=VectorParams(
+            size=encoder.get_sentence_embedding_dimension(),
+            distance=Distance.DOT,
+        ),
+    )
+    documents = [
+        Document(
+            id=document_id_for_note(f"guid-{i}"),
+            content=f"Content {i}",
+            source="test",
+            metadata={"i": i},
+        )
+        for i in range(3)
+    ]
+    QdrantDocumentRepository(encoder, client, "notes").store_batch(documents)
+    client.close()
+
+    # When
+    reopened = QdrantDocumentRepository(
+        encoder, QdrantClient(path=str(tmp_path)), "notes"
+    )
+    encoder.encode_calls.clear()
+    reopened.store_batch(documents)
+
+    # Then
+    assert reopened.find_by_id(documents[2].id).content == "Content 2"
+    assert encoder.encode_calls == []
@@ -3,7 +3,10 @@ from __future__ import annotations
 import pytest
 from tests.fakes.aqt_fakes import FakeAddonManager
 
-from addon.infrastructure.configuration.settings import AddonConfig
+from addon.infrastructure.configuration.settings import (
+    AddonConfig,
+    read_clear_flags_at_session_end,
+)
 
 
 def test_reads_required_parameters_from_anki_config() -> None:
@@ -239,3 +242,170 @@ def test_reads_custom_notetype_names_from_config() -> None:
     # Then
     assert config.basic_notetype == "Better Markdown : Basic"
     assert config.cloze_notetype == "Better Markdown : Cloze"
+
+
+def test_formatter_concurrency_defaults_and_reads_from_config() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+    }
+
+    # When
+    default = AddonConfig(FakeAddonManager(raw))
+    custom = AddonConfig(
+        FakeAddonManager({**raw, "formatter_concurrency": "8"})
+    )
+
+    # Then
+    assert default.formatter_concurrency == 4
+    assert custom.formatter_concurrency == 8
+
+
+def test_formatter_lookahead_defaults_and_reads_from_config() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+    }
+
+    # When
+    default = AddonConfig(FakeAddonManager(raw))
+    custom = AddonConfig(FakeAddonManager({**raw, "formatter_lookahead": 0}))
+
+    # Then
+    assert default.formatter_lookahead == 5
+    assert custom.formatter_lookahead == 0
+
+
+def test_formatter_cache_size_defaults_and_reads_from_config() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+    }
+
+    # When
+    default = AddonConfig(FakeAddonManager(raw))
+    disabled = AddonConfig(
+        FakeAddonManager({**raw, "formatter_cache_max_mb": 0})
+    )
+
+    # Then
+    assert default.formatter_cache_max_mb == 20
+    assert disabled.formatter_cache_max_mb == 0
+
+
+def test_formatter_output_mode_defaults_to_rewrite() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+    }
+
+    # When
+    default = AddonConfig(FakeAddonManager(raw))
+    edits = AddonConfig(
+        FakeAddonManager({**raw, "formatter_output_mode": "edits"})
+    )
+
+    # Then
+    assert default.formatter_output_mode == "rewrite"
+    assert edits.formatter_output_mode == "edits"
+
+
+def test_unknown_formatter_output_mode_raises() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+        "formatter_output_mode": "diff",
+    }
+
+    # When / Then
+    with pytest.raises(ValueError, match="formatter_output_mode"):
+        AddonConfig(FakeAddonManager(raw))
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [("formatter_concurrency", 0), ("formatter_lookahead", -1)],
+)
+def test_out_of_range_formatter_settings_raise(key: str, value: int) -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+        key: value,
+    }
+
+    # When / Then
+    with pytest.raises(ValueError, match=key):
+        AddonConfig(FakeAddonManager(raw))
+
+
+def test_clear_flags_at_session_end_defaults_to_false() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+    }
+
+    # When
+    default = AddonConfig(FakeAddonManager(raw))
+    deferred = AddonConfig(
+        FakeAddonManager({**raw, "clear_flags_at_session_end": True})
+    )
+
+    # Then
+    assert default.clear_flags_at_session_end is False
+    assert deferred.clear_flags_at_session_end is True
+
+
+def test_clear_flags_at_session_end_is_read_without_llm_config() -> None:
+    # Given
+    raw = {"clear_flags_at_session_end": True}
+
+    # When
+    deferred = read_clear_flags_at_session_end(FakeAddonManager(raw))
+    default = read_clear_flags_at_session_end(FakeAddonManager({}))
+
+    # Then
+    assert deferred is True
+    assert default is False
+
+
+def test_reranking_is_off_by_default() -> None:
+    # Given
+    raw = {
+        "openai_host": "localhost",
+        "openai_port": "8000",
+        "openai_model": "test-model",
+    }
+
+    # When
+    default = AddonConfig(FakeAddonManager(raw))
+    configured = AddonConfig(
+        FakeAddonManager(
+            {
+                **raw,
+                "rerank_model": "cross-encoder/stsb-TinyBERT-L4",
+                "rerank_candidates": 10,
+                "rerank_min_score": 0.5,
+            }
+        )
+    )
+
+    # Then
+    assert default.rerank_model is None
+    assert default.rerank_min_score is None
+    assert configured.rerank_model == "cross-encoder/stsb-TinyBERT-L4"
+    assert configured.rerank_candidates == 10
+    assert configured.rerank_min_score == 0.5
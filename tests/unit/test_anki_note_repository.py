@@ -159,3 +159,196 @@ def test_remove_unknown_note_raises(
     # When / Then
     with pytest.raises(NoteNotFoundError):
         repository.remove([NoteId(999)])
+
+
+def test_get_mods_reads_modification_times_without_loading_notes(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    repository = AnkiNoteRepository(collection)
+    collection.notes[2].mod = 1700000000
+
+    # When
+    mods = repository.get_mods([NoteId(2), NoteId(999)])
+
+    # Then
+    assert mods == {2: 1700000000}
+    assert collection.db.queries == [
+        "select id, mod from notes where id in (?,?)"
+    ]
+
+
+def test_changes_since_without_watermark_reports_every_note_as_added(
+    repository: AnkiNoteRepository,
+) -> None:
+    # When
+    changes = repository.changes_since()
+
+    # Then
+    assert sorted(changes.added) == [1, 2, 3, 4]
+    assert changes.updated == []
+    assert changes.removed == []
+    assert changes.watermark.note_ids == {1, 2, 3, 4}
+
+
+def test_changes_since_reports_only_what_changed_after_watermark(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    watermark = repository.changes_since().watermark
+    repository.update(NoteId(2), AddonNote(front="Edited", back="A"))
+    new_id = repository.add(AddonNote(front="f", back="b"), "Default")
+    repository.remove([NoteId(3)])
+
+    # When
+    changes = repository.changes_since(watermark)
+
+    # Then
+    assert changes.added == [new_id]
+    assert changes.updated == [2]
+    assert changes.removed == [3]
+
+
+def test_changes_since_latest_watermark_reports_nothing_new(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    repository.update(NoteId(1), AddonNote(front="Edited", back="A"))
+    watermark = repository.changes_since().watermark
+    repository.update(NoteId(2), AddonNote(front="Edited", back="A"))
+    watermark = repository.changes_since(watermark).watermark
+
+    # When
+    changes = repository.changes_since(watermark)
+
+    # Then
+    assert len(changes) == 0
+
+
+def test_get_many_leaves_out_unknown_notes(
+    repository: AnkiNoteRepository,
+) -> None:
+    # When
+    notes = repository.get_many([NoteId(1), NoteId(999), NoteId(2)])
+
+    # Then
+    assert list(notes) == [1, 2]
+    assert notes[NoteId(1)] == repository.get(NoteId(1))
+
+
+def test_find_ids_by_guid_leaves_out_unknown_guids(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    guid = repository.get(NoteId(2)).guid
+
+    # When
+    ids = repository.find_ids_by_guid([guid, "unknown"])
+
+    # Then
+    assert ids == {guid: NoteId(2)}
+
+
+def test_update_many_writes_every_note(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    edits = {
+        NoteId(1): AddonNote(front="New 1", back="Back 1", tags=["a"]),
+        NoteId(2): AddonNote(front="New 2", back="Back 2", tags=["b"]),
+    }
+
+    # When
+    repository.update_many(edits)
+
+    # Then
+    assert repository.get(NoteId(1)).front == "New 1"
+    assert repository.get(NoteId(2)).tags == ["b"]
+
+
+def test_update_many_with_unknown_note_writes_nothing(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    edits = {
+        NoteId(1): AddonNote(front="New 1", back="Back 1"),
+        NoteId(999): AddonNote(front="Ghost", back="Ghost"),
+    }
+    before = repository.get(NoteId(1))
+
+    # When / Then
+    with pytest.raises(NoteNotFoundError):
+        repository.update_many(edits)
+    assert repository.get(NoteId(1)) == before
+
+
+def test_add_many_returns_distinct_ids_in_order(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    notes = [
+        AddonNote(front="First", back="1"),
+        AddonNote(front="Second", back="2"),
+    ]
+
+    # When
+    note_ids = repository.add_many(notes, deck_name="Default")
+
+    # Then
+    assert len(set(note_ids)) == 2
+    assert [repository.get(nid).front for nid in note_ids] == [
+        "First",
+        "Second",
+    ]
+
+
+def test_transaction_records_one_undo_entry(
+    repository: AnkiNoteRepository, collection: FakeCollection
+) -> None:
+    # When
+    with repository.transaction("Apply curation"):
+        repository.update_many(
+            {NoteId(1): AddonNote(front="Edited", back="Back")}
+        )
+        repository.remove([NoteId(2)])
+
+    # Then
+    assert [name for name, _ in collection.undo_entries] == ["Apply curation"]
+    assert repository.get(NoteId(1)).front == "Edited"
+
+
+def test_transaction_rolls_back_writes_when_block_raises(
+    repository: AnkiNoteRepository,
+) -> None:
+    # Given
+    before = repository.get(NoteId(1))
+
+    # When
+    with pytest.raises(RuntimeError):
+        with repository.transaction("Apply curation"):
+            repository.update_many(
+                {NoteId(1): AddonNote(front="Edited", back="Back")}
+            )
+            repository.remove([NoteId(2)])
+            raise RuntimeError("boom")
+
+    # Then
+    assert repository.get(NoteId(1)) == before
+    assert repository.get_many([NoteId(2)]) != {}
+
+
+def test_transaction_rollback_leaves_nothing_to_redo(
+    repository: AnkiNoteRepository, collection: FakeCollection
+) -> None:
+    # Given
+    collection.add_custom_undo_entry("Earlier edit")
+
+    # When
+    with pytest.raises(RuntimeError):
+        with repository.transaction("Apply curation"):
+            repository.remove([NoteId(2)])
+            raise RuntimeError("boom")
+
+    # Then
+    assert collection.undo_status().redo == ""
+    assert collection.undo_status().undo == "Earlier edit"
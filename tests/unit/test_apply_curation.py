@@ -1,7 +1,11 @@
 import pytest
 from tests.fakes.note_fakes import FakeNoteRepository
 
-from addon.application.use_cases.apply_curation import apply_proposals
+from addon.application.use_cases.apply_curation import (
+    ApplyCancelledError,
+    ApplyStatus,
+    apply_proposals,
+)
 from addon.domain.entities.note import AddonNote, NoteId
 from addon.domain.entities.proposals import (
     CreateProposal,
@@ -111,3 +115,177 @@ def test_apply_empty_list_reports_zero(
 
     # Then
     assert str(report) == "Applied 0 edit(s), 0 create(s), 0 delete(s)"
+
+
+def test_apply_reports_outcome_per_proposal_in_order(
+    repository: FakeNoteRepository,
+) -> None:
+    # Given
+    proposals = list(_change_set(repository))
+
+    # When
+    report = apply_proposals(repository, proposals, deck_name="Default")
+
+    # Then
+    assert [o.proposal for o in report.outcomes] == proposals
+    assert all(o.status == ApplyStatus.APPLIED for o in report.outcomes)
+    created_id = report.outcomes[1].note_id
+    assert created_id is not None
+    assert repository.get(created_id).front == "Default beta_2?"
+
+
+def test_apply_writes_batch_in_one_transaction(
+    repository: FakeNoteRepository,
+) -> None:
+    # Given
+    proposals = list(_change_set(repository))
+
+    # When
+    apply_proposals(repository, proposals, deck_name="Default")
+
+    # Then
+    assert repository.transactions == ["Apply curation"]
+
+
+def test_apply_skips_proposals_for_notes_that_no_longer_exist(
+    repository: FakeNoteRepository,
+) -> None:
+    # Given
+    proposals = list(_change_set(repository))
+    repository.remove([NoteId(2)])
+
+    # When
+    report = apply_proposals(repository, proposals, deck_name="Default")
+
+    # Then
+    assert report.deletes == 0
+    assert [o.proposal for o in report.skipped] == [proposals[2]]
+    assert report.skipped[0].reason == "note not found"
+    assert str(report).endswith("; skipped 1")
+    assert "0.999" in repository.get(NoteId(1)).back
+
+
+class _FailingAddRepository(FakeNoteRepository):
+    def add_many(self, notes: list[AddonNote], deck_name: str) -> list[NoteId]:
+        raise RuntimeError("Deck 'Default' not found.")
+
+
+def test_apply_rolls_back_earlier_writes_when_one_fails() -> None:
+    # Given
+    repository = _FailingAddRepository(
+        {1: AddonNote(front="Q", back="A"), 2: AddonNote(front="D", back="d")}
+    )
+    proposals = list(_change_set(repository))
+
+    # When
+    with pytest.raises(RuntimeError):
+        apply_proposals(repository, proposals, deck_name="Default")
+
+    # Then
+    assert repository.get(NoteId(1)).back == "A"
+    assert repository.transactions == []
+
+
+def test_apply_skips_proposals_whose_note_changed_since_proposed(
+    repository: FakeNoteRepository,
+) -> None:
+    # Given
+    proposals = list(_change_set(repository))
+    newer = AddonNote(front="Edited by the user", back="meanwhile")
+    repository.update(NoteId(1), newer)
+
+    # When
+    report = apply_proposals(repository, proposals, deck_name="Default")
+
+    # Then
+    assert report.edits == 0
+    assert report.outcomes[0].status == ApplyStatus.STALE
+    assert repository.get(NoteId(1)) == newer
+    assert report.creates == 1
+    assert report.deletes == 1
+
+
+class _CountingReadsRepository(FakeNoteRepository):
+    def __init__(self, notes: dict[int, AddonNote]) -> None:
+        super().__init__(notes)
+        self.notes_read = 0
+
+    def get_many(self, note_ids: list[NoteId]) -> dict[NoteId, AddonNote]:
+        self.notes_read += len(note_ids)
+        return super().get_many(note_ids)
+
+
+def test_apply_checks_recorded_mods_without_reading_notes() -> None:
+    # Given
+    repository = _CountingReadsRepository(
+        {
+            1: AddonNote(front="Q1", back="A1"),
+            2: AddonNote(front="Q2", back="A2"),
+        }
+    )
+    mods = repository.get_mods([NoteId(1), NoteId(2)])
+    proposals = [
+        EditProposal(
+            NoteId(note_id),
+            before=repository.get(NoteId(note_id)),
+            after=AddonNote(front=f"Q{note_id}", back="edited"),
+            rationale="",
+            before_mod=mods[NoteId(note_id)],
+        )
+        for note_id in (1, 2)
+    ]
+    # Same content, but saved again after the proposal was made.
+    repository.update(NoteId(2), repository.get(NoteId(2)))
+
+    # When
+    report = apply_proposals(repository, proposals, deck_name="Default")
+
+    # Then
+    assert repository.notes_read == 0
+    assert [o.status for o in report.outcomes] == [
+        ApplyStatus.APPLIED,
+        ApplyStatus.STALE,
+    ]
+    assert repository.get(NoteId(2)).back == "A2"
+
+
+def test_apply_reports_progress_until_every_proposal_is_written(
+    repository: FakeNoteRepository,
+) -> None:
+    # Given
+    proposals = list(_change_set(repository))
+    updates: list[tuple[int, int]] = []
+
+    # When
+    apply_proposals(
+        repository,
+        proposals,
+        deck_name="Default",
+        on_progress=lambda done, total: updates.append((done, total)),
+    )
+
+    # Then
+    assert updates == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_apply_cancelled_part_way_rolls_back_earlier_writes(
+    repository: FakeNoteRepository,
+) -> None:
+    # Given
+    proposals = list(_change_set(repository))
+    updates: list[tuple[int, int]] = []
+
+    # When
+    with pytest.raises(ApplyCancelledError):
+        apply_proposals(
+            repository,
+            proposals,
+            deck_name="Default",
+            on_progress=lambda done, total: updates.append((done, total)),
+            is_cancelled=lambda: len(updates) == 1,
+        )
+
+    # Then
+    assert updates == [(1, 3)]
+    assert "0.999" not in repository.get(NoteId(1)).back
+    assert repository.transactions == []
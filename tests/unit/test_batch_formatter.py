@@ -0,0 +1,280 @@
+import json
+import threading
+import time
+
+import pytest
+from tests.fakes.openai_fakes import FakeCompletionProvider
+
+from addon.application.services.batch_formatter import BatchFormatter
+from addon.application.services.formatter_service import NoteFormatter
+from addon.domain.entities.note import AddonNote, NoteId
+
+_RESPONSE = json.dumps({"front": "Formatted Q", "back": "Formatted A"})
+
+
+class _SlowProvider(FakeCompletionProvider):
+    """Answers every call after a short delay, recording the highest
+    number of calls in flight at once."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.max_in_flight = 0
+
+    def run(self, prompt: str | list[dict], **kwargs) -> str:
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self._in_flight -= 1
+        if "Broken" in str(prompt):
+            raise RuntimeError("LLM server returned error 500")
+        return _RESPONSE
+
+
+def _notes(count: int) -> dict[NoteId, AddonNote]:
+    return {
+        NoteId(i): AddonNote(front=f"Q{i}", back=f"A{i}")
+        for i in range(1, count + 1)
+    }
+
+
+def test_every_note_gets_a_suggestion_in_the_queue() -> None:
+    # Given
+    batch = BatchFormatter(NoteFormatter(_SlowProvider()), max_workers=3)
+
+    # When
+    batch.submit(_notes(6))
+    batch.wait()
+
+    # Then
+    stats = batch.stats()
+    assert (stats.total, stats.completed, stats.queue_depth) == (6, 6, 6)
+    suggestion = batch.take(NoteId(2))
+    assert suggestion is not None
+    assert suggestion.original.front == "Q2"
+    assert suggestion.formatted is not None
+    assert suggestion.formatted.front == "Formatted Q"
+    assert batch.take(NoteId(2)) is None
+    assert batch.stats().queue_depth == 5
+
+
+def test_formatter_calls_are_bounded_by_max_workers() -> None:
+    # Given
+    provider = _SlowProvider()
+    batch = BatchFormatter(NoteFormatter(provider), max_workers=2)
+
+    # When
+    batch.submit(_notes(8))
+    batch.wait()
+
+    # Then
+    assert provider.max_in_flight == 2
+
+
+def test_failed_note_is_queued_with_error_without_stopping_batch() -> None:
+    # Given
+    notes = _notes(3)
+    notes[NoteId(2)] = AddonNote(front="Broken", back="note")
+    batch = BatchFormatter(NoteFormatter(_SlowProvider()), max_workers=2)
+
+    # When
+    batch.submit(notes)
+    batch.wait()
+
+    # Then
+    failed = batch.take(NoteId(2))
+    assert failed is not None
+    assert failed.formatted is None
+    assert "500" in failed.error
+    stats = batch.stats()
+    assert (stats.completed, stats.failed) == (3, 1)
+
+
+def test_stats_report_throughput_in_notes_per_minute() -> None:
+    # Given
+    now = [100.0]
+    batch = BatchFormatter(
+        NoteFormatter(FakeCompletionProvider([_RESPONSE] * 3)),
+        max_workers=1,
+        clock=lambda: now[0],
+    )
+
+    # When
+    batch.submit(_notes(3))
+    batch.wait()
+    now[0] += 30.0
+
+    # Then
+    stats = batch.stats()
+    assert stats.notes_per_minute == pytest.approx(6.0)
+    assert str(stats) == "3/3 formatted, 6.0 notes/min, 3 ready"
+
+
+def test_max_workers_must_be_positive() -> None:
+    # When / Then
+    with pytest.raises(ValueError):
+        BatchFormatter(NoteFormatter(FakeCompletionProvider()), max_workers=0)
+
+
+def test_submitted_ids_are_loaded_by_the_workers() -> None:
+    # Given
+    notes = _notes(3)
+    notes.pop(NoteId(2))
+    loaded: list[NoteId] = []
+
+    def load(note_id: NoteId) -> AddonNote:
+        loaded.append(note_id)
+        return notes[note_id]  # note 2 was deleted: KeyError
+
+    batch = BatchFormatter(NoteFormatter(_SlowProvider()), max_workers=1)
+
+    # When
+    batch.submit_ids([NoteId(1), NoteId(2), NoteId(3)], load)
+    batch.wait()
+
+    # Then
+    assert loaded == [1, 2, 3]
+    suggestion = batch.take(NoteId(3))
+    assert suggestion is not None
+    assert suggestion.formatted is not None
+    failed = batch.take(NoteId(2))
+    assert failed is not None
+    assert failed.original is None
+    assert failed.formatted is None
+    assert batch.stats().failed == 1
+
+
+def test_resubmitting_a_window_only_sends_new_notes() -> None:
+    # Given
+    provider = FakeCompletionProvider([_RESPONSE] * 3)
+    batch = BatchFormatter(NoteFormatter(provider), max_workers=1)
+    notes = _notes(3)
+
+    # When
+    batch.submit({NoteId(1): notes[1], NoteId(2): notes[2]})
+    batch.submit({NoteId(2): notes[2], NoteId(3): notes[3]})
+    batch.wait()
+
+    # Then
+    assert len(provider.prompts_received) == 3
+    assert batch.stats().total == 3
+
+
+def test_cancelled_notes_are_never_queued() -> None:
+    # Given
+    provider = _SlowProvider()
+    batch = BatchFormatter(NoteFormatter(provider), max_workers=1)
+    batch.submit(_notes(5))
+
+    # When
+    batch.cancel([NoteId(4), NoteId(5)])
+    batch.wait()
+
+    # Then
+    assert batch.take(NoteId(4)) is None
+    assert batch.take(NoteId(5)) is None
+    stats = batch.stats()
+    assert (stats.completed, stats.cancelled) == (3, 2)
+
+
+def test_cancelling_a_taken_suggestion_does_not_count_as_cancelled() -> None:
+    # Given
+    batch = BatchFormatter(
+        NoteFormatter(FakeCompletionProvider([_RESPONSE])), max_workers=1
+    )
+    batch.submit(_notes(1))
+    batch.wait()
+    batch.take(NoteId(1))
+
+    # When
+    batch.cancel([NoteId(1)])
+
+    # Then
+    assert batch.stats().cancelled == 0
+
+
+def test_wait_for_blocks_until_the_suggestion_is_ready() -> None:
+    # Given
+    batch = BatchFormatter(NoteFormatter(_SlowProvider()), max_workers=1)
+    batch.submit(_notes(2))
+
+    # When
+    suggestion = batch.wait_for(NoteId(2))
+
+    # Then
+    assert suggestion is not None
+    assert suggestion.original.front == "Q2"
+    assert batch.take(NoteId(2)) is None
+
+
+def test_wait_for_cancels_the_note_when_asked() -> None:
+    # Given
+    provider = _SlowProvider()
+    batch = BatchFormatter(NoteFormatter(provider), max_workers=1)
+    batch.submit(_notes(3))
+
+    # When
+    suggestion = batch.wait_for(NoteId(3), is_cancelled=lambda: True)
+    batch.wait()
+
+    # Then
+    assert suggestion is None
+    assert batch.take(NoteId(3)) is None
+    assert batch.stats().cancelled == 1
+
+
+def test_call_in_flight_before_a_resubmit_does_not_store_its_result() -> None:
+    # Given
+    release = threading.Event()
+
+    def load_old(note_id: NoteId) -> AddonNote:
+        release.wait(timeout=5)
+        return AddonNote(front="Old", back="A")
+
+    batch = BatchFormatter(NoteFormatter(_SlowProvider()), max_workers=2)
+    batch.submit_ids([NoteId(1)], load_old)
+    batch.cancel([NoteId(1)])
+
+    # When
+    batch.submit({NoteId(1): AddonNote(front="New", back="A")})
+    batch.wait()
+    release.set()
+    batch.shutdown(wait=True)
+
+    # Then
+    suggestion = batch.take(NoteId(1))
+    assert suggestion is not None
+    assert suggestion.original is not None
+    assert suggestion.original.front == "New"
+    assert batch.take(NoteId(1)) is None
+
+
+def test_wait_for_returns_none_for_a_note_dropped_by_shutdown() -> None:
+    # Given
+    batch = BatchFormatter(NoteFormatter(_SlowProvider()), max_workers=1)
+    batch.submit(_notes(3))
+
+    # When
+    batch.shutdown()
+    suggestion = batch.wait_for(NoteId(3))
+
+    # Then
+    assert suggestion is None
+
+
+def test_note_can_be_resubmitted_after_wait_for() -> None:
+    # Given
+    provider = FakeCompletionProvider([_RESPONSE] * 2)
+    batch = BatchFormatter(NoteFormatter(provider), max_workers=1)
+    batch.submit(_notes(1))
+    batch.wait_for(NoteId(1))
+
+    # When
+    batch.submit(_notes(1))
+    batch.wait()
+
+    # Then
+    assert len(provider.prompts_received) == 2
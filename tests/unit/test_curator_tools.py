@@ -1,4 +1,5 @@
 import pytest
+from tests.fakes.domain_fakes import FakeDocumentRepository
 from tests.fakes.note_fakes import FakeNoteRepository
 
 from addon.application.services.curator_tools import CuratorTools
@@ -8,6 +9,12 @@ from addon.domain.entities.proposals import (
     DeleteProposal,
     EditProposal,
 )
+from addon.domain.repositories.document_repository import (
+    convert_addon_note_to_document,
+)
+from addon.infrastructure.persistence.hybrid_repository import (
+    HybridDocumentRepository,
+)
 
 
 @pytest.fixture
@@ -86,6 +93,34 @@ def test_search_reports_when_nothing_matches(tools: CuratorTools) -> None:
     assert result == "No notes found for query: 'kubernetes'"
 
 
+def test_find_similar_notes_returns_note_ids_with_snippets(
+    adam_cluster: dict[int, AddonNote],
+) -> None:
+    # Given - a hybrid index whose dense side finds nothing, so the
+    # lexical side answers
+    documents = HybridDocumentRepository(FakeDocumentRepository())
+    documents.store_batch(
+        [convert_addon_note_to_document(n) for n in adam_cluster.values()]
+    )
+    tools = CuratorTools(FakeNoteRepository(adam_cluster), documents=documents)
+
+    # When
+    result = tools.find_similar_notes("capital of France", limit=2)
+
+    # Then
+    assert result.splitlines()[0] == "4: What is the capital of France?"
+
+
+def test_find_similar_notes_without_index_is_an_error(
+    tools: CuratorTools,
+) -> None:
+    # When
+    result = tools.find_similar_notes("beta")
+
+    # Then
+    assert result.startswith("error:")
+
+
 def test_search_snippets_are_plain_text_and_truncated() -> None:
     # Given
     long_html_front = "<b>Bold</b><br>" + "x" * 200
@@ -141,6 +176,7 @@ def test_propose_edit_records_before_and_after(
     assert edit.after.front == "New front"
     assert edit.after.tags == ["ml"]
     assert edit.rationale == "tighter wording"
+    assert edit.before_mod == 0
 
 
 def test_propose_edit_reports_unknown_note(tools: CuratorTools) -> None:
@@ -227,6 +263,7 @@ def test_propose_delete_records_before_snapshot(
     (delete,) = _deletes(tools)
     assert delete.note_id == 4
     assert delete.before.back == "Paris"
+    assert delete.before_mod == 0
 
 
 def test_propose_delete_supersedes_pending_edit(
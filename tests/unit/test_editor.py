@@ -1,6 +1,12 @@
 import pytest
-from tests.conftest import FakeCollection, FakeMainWindow, FakeNote
-
+from tests.conftest import (
+    FakeCard,
+    FakeCollection,
+    FakeMainWindow,
+    FakeNote,
+)
+
+from addon.application.use_cases.note_counter import clear_orange_flags
 from addon.infrastructure.ui.editor import EditorDialog
 
 
@@ -303,3 +309,117 @@ def test_skip_multiple_notes_preserves_original_content(
     assert restored_note2["Back"] == original_note2_back
     assert note3["Text"] == original_note3_front
     assert note3["Back Extra"] == original_note3_back
+
+
+def test_upcoming_notes_lists_notes_after_the_current_one(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    editor_dialog = EditorDialog(collection)
+
+    # When
+    upcoming = editor_dialog.upcoming_notes(5)
+    editor_dialog.move_to_next_note()
+
+    # Then
+    assert [note.id for note in upcoming] == [3, 4]
+    assert [note.id for note in editor_dialog.upcoming_notes(1)] == [4]
+
+
+class _CountingCollection(FakeCollection):
+    def __init__(self) -> None:
+        super().__init__()
+        self.notes_loaded = 0
+
+    def get_note(self, note_id):
+        self.notes_loaded += 1
+        return super().get_note(note_id)
+
+
+def test_review_notes_are_loaded_on_demand() -> None:
+    """Opening the editor loads only the first note and its read-ahead
+    window, and notes the review moved past are released."""
+    # Given
+    collection = _CountingCollection()
+    for note_id in range(1, 11):
+        collection.notes[note_id] = FakeNote(
+            note_id, {"Front": f"Q{note_id}", "Back": f"A{note_id}"}
+        )
+        collection.cards[100 + note_id] = FakeCard(100 + note_id, note_id, 2)
+
+    # When
+    editor_dialog = EditorDialog(collection)  # type: ignore
+    first = editor_dialog.current_note()
+
+    # Then
+    assert len(editor_dialog) == 10
+    assert first.id == 1
+    assert collection.notes_loaded == 4
+
+    # When
+    editor_dialog.move_to_next_note()
+
+    # Then
+    assert editor_dialog.review_notes.loaded_count == 3
+    assert collection.notes_loaded == 4
+
+
+def test_remaining_note_ids_does_not_load_notes() -> None:
+    # Given
+    collection = _CountingCollection()
+    for note_id in range(1, 11):
+        collection.notes[note_id] = FakeNote(
+            note_id, {"Front": f"Q{note_id}", "Back": f"A{note_id}"}
+        )
+        collection.cards[100 + note_id] = FakeCard(100 + note_id, note_id, 2)
+    editor_dialog = EditorDialog(collection)  # type: ignore
+
+    # When
+    note_ids = editor_dialog.remaining_note_ids()
+
+    # Then
+    assert note_ids == list(range(1, 11))
+    assert collection.notes_loaded == 0
+
+
+def test_deferred_flags_are_cleared_in_one_batch(
+    mw: FakeMainWindow, collection: FakeCollection
+) -> None:
+    """Saved notes keep their flag until the end of the session, when
+    all of them are cleared with a single flag update."""
+    # Given
+    editor_dialog = EditorDialog(collection)
+    editor_dialog.defer_strip_orange_flag(editor_dialog.current_note())
+    editor_dialog.defer_strip_orange_flag(editor_dialog.move_to_next_note())
+    assert all(
+        card.flags == 2
+        for card in collection.cards.values()
+        if card.note_id in (1, 3)
+    )
+
+    # When
+    note_ids = editor_dialog.take_deferred_flag_note_ids()
+    result = clear_orange_flags(collection, note_ids)
+
+    # Then
+    assert note_ids == [1, 3]
+    assert result.count == 4
+    flags = {card.note_id: card.flags for card in collection.cards.values()}
+    assert flags == {1: 0, 2: 0, 3: 0, 4: 2}
+    assert editor_dialog.take_deferred_flag_note_ids() == []
+
+
+def test_is_unchanged_detects_edits_to_the_current_note(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    editor_dialog = EditorDialog(collection)
+    note = editor_dialog.current_note()
+    unchanged_before_edit = editor_dialog.is_unchanged(note)
+
+    # When
+    note["Front"] = "Edited while the suggestion was pending"
+
+    # Then
+    assert unchanged_before_edit
+    assert not editor_dialog.is_unchanged(note)
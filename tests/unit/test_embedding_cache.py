@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import numpy as np
+from tests.fakes.qdrant_fakes import FakeSentenceTransformer
+
+from addon.infrastructure.persistence.embedding_cache import (
+    CachedEmbeddingModel,
+    MemmapEmbeddingCache,
+)
+
+
+class _LengthEncoder(FakeSentenceTransformer):
+    """Encodes each text as a vector filled with its length, so cached
+    rows can be told apart."""
+
+    def encode(self, sentences, batch_size: int = 32):  # type: ignore[override]
+        self.encode_calls.append(len(sentences))
+        return [[float(len(text))] * 7 for text in sentences]
+
+
+def _model(path: Path, encoder: FakeSentenceTransformer, model_id="m"):
+    return CachedEmbeddingModel(
+        encoder, MemmapEmbeddingCache(path, model_id, dim=7, initial_rows=2)
+    )
+
+
+def test_only_texts_missing_from_the_cache_are_encoded(tmp_path: Path) -> None:
+    # Given
+    encoder = _LengthEncoder()
+    model = _model(tmp_path, encoder)
+    model.encode(["a", "bb"])
+
+    # When
+    vectors = model.encode(["bb", "ccc", "a"])
+
+    # Then
+    assert encoder.encode_calls == [2, 1]
+    assert vectors[:, 0].tolist() == [2.0, 3.0, 1.0]
+
+
+def test_cached_vectors_survive_reopening(tmp_path: Path) -> None:
+    # Given - more texts than the initial rows, so the file grows
+    _model(tmp_path, _LengthEncoder()).encode(["a", "bb", "ccc", "dddd"])
+    encoder = _LengthEncoder()
+
+    # When
+    vectors = _model(tmp_path, encoder).encode(["dddd", "a"])
+
+    # Then
+    assert encoder.encode_calls == []
+    assert vectors[:, 0].tolist() == [4.0, 1.0]
+
+
+def test_another_model_does_not_reuse_the_cache(tmp_path: Path) -> None:
+    # Given
+    _model(tmp_path, _LengthEncoder(), model_id="old").encode(["a"])
+    encoder = _LengthEncoder()
+
+    # When
+    model = _model(tmp_path, encoder, model_id="new")
+    model.encode(["a"])
+
+    # Then
+    assert encoder.encode_calls == [1]
+
+
+def test_compact_drops_rows_not_used_since_opening(tmp_path: Path) -> None:
+    # Given - "bb" was deleted from the collection since the last load
+    _model(tmp_path, _LengthEncoder()).encode(["a", "bb", "ccc"])
+    model = _model(tmp_path, _LengthEncoder())
+    model.encode(["a", "ccc"])
+
+    # When
+    dropped = model.compact()
+
+    # Then
+    assert dropped == 1
+    encoder = _LengthEncoder()
+    reopened = _model(tmp_path, encoder)
+    vectors = reopened.encode(["ccc", "a"])
+    assert encoder.encode_calls == []
+    assert vectors[:, 0].tolist() == [3.0, 1.0]
+    assert len(MemmapEmbeddingCache(tmp_path, "m", dim=7)) == 2
+
+
+def test_single_text_gives_one_vector(tmp_path: Path) -> None:
+    # When
+    vector = _model(tmp_path, _LengthEncoder()).encode("abc")
+
+    # Then
+    assert np.asarray(vector).tolist() == [3.0] * 7
+
+
+def test_single_texts_are_not_added_to_the_cache(tmp_path: Path) -> None:
+    # Given
+    encoder = _LengthEncoder()
+    model = _model(tmp_path, encoder)
+    model.encode(["stored note"])
+
+    # When - queries, one known and one not
+    model.encode("stored note")
+    model.encode("a query")
+
+    # Then
+    assert encoder.encode_calls == [1, 1]
+    assert len(MemmapEmbeddingCache(tmp_path, "m", dim=7)) == 1
@@ -3,7 +3,14 @@ from typing import Optional
 
 import pytest
 
-from addon.domain.entities.note import AddonNote, AddonNoteType
+from addon.domain.entities.note import AddonNote, AddonNoteType, NoteId
+from addon.domain.entities.proposals import (
+    ConflictingProposalError,
+    CreateProposal,
+    DeleteProposal,
+    EditProposal,
+    ProposedChangeSet,
+)
 from addon.domain.repositories.document_repository import (
     convert_addon_note_to_document,
     convert_document_to_addon_note,
@@ -113,3 +120,55 @@ def test_convert_addon_note_to_document_joins_tags_with_spaces() -> None:
     # Verify front and back are also included
     assert "test front" in doc.content
     assert "test back" in doc.content
+
+
+def test_document_id_is_stable_for_the_same_note() -> None:
+    # Given
+    note = AddonNote(front="front", back="back", guid="abc")
+    edited = AddonNote(front="new front", back="back", guid="abc")
+    other = AddonNote(front="front", back="back", guid="xyz")
+
+    # When
+    first = convert_addon_note_to_document(note)
+    again = convert_addon_note_to_document(edited)
+    different = convert_addon_note_to_document(other)
+
+    # Then
+    assert first.id == again.id
+    assert first.id != different.id
+
+
+def _edit(note_id: int, back: str) -> EditProposal:
+    before = AddonNote(front="f", back="b", guid=str(note_id))
+    after = AddonNote(front="f", back=back, guid=str(note_id))
+    return EditProposal(NoteId(note_id), before, after, "rationale")
+
+
+def test_change_set_iterates_in_recording_order_after_replacement() -> None:
+    # Given
+    change_set = ProposedChangeSet()
+    create = CreateProposal(AddonNote(front="new", back="note"), "gap")
+    change_set.add_edit(_edit(1, "first"))
+    change_set.add_create(create)
+    change_set.add_edit(_edit(2, "other"))
+
+    # When — a newer edit of note 1 replaces the older one
+    change_set.add_edit(_edit(1, "second"))
+
+    # Then — the replacement moves to the end, like a fresh proposal
+    assert list(change_set) == [create, _edit(2, "other"), _edit(1, "second")]
+
+
+def test_change_set_rejects_edit_and_delete_after_delete() -> None:
+    # Given
+    change_set = ProposedChangeSet()
+    change_set.add_edit(_edit(1, "edited"))
+    before = AddonNote(front="f", back="b")
+    change_set.add_delete(DeleteProposal(NoteId(1), before, "duplicate"))
+
+    # When / Then
+    with pytest.raises(ConflictingProposalError):
+        change_set.add_edit(_edit(1, "again"))
+    with pytest.raises(ConflictingProposalError):
+        change_set.add_delete(DeleteProposal(NoteId(1), before, "again"))
+    assert len(change_set) == 1
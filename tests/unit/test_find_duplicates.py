@@ -1,3 +1,4 @@
+import pytest
 from tests.fakes.domain_fakes import FakeDocumentRepository
 from tests.fakes.qdrant_fakes import FakeQdrantClient, FakeSentenceTransformer
 
@@ -6,6 +7,7 @@ from addon.application.use_cases.note_duplicate_finder import (
 )
 from addon.domain.entities.note import AddonCollection, AddonNote
 from addon.domain.repositories.document_repository import (
+    SearchResult,
     convert_addon_note_to_document,
 )
 from addon.infrastructure.persistence.qdrant_repository import (
@@ -140,3 +142,124 @@ def test_find_duplicates_joins_tags_with_spaces(
     query_text = repository.captured_queries[0]
     assert "python programming" in query_text
     assert "pythonprogramming" not in query_text
+
+
+def _neighbor(note: AddonNote, score: float) -> SearchResult:
+    return SearchResult(convert_addon_note_to_document(note), score)
+
+
+def _doc_id(note: AddonNote) -> str:
+    return convert_addon_note_to_document(note).id
+
+
+def test_find_duplicate_groups_merges_overlapping_pairs() -> None:
+    # Given - a~b and b~c are above the threshold, a and c are not
+    a, b, c, d = (AddonNote(front=f"q{i}", back="a") for i in range(4))
+    collection = AddonCollection(name="default")
+    collection.add(notes=[a, b, c, d])
+    repository = FakeDocumentRepository(
+        neighbors={
+            _doc_id(a): [_neighbor(b, 0.95), _neighbor(c, 0.5)],
+            _doc_id(b): [_neighbor(a, 0.95), _neighbor(c, 0.92)],
+            _doc_id(c): [_neighbor(b, 0.92)],
+            _doc_id(d): [_neighbor(a, 0.3)],
+        }
+    )
+    finder = SimilarNoteFinder(collection=collection, repository=repository)
+
+    # When
+    groups = finder.find_duplicate_groups(threshold=0.9)
+
+    # Then - one batched lookup, one group of three, d left out
+    assert repository.neighbor_calls == 1
+    assert len(groups) == 1
+    assert [n.guid for n in groups[0].notes] == [a.guid, b.guid, c.guid]
+    assert groups[0].similarity == pytest.approx(0.95)
+
+
+def test_find_duplicate_groups_ranks_by_similarity_then_size() -> None:
+    # Given
+    notes = [AddonNote(front=f"q{i}", back="a") for i in range(5)]
+    collection = AddonCollection(name="default")
+    collection.add(notes=notes)
+    repository = FakeDocumentRepository(
+        neighbors={
+            _doc_id(notes[0]): [_neighbor(notes[1], 0.91)],
+            _doc_id(notes[1]): [_neighbor(notes[2], 0.91)],
+            _doc_id(notes[3]): [_neighbor(notes[4], 0.99)],
+        }
+    )
+    finder = SimilarNoteFinder(collection=collection, repository=repository)
+
+    # When
+    groups = finder.find_duplicate_groups(threshold=0.9)
+
+    # Then
+    assert [len(g.notes) for g in groups] == [2, 3]
+    assert groups[0].similarity == pytest.approx(0.99)
+
+
+def test_find_duplicate_groups_ignores_notes_not_in_the_collection(
+    addon_collection: AddonCollection,
+    addon_note1: AddonNote,
+) -> None:
+    # Given - the index still holds a note deleted from the collection
+    deleted = AddonNote(front="deleted", back="note")
+    repository = FakeDocumentRepository(
+        neighbors={_doc_id(addon_note1): [_neighbor(deleted, 0.99)]}
+    )
+    finder = SimilarNoteFinder(
+        collection=addon_collection, repository=repository
+    )
+
+    # When / Then
+    assert finder.find_duplicate_groups() == []
+
+
+def test_find_verbatim_duplicate_groups_ignores_markup() -> None:
+    # Given - a note imported twice, once with extra HTML
+    original = AddonNote(
+        front="What is the capital of France?", back="Paris is the capital."
+    )
+    reimported = AddonNote(
+        front="<div><b>What</b> is the capital of&nbsp;France?</div>",
+        back="Paris is the capital.<br>",
+    )
+    other = AddonNote(
+        front="What is the capital of Spain?", back="Madrid, on the plateau."
+    )
+    collection = AddonCollection(name="default")
+    collection.add(notes=[original, other, reimported])
+    repository = FakeDocumentRepository()
+    finder = SimilarNoteFinder(collection=collection, repository=repository)
+
+    # When
+    groups = finder.find_verbatim_duplicate_groups(threshold=0.8)
+
+    # Then - found without querying the repository
+    assert repository.neighbor_calls == 0
+    assert repository.captured_queries == []
+    assert len(groups) == 1
+    assert [n.guid for n in groups[0].notes] == [
+        original.guid,
+        reimported.guid,
+    ]
+    assert groups[0].similarity == pytest.approx(1.0)
+
+
+def test_reloading_removes_notes_that_left_the_collection(
+    addon_note1: AddonNote, addon_note2: AddonNote
+) -> None:
+    # Given
+    collection = AddonCollection(name="default")
+    collection.add(notes=[addon_note1, addon_note2])
+    repository = FakeDocumentRepository()
+    finder = SimilarNoteFinder(collection=collection, repository=repository)
+    finder.load_collection()
+
+    # When - the second note is deleted
+    collection.notes.remove(addon_note2)
+    finder.load_collection()
+
+    # Then
+    assert repository.removed_ids == [_doc_id(addon_note2)]
@@ -1,13 +1,21 @@
 import json
 
+import pytest
 from tests.fakes.aqt_fakes import FakeNote
 from tests.fakes.openai_fakes import FakeCompletionProvider
 
 from addon.application.services.formatter_service import (
     AnkiNoteMapper,
+    FormatterOutputMode,
+    InvalidEditError,
     NoteFormatter,
+    apply_note_edits,
 )
 from addon.domain.entities.note import AddonNote, AddonNoteType
+from addon.infrastructure.llm.schemas import NoteEdit
+from addon.infrastructure.persistence.formatter_cache import (
+    SqliteFormatterCache,
+)
 
 
 def test_format_note_using_llm(addon_note1: AddonNote) -> None:
@@ -147,3 +155,196 @@ def test_merge_skips_extra_fields_the_notetype_does_not_have() -> None:
 
     # Then
     assert "Extra" not in anki_note.keys()
+
+
+def test_identical_note_is_answered_from_cache(tmp_path) -> None:
+    # Given
+    response = json.dumps({"front": "Q", "back": "A"})
+    fake_llm = FakeCompletionProvider([response])
+    cache = SqliteFormatterCache(tmp_path / "cache.sqlite3")
+    formatter = NoteFormatter(fake_llm, cache, model_name="model-a")
+    note = AddonNote(front="front", back="back", tags=["t"])
+
+    # When
+    first = formatter.format(note)
+    second = formatter.format(
+        AddonNote(front="front", back="back", tags=["t"])
+    )
+
+    # Then
+    assert len(fake_llm.prompts_received) == 1
+    assert (second.front, second.back) == (first.front, first.back)
+    assert formatter.cache_hit_rate == 0.5
+
+
+def test_cache_is_keyed_by_model_name(tmp_path) -> None:
+    # Given
+    response = json.dumps({"front": "Q", "back": "A"})
+    cache = SqliteFormatterCache(tmp_path / "cache.sqlite3")
+    note = AddonNote(front="front", back="back")
+    NoteFormatter(FakeCompletionProvider([response]), cache, "model-a").format(
+        note
+    )
+    fake_llm = FakeCompletionProvider([response])
+
+    # When
+    NoteFormatter(fake_llm, cache, "model-b").format(note)
+
+    # Then
+    assert len(fake_llm.prompts_received) == 1
+
+
+def test_malformed_response_is_not_cached(tmp_path) -> None:
+    # Given
+    fake_llm = FakeCompletionProvider(
+        ["not json", json.dumps({"front": "Q", "back": "A"})]
+    )
+    cache = SqliteFormatterCache(tmp_path / "cache.sqlite3")
+    formatter = NoteFormatter(fake_llm, cache)
+    note = AddonNote(front="front", back="back")
+
+    # When
+    with pytest.raises(ValueError):
+        formatter.format(note)
+    result = formatter.format(note)
+
+    # Then
+    assert result.front == "Q"
+    assert len(fake_llm.prompts_received) == 2
+
+
+def test_format_masks_images_and_restores_them_unchanged() -> None:
+    # Given
+    image = '<img src="data:image/png;base64,iVBORw0KGgo=">'
+    note = AddonNote(front="What is this?", back=f"A graph {image}")
+    response = json.dumps({"front": "In ML, what is this?", "back": "@@P0@@"})
+    fake_llm = FakeCompletionProvider([response])
+    formatter = NoteFormatter(fake_llm)
+
+    # When
+    result = formatter.format(note)
+
+    # Then
+    assert "base64" not in str(fake_llm.prompts_received[0])
+    assert result.back == image
+    assert formatter.tokens_saved > 0
+
+
+def test_format_removes_alt_tags_from_masked_images() -> None:
+    # Given
+    note = AddonNote(front="Q", back='A <img alt="diagram" src="g.png">')
+    response = json.dumps({"front": "Q", "back": "A @@P0@@"})
+    fake_llm = FakeCompletionProvider([response])
+    formatter = NoteFormatter(fake_llm)
+
+    # When
+    result = formatter.format(note)
+
+    # Then
+    assert "g.png" not in str(fake_llm.prompts_received[0])
+    assert "alt=" not in result.back
+    assert 'src="g.png"' in result.back
+
+
+def test_format_retries_unmasked_when_model_drops_a_placeholder() -> None:
+    # Given
+    image = '<img src="chart.png">'
+    note = AddonNote(front="Q", back=f"A {image}")
+    fake_llm = FakeCompletionProvider(
+        [
+            json.dumps({"front": "Q", "back": "A"}),
+            json.dumps({"front": "Q", "back": f"A {image}"}),
+        ]
+    )
+    formatter = NoteFormatter(fake_llm)
+
+    # When
+    result = formatter.format(note)
+
+    # Then
+    assert len(fake_llm.prompts_received) == 2
+    assert "chart.png" in str(fake_llm.prompts_received[1])
+    assert result.back == f"A {image}"
+
+
+def test_edits_mode_applies_the_edit_script_locally() -> None:
+    # Given
+    note = AddonNote(
+        front="what is adam?", back="An optimizer.\nUses momentum"
+    )
+    response = json.dumps(
+        {
+            "edits": [
+                {
+                    "field": "front",
+                    "find": "what is adam?",
+                    "replace": ("In deep learning, what is Adam?"),
+                },
+                {"field": "back", "find": "momentum", "replace": "momentum."},
+            ]
+        }
+    )
+    fake_llm = FakeCompletionProvider([response])
+    formatter = NoteFormatter(fake_llm, output_mode=FormatterOutputMode.EDITS)
+
+    # When
+    result = formatter.format(note)
+
+    # Then
+    assert result.front == "In deep learning, what is Adam?"
+    assert result.back == "An optimizer.<br>Uses momentum."
+    schema = fake_llm.kwargs_received[0]["response_format"]["json_schema"]
+    assert schema["name"] == "addon_note_edits"
+    assert formatter.edit_fallbacks == 0
+
+
+def test_edits_mode_falls_back_to_rewrite_when_an_edit_is_ambiguous() -> None:
+    # Given
+    note = AddonNote(front="a or a?", back="b")
+    fake_llm = FakeCompletionProvider(
+        [
+            json.dumps(
+                {"edits": [{"field": "front", "find": "a", "replace": "x"}]}
+            ),
+            json.dumps({"front": "x or a?", "back": "b"}),
+        ]
+    )
+    formatter = NoteFormatter(fake_llm, output_mode=FormatterOutputMode.EDITS)
+
+    # When
+    result = formatter.format(note)
+
+    # Then
+    assert result.front == "x or a?"
+    assert len(fake_llm.prompts_received) == 2
+    assert formatter.edit_fallbacks == 1
+
+
+def test_apply_note_edits_rejects_text_not_in_the_field() -> None:
+    # Given
+    note = AddonNote(front="front", back="back")
+    edits = [NoteEdit(field="back", find="front", replace="x")]
+
+    # When / Then
+    with pytest.raises(InvalidEditError):
+        apply_note_edits(note, edits)
+
+
+def test_cache_is_keyed_by_output_mode(tmp_path) -> None:
+    # Given
+    cache = SqliteFormatterCache(tmp_path / "cache.sqlite3")
+    note = AddonNote(front="front", back="back")
+    NoteFormatter(
+        FakeCompletionProvider([json.dumps({"front": "Q", "back": "A"})]),
+        cache,
+    ).format(note)
+    fake_llm = FakeCompletionProvider([json.dumps({"edits": []})])
+
+    # When
+    result = NoteFormatter(
+        fake_llm, cache, output_mode=FormatterOutputMode.EDITS
+    ).format(note)
+
+    # Then
+    assert len(fake_llm.prompts_received) == 1
+    assert (result.front, result.back) == ("front", "back")
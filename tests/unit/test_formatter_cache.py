@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import pytest
+
+from addon.infrastructure.persistence.formatter_cache import (
+    SqliteFormatterCache,
+)
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path) -> Path:
+    return tmp_path / "data" / "formatter_cache.sqlite3"
+
+
+def test_get_returns_what_was_put(cache_path: Path) -> None:
+    # Given
+    cache = SqliteFormatterCache(cache_path)
+
+    # When
+    cache.put("key", '{"front": "Q", "back": "A"}')
+
+    # Then
+    assert cache.get("key") == '{"front": "Q", "back": "A"}'
+    assert cache.get("other") is None
+
+
+def test_entries_survive_reopening(cache_path: Path) -> None:
+    # Given
+    cache = SqliteFormatterCache(cache_path)
+    cache.put("key", "value")
+    cache.close()
+
+    # When
+    reopened = SqliteFormatterCache(cache_path)
+
+    # Then
+    assert reopened.get("key") == "value"
+
+
+def test_evicts_least_recently_used_entries_beyond_size_budget(
+    cache_path: Path,
+) -> None:
+    # Given
+    cache = SqliteFormatterCache(cache_path, max_bytes=20)
+    cache.put("a", "x" * 8)
+    cache.put("b", "x" * 8)
+    cache.get("a")  # "b" is now the least recently used
+
+    # When
+    cache.put("c", "x" * 8)
+
+    # Then
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats().size_bytes == 16
+
+
+def test_recency_survives_reopening(cache_path: Path) -> None:
+    # Given
+    cache = SqliteFormatterCache(cache_path, max_bytes=20)
+    cache.put("a", "x" * 8)
+    cache.put("b", "x" * 8)
+    cache.get("a")
+    cache.close()
+
+    # When
+    reopened = SqliteFormatterCache(cache_path, max_bytes=20)
+    reopened.put("c", "x" * 8)
+
+    # Then
+    assert reopened.get("b") is None
+    assert reopened.stats().entries == 2
@@ -0,0 +1,149 @@
+from tests.fakes.domain_fakes import FakeDocumentRepository
+
+from addon.application.use_cases.note_duplicate_finder import (
+    SimilarNoteFinder,
+)
+from addon.domain.entities.note import AddonCollection, AddonNote
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchFilter,
+    SearchQuery,
+    SearchResult,
+)
+from addon.infrastructure.persistence.bm25_index import BM25Index, tokenize
+from addon.infrastructure.persistence.hybrid_repository import (
+    HybridDocumentRepository,
+)
+
+
+class _RankedDense(FakeDocumentRepository):
+    """Dense side answering every query with the same ranking."""
+
+    def __init__(self, ranking: list[Document]) -> None:
+        super().__init__()
+        self._ranking = ranking
+        self.filters: list[SearchFilter | None] = []
+
+    def find_similar(self, query: SearchQuery) -> list[SearchResult]:
+        self.captured_queries.append(query.text)
+        self.filters.append(query.filter)
+        return [
+            SearchResult(doc, 1.0 - i / 10)
+            for i, doc in enumerate(self._ranking[: query.max_results])
+        ]
+
+
+def _doc(doc_id: str, content: str) -> Document:
+    return Document(id=doc_id, content=content, source="", metadata={})
+
+
+def test_tokenize_strips_html_and_lowercases() -> None:
+    # When / Then
+    assert tokenize("<b>Adam</b>&nbsp;optimizer<br>beta_2") == [
+        "adam",
+        "optimizer",
+        "beta_2",
+    ]
+
+
+def test_bm25_ranks_rare_terms_above_common_ones() -> None:
+    # Given
+    index = BM25Index()
+    index.add(
+        [
+            _doc("a", "the learning rate of the optimizer"),
+            _doc("b", "the momentum term of adam"),
+            _doc("c", "the capital of france"),
+        ]
+    )
+
+    # When
+    results = index.search("the adam optimizer", limit=3)
+
+    # Then - "the" is in every document and adds little
+    assert {doc.id for doc, _ in results[:2]} == {"a", "b"}
+    assert results[2][0].id == "c"
+
+
+def test_bm25_replaces_documents_with_the_same_id() -> None:
+    # Given
+    index = BM25Index()
+    index.add([_doc("a", "adam optimizer")])
+
+    # When
+    index.add([_doc("a", "capital of france")])
+
+    # Then
+    assert index.search("adam", limit=5) == []
+    assert len(index) == 1
+
+
+def test_rrf_ranks_documents_found_by_both_searches_first() -> None:
+    # Given - dense finds a paraphrase (p) and the term match (t) second;
+    # only t contains the exact term
+    paraphrase = _doc("p", "how fast the gradient decays")
+    term = _doc("t", "beta_2 exponential decay rate")
+    other = _doc("o", "capital of france")
+    repository = HybridDocumentRepository(
+        _RankedDense([paraphrase, term, other])
+    )
+    repository.store_batch([paraphrase, term, other])
+
+    # When
+    results = repository.find_similar(SearchQuery("beta_2", max_results=3))
+
+    # Then
+    assert [r.document.id for r in results] == ["t", "p", "o"]
+    assert results[0].relevance_score == 1 / 62 + 1 / 61
+
+
+def test_similar_note_finder_finds_exact_terms_through_hybrid_search(
+    addon_collection: AddonCollection,
+    addon_note2: AddonNote,
+) -> None:
+    # Given - the dense side finds nothing
+    finder = SimilarNoteFinder(
+        collection=addon_collection,
+        repository=HybridDocumentRepository(FakeDocumentRepository()),
+    )
+    finder.load_collection()
+
+    # When
+    result = finder.find_duplicates(AddonNote(front="front_two", back=""))
+
+    # Then
+    assert [note.guid for note in result] == [addon_note2.guid]
+
+
+def test_filters_apply_to_both_searches() -> None:
+    # Given - the dense side ranks a note of another deck first
+    biology = Document("b", "adam optimizer", "", {"deck_name": "Biology"})
+    physics = Document("p", "adam optimizer", "", {"deck_name": "Physics"})
+    dense = _RankedDense([physics, biology])
+    lexical = BM25Index()
+    lexical.add([biology, physics])
+    hybrid = HybridDocumentRepository(dense, lexical)
+    where = SearchFilter(deck="Biology")
+
+    # When
+    lexical_hits = lexical.search("adam", limit=5, where=where)
+    hybrid.find_similar(SearchQuery("adam", filter=where))
+
+    # Then
+    assert [doc.id for doc, _ in lexical_hits] == ["b"]
+    assert dense.filters == [where]
+
+
+def test_removed_documents_leave_both_searches() -> None:
+    # Given
+    adam = _doc("a", "adam optimizer")
+    dense = _RankedDense([])
+    repository = HybridDocumentRepository(dense)
+    repository.store_batch([adam, _doc("b", "capital of france")])
+
+    # When
+    repository.remove(["a"])
+
+    # Then
+    assert dense.removed_ids == ["a"]
+    assert repository.find_similar(SearchQuery("adam", 5)) == []
@@ -0,0 +1,83 @@
+import pytest
+
+from addon.application.services.minhash import MinHashIndex, normalize
+
+
+def _shingles(text: str) -> set[str]:
+    return {text[i : i + 5] for i in range(len(text) - 4)}
+
+
+def test_copies_differing_only_in_markup_are_identical() -> None:
+    # Given
+    index = MinHashIndex()
+    html = "<div><b>Mitochondria</b> make&nbsp;ATP</div>"
+
+    # When
+    index.add(["html", "plain"], [html, "mitochondria make ATP"])
+
+    # Then
+    assert normalize(html) == "mitochondria make atp"
+    assert index.similar_pairs(threshold=1.0) == [("html", "plain", 1.0)]
+
+
+def test_similar_pairs_estimates_jaccard_similarity() -> None:
+    # Given - b shares most of a's shingles, c shares none
+    index = MinHashIndex()
+    a = "The mitochondria is the powerhouse of the cell."
+    b = "The mitochondria is the powerhouse of the cell!!"
+    c = "Photosynthesis turns light into chemical energy."
+    index.add(["a", "b", "c"], [a, b, c])
+
+    # When
+    pairs = index.similar_pairs(threshold=0.5)
+
+    # Then
+    assert [(first, second) for first, second, _ in pairs] == [("a", "b")]
+    shingles_a, shingles_b = _shingles(normalize(a)), _shingles(normalize(b))
+    exact = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+    assert pairs[0][2] == pytest.approx(exact, abs=0.15)
+
+
+def test_similar_pairs_reports_each_pair_once() -> None:
+    # Given - three identical texts agree on every band
+    index = MinHashIndex()
+    index.add(["a", "b", "c"], ["same text"] * 3)
+
+    # When
+    pairs = index.similar_pairs(threshold=0.9)
+
+    # Then
+    assert sorted((first, second) for first, second, _ in pairs) == [
+        ("a", "b"),
+        ("a", "c"),
+        ("b", "c"),
+    ]
+    assert all(similarity == 1.0 for _, _, similarity in pairs)
+
+
+def test_texts_shorter_than_a_shingle_are_compared_whole() -> None:
+    # Given
+    index = MinHashIndex()
+
+    # When
+    index.add(["a", "b", "c"], ["ATP", "atp", "ADP"])
+
+    # Then
+    assert [pair[:2] for pair in index.similar_pairs(0.5)] == [("a", "b")]
+
+
+def test_empty_texts_are_not_indexed() -> None:
+    # Given
+    index = MinHashIndex()
+
+    # When
+    index.add(["a", "b", "c"], ["", "<img src='x.png'>", "text"])
+
+    # Then
+    assert len(index) == 1
+    assert index.similar_pairs(threshold=0.0) == []
+
+
+def test_bands_must_divide_the_signature() -> None:
+    with pytest.raises(ValueError):
+        MinHashIndex(num_perm=128, bands=10)
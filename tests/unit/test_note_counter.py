@@ -0,0 +1,85 @@
+from tests.conftest import FakeCollection
+
+from addon.application.use_cases.note_counter import (
+    ReviewCountCache,
+    find_notes_marked_for_review,
+)
+
+
+def test_find_notes_marked_for_review_counts_flagged_and_total_notes(
+    collection: FakeCollection,
+) -> None:
+    # When
+    review = find_notes_marked_for_review(collection, deck_id=1)
+
+    # Then
+    assert review.flagged_note_ids == [1, 3, 4]
+    assert review.total_notes == 4
+
+
+def test_find_notes_marked_for_review_in_another_deck_finds_nothing(
+    collection: FakeCollection,
+) -> None:
+    # When
+    review = find_notes_marked_for_review(collection, deck_id=99)
+
+    # Then
+    assert review.flagged_note_ids == []
+    assert review.total_notes == 0
+
+
+def test_review_count_cache_answers_repeated_requests_without_a_query(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    cache = ReviewCountCache()
+    first = cache.get(collection, deck_id=1)
+
+    # When
+    second = cache.get(collection, deck_id=1)
+
+    # Then
+    assert second == first
+    assert len(collection.db.queries) == 1
+
+
+def test_review_count_cache_recounts_a_deck_after_invalidation(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    cache = ReviewCountCache()
+    cache.get(collection, deck_id=1)
+    collection.cards[100].flags = 0
+    collection.cards[101].flags = 0
+
+    # When
+    unrelated = cache.get(collection, deck_id=1)
+    cache.invalidate([99])
+    still_cached = cache.get(collection, deck_id=1)
+    cache.invalidate([1])
+    recounted = cache.get(collection, deck_id=1)
+
+    # Then
+    assert unrelated.flagged_note_ids == [1, 3, 4]
+    assert still_cached.flagged_note_ids == [1, 3, 4]
+    assert recounted.flagged_note_ids == [3, 4]
+    assert len(collection.db.queries) == 2
+
+
+def test_review_count_cache_counts_all_decks_in_one_query(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    cache = ReviewCountCache()
+
+    # When
+    counts = cache.get_all(collection)
+    cache.get_all(collection)
+    current = cache.get(collection, deck_id=1)
+
+    # Then
+    assert list(counts) == ["Default"]
+    assert counts["Default"].flagged_note_ids == [1, 3, 4]
+    assert counts["Default"].total_notes == 4
+    assert current == counts["Default"]
+    assert len(collection.db.queries) == 1
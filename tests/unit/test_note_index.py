@@ -0,0 +1,142 @@
+import pytest
+from tests.fakes.aqt_fakes import FakeCollection
+from tests.fakes.domain_fakes import FakeDocumentRepository
+from tests.fakes.qdrant_fakes import FakeSentenceTransformer
+
+from addon.application.use_cases.note_index import (
+    IndexSyncCancelledError,
+    NoteIndex,
+)
+from addon.domain.entities.note import AddonNote, NoteId
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchFilter,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.anki_note_repository import (
+    AnkiNoteRepository,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+
+
+class _RecordingDocuments(FakeDocumentRepository):
+    """Documents repository recording the content of stored documents."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stored: dict[str, str] = {}
+
+    def store_batch(self, documents: list[Document]) -> None:
+        self.stored.update((doc.id, doc.content) for doc in documents)
+
+    def remove(self, doc_ids: list[str]) -> None:
+        super().remove(doc_ids)
+        for doc_id in doc_ids:
+            del self.stored[doc_id]
+
+
+def test_first_sync_stores_every_note_in_batches(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    documents = _RecordingDocuments()
+    index = NoteIndex(documents, batch_size=3)
+
+    # When
+    synced = index.sync(AnkiNoteRepository(collection))
+
+    # Then
+    assert synced == 4
+    assert len(documents.stored) == 4
+    assert documents.removed_ids == []
+
+
+def test_sync_reports_progress_and_can_be_cancelled(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    notes = AnkiNoteRepository(collection)
+    documents = _RecordingDocuments()
+    index = NoteIndex(documents, batch_size=3)
+    progress: list[tuple[int, int]] = []
+
+    def on_progress(done: int, total: int) -> None:
+        progress.append((done, total))
+
+    # When
+    with pytest.raises(IndexSyncCancelledError):
+        index.sync(notes, on_progress, lambda: len(progress) == 1)
+
+    # Then
+    assert progress == [(3, 4)]
+    assert len(documents.stored) == 3
+    assert index.watermark is None
+
+    # When
+    synced = index.sync(notes, on_progress)
+
+    # Then
+    assert synced == 4
+    assert progress[1:] == [(3, 4), (4, 4)]
+    assert len(documents.stored) == 4
+    assert index.watermark is not None
+
+
+def test_sync_stores_edited_notes_and_removes_deleted_ones(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    notes = AnkiNoteRepository(collection)
+    documents = _RecordingDocuments()
+    index = NoteIndex(documents)
+    index.sync(notes)
+    notes.update(NoteId(2), AddonNote(front="Edited", back="A"))
+    notes.remove([NoteId(3)])
+
+    # When
+    index.sync(notes)
+
+    # Then
+    assert len(documents.stored) == 3
+    assert len(documents.removed_ids) == 1
+    assert sum("Edited" in c for c in documents.stored.values()) == 1
+
+
+class _ConstantEncoder(FakeSentenceTransformer):
+    """Embeds every text as the same unit vector."""
+
+    def encode(self, sentences, batch_size: int = 32):  # type: ignore[override]
+        if isinstance(sentences, str):
+            return [1.0, 0.0, 0.0]
+        return [[1.0, 0.0, 0.0] for _ in sentences]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 3
+
+
+def test_indexed_notes_can_be_filtered_by_deck(
+    collection: FakeCollection,
+) -> None:
+    # Given
+    collection.decks.other_decks.append({"id": 2, "name": "Languages"})
+    for card in collection.cards.values():
+        if card.note_id == 3:
+            card.deck_id = 2
+    index = NoteIndex(NumpyDocumentRepository(_ConstantEncoder()))
+    index.sync(AnkiNoteRepository(collection))
+
+    # When
+    languages = index.documents.find_similar(
+        SearchQuery("question", 10, SearchFilter(deck="Languages"))
+    )
+    default = index.documents.find_similar(
+        SearchQuery("question", 10, SearchFilter(deck="Default"))
+    )
+
+    # Then
+    assert [r.document.metadata["deck_name"] for r in languages] == [
+        "Languages"
+    ]
+    assert len(default) == 3
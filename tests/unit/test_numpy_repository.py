@@ -0,0 +1,211 @@
+from pathlib import Path
+
+import pytest
+from tests.fakes.qdrant_fakes import FakeSentenceTransformer
+
+from addon.domain.entities.note import AddonNoteType
+from addon.domain.repositories.document_repository import (
+    Document,
+    DocumentNotFoundError,
+    SearchFilter,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+
+_VECTORS = {
+    "cat": [1.0, 0.0, 0.0],
+    "kitten": [0.9, 0.1, 0.0],
+    "dog": [0.0, 1.0, 0.0],
+    "car": [0.0, 0.0, 1.0],
+}
+
+
+class _WordEncoder(FakeSentenceTransformer):
+    """Embeds each known word as a fixed 3-dimensional vector."""
+
+    def encode(self, sentences, batch_size: int = 32):  # type: ignore[override]
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        self.encode_calls.append(len(sentences))
+        return [_VECTORS[text] for text in sentences]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 3
+
+
+def _doc(word: str, **metadata: object) -> Document:
+    return Document(id=word, content=word, source="", metadata=metadata)
+
+
+@pytest.fixture
+def repo() -> NumpyDocumentRepository:
+    repository = NumpyDocumentRepository(_WordEncoder())
+    repository.store_batch([_doc(w) for w in ("cat", "dog", "car")])
+    repository.store(_doc("kitten"))
+    return repository
+
+
+def test_find_similar_ranks_by_cosine_similarity(
+    repo: NumpyDocumentRepository,
+) -> None:
+    # When
+    results = repo.find_similar(SearchQuery(text="cat", max_results=2))
+
+    # Then
+    assert [r.document.id for r in results] == ["cat", "kitten"]
+    assert results[0].relevance_score == pytest.approx(1.0)
+
+
+def test_batched_queries_respect_each_max_results(
+    repo: NumpyDocumentRepository,
+) -> None:
+    # When
+    results = repo.find_similar_batch(
+        [SearchQuery("dog", max_results=1), SearchQuery("kitten", 3)]
+    )
+
+    # Then
+    assert [[r.document.id for r in hits] for hits in results] == [
+        ["dog"],
+        ["kitten", "cat", "dog"],
+    ]
+
+
+def test_find_neighbors_excludes_the_document_itself(
+    repo: NumpyDocumentRepository,
+) -> None:
+    # When
+    neighbors = repo.find_neighbors(["cat", "kitten"], max_results=1)
+
+    # Then
+    assert [[r.document.id for r in n] for n in neighbors] == [
+        ["kitten"],
+        ["cat"],
+    ]
+
+
+def test_unchanged_documents_are_not_embedded_again() -> None:
+    # Given
+    encoder = _WordEncoder()
+    repo = NumpyDocumentRepository(encoder)
+    repo.store_batch([_doc("cat"), _doc("dog")])
+
+    # When - "dog" only changes metadata
+    repo.store_batch([_doc("cat"), _doc("dog", deck="Animals")])
+
+    # Then
+    assert encoder.encode_calls == [2]
+    assert len(repo) == 2
+    assert repo.find_by_id("dog").metadata == {"deck": "Animals"}
+    assert repo.find_similar(SearchQuery("dog", 1))[0].document.id == "dog"
+
+
+def test_find_by_id_raises_for_unknown_document(
+    repo: NumpyDocumentRepository,
+) -> None:
+    # When / Then
+    with pytest.raises(DocumentNotFoundError):
+        repo.find_by_id("missing")
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_saved_repository_loads_with_the_same_results(
+    tmp_path: Path, dtype: str
+) -> None:
+    # Given
+    repo = NumpyDocumentRepository(_WordEncoder(), dtype=dtype)
+    repo.store_batch([_doc(w) for w in _VECTORS])
+    repo.save(tmp_path)
+
+    # When
+    loaded = NumpyDocumentRepository.load(tmp_path, _WordEncoder())
+
+    # Then
+    results = loaded.find_similar(SearchQuery("kitten", 2))
+    assert [r.document.id for r in results] == ["kitten", "cat"]
+    assert loaded.find_by_id("car") == _doc("car")
+
+
+def test_dtype_must_be_float32_or_float16() -> None:
+    # When / Then
+    with pytest.raises(ValueError):
+        NumpyDocumentRepository(_WordEncoder(), dtype="int8")
+
+
+def test_filtered_search_returns_only_matching_documents() -> None:
+    # Given - the nearest documents to "cat" are in another deck
+    repo = NumpyDocumentRepository(_WordEncoder())
+    repo.store_batch(
+        [
+            _doc("cat", deck_name="Pets", tags=["animal"]),
+            _doc("kitten", deck_name="Pets", tags=["animal", "young"]),
+            _doc("dog", deck_name="Zoo", tags=["animal"]),
+            _doc("car", deck_name="Zoo", notetype=AddonNoteType.CLOZE),
+        ]
+    )
+
+    # When
+    zoo = repo.find_similar(
+        SearchQuery("cat", max_results=2, filter=SearchFilter(deck="Zoo"))
+    )
+    young = repo.find_similar(
+        SearchQuery("dog", filter=SearchFilter(tag="young"))
+    )
+    cloze = repo.find_similar(
+        SearchQuery(
+            "cat",
+            filter=SearchFilter(deck="Zoo", notetype=AddonNoteType.CLOZE),
+        )
+    )
+    nothing = repo.find_similar(
+        SearchQuery("cat", filter=SearchFilter(deck="Missing"))
+    )
+
+    # Then - filtered inside the search, so max_results are still found
+    assert [r.document.id for r in zoo] == ["dog", "car"]
+    assert [r.document.id for r in young] == ["kitten"]
+    assert [r.document.id for r in cloze] == ["car"]
+    assert nothing == []
+
+
+def test_filters_follow_replaced_and_reloaded_documents(
+    tmp_path: Path,
+) -> None:
+    # Given - cat moves from Pets to Zoo
+    repo = NumpyDocumentRepository(_WordEncoder())
+    repo.store_batch([_doc("cat", deck_name="Pets"), _doc("dog")])
+    repo.store(_doc("cat", deck_name="Zoo"))
+    repo.save(tmp_path)
+
+    # When
+    for repository in (
+        repo,
+        NumpyDocumentRepository.load(tmp_path, _WordEncoder()),
+    ):
+        pets = repository.find_similar(
+            SearchQuery("cat", filter=SearchFilter(deck="Pets"))
+        )
+        zoo = repository.find_similar(
+            SearchQuery("cat", filter=SearchFilter(deck="Zoo"))
+        )
+
+        # Then
+        assert pets == []
+        assert [r.document.id for r in zoo] == ["cat"]
+
+
+def test_removed_documents_are_no_longer_found(
+    repo: NumpyDocumentRepository,
+) -> None:
+    # When - "cat" is not the last row, so another row moves into it
+    repo.remove(["cat", "missing"])
+
+    # Then
+    assert len(repo) == 3
+    with pytest.raises(DocumentNotFoundError):
+        repo.find_by_id("cat")
+    results = repo.find_similar(SearchQuery("kitten", max_results=3))
+    assert [r.document.id for r in results] == ["kitten", "dog", "car"]
+    assert repo.find_by_id("kitten").content == "kitten"
@@ -3,11 +3,14 @@ from tests.fakes.qdrant_fakes import FakeQdrantClient, FakeSentenceTransformer
 
 from addon.domain.repositories.document_repository import (
     Document,
+    DocumentNotFoundError,
+    SearchFilter,
     SearchQuery,
     SearchResult,
 )
 from addon.infrastructure.persistence.qdrant_repository import (
     QdrantDocumentRepository,
+    VectorIndexConfig,
 )
 
 
@@ -221,10 +224,6 @@ def test_find_by_id_raises_error_for_nonexistent_document() -> None:
     for documents that don't exist
     """
     # Given
-    from addon.domain.repositories.document_repository import (
-        DocumentNotFoundError,
-    )
-
     repo = QdrantDocumentRepository(
         FakeSentenceTransformer(), client=FakeQdrantClient()
     )
@@ -392,3 +391,173 @@ def test_search_result_domain_object() -> None:
 
     assert result.document == doc
     assert result.relevance_score == 0.85
+
+
+def test_store_batch_embeds_and_upserts_in_chunks() -> None:
+    """Each chunk of batch_size documents is one encoder call and one
+    upsert."""
+    # Given
+    encoder = FakeSentenceTransformer()
+    client = FakeQdrantClient()
+    repo = QdrantDocumentRepository(encoder, client=client, batch_size=2)
+    documents = [
+        Document(id=f"doc{i}", content=f"Content {i}", source="", metadata={})
+        for i in range(5)
+    ]
+
+    # When
+    repo.store_batch(documents)
+
+    # Then
+    assert encoder.encode_calls == [2, 2, 1]
+    assert client.upsert_sizes == [2, 2, 1]
+    assert repo.find_by_id("doc4").content == "Content 4"
+
+
+def test_find_neighbors_returns_one_list_per_id_without_itself() -> None:
+    # Given
+    client = FakeQdrantClient(
+        search_responses=[
+            [_point("a", "A", "", {}, 1.0), _point("b", "B", "", {}, 0.9)],
+            [_point("b", "B", "", {}, 1.0), _point("a", "A", "", {}, 0.9)],
+        ]
+    )
+    repo = QdrantDocumentRepository(FakeSentenceTransformer(), client=client)
+
+    # When
+    neighbors = repo.find_neighbors(["a", "b"], max_results=1)
+
+    # Then
+    assert [[r.document.id for r in n] for n in neighbors] == [["b"], ["a"]]
+
+
+def test_batch_size_must_be_positive() -> None:
+    # When / Then
+    with pytest.raises(ValueError):
+        QdrantDocumentRepository(
+            FakeSentenceTransformer(), client=FakeQdrantClient(), batch_size=0
+        )
+
+
+def test_storing_unchanged_documents_again_is_skipped() -> None:
+    """Reloading the same documents neither re-embeds nor re-upserts
+    them."""
+    # Given
+    encoder = FakeSentenceTransformer()
+    client = FakeQdrantClient()
+    repo = QdrantDocumentRepository(encoder, client=client)
+    documents = [
+        Document(id="doc1", content="Content 1", source="", metadata={}),
+        Document(id="doc2", content="Content 2", source="", metadata={}),
+    ]
+    repo.store_batch(documents)
+
+    # When
+    repo.store_batch(documents)
+
+    # Then
+    assert encoder.encode_calls == [2]
+    assert client.upsert_sizes == [2]
+
+
+def test_changed_metadata_reuses_the_stored_vector() -> None:
+    # Given
+    encoder = FakeSentenceTransformer()
+    client = FakeQdrantClient()
+    repo = QdrantDocumentRepository(encoder, client=client)
+    repo.store_batch(
+        [Document(id="doc1", content="Content", source="", metadata={})]
+    )
+    updated = Document(
+        id="doc1", content="Content", source="", metadata={"deck": "New"}
+    )
+    changed = Document(id="doc2", content="Other", source="", metadata={})
+
+    # When
+    repo.store_batch([updated, changed])
+
+    # Then
+    assert encoder.encode_calls == [1, 1]
+    assert client.upsert_sizes == [1, 2]
+    assert repo.find_by_id("doc1").metadata == {"deck": "New"}
+
+
+def test_collection_is_created_on_first_use_with_encoder_size() -> None:
+    # Given
+    client = FakeQdrantClient()
+    repo = QdrantDocumentRepository(
+        FakeSentenceTransformer(),
+        client=client,
+        index_config=VectorIndexConfig(hnsw_m=32, quantize=True),
+    )
+    assert client.collections == {}
+
+    # When
+    repo.store(Document("doc1", "content", "", {}))
+    repo.find_similar(SearchQuery("content"))
+
+    # Then
+    assert list(client.collections) == ["docs"]
+    created = client.collections["docs"]
+    assert created["vectors_config"].size == 7
+    assert created["hnsw_config"].m == 32
+    assert created["quantization_config"] is not None
+    assert client.payload_indexes["docs"] == [
+        "metadata.deck_name",
+        "metadata.tags",
+        "metadata.notetype",
+    ]
+
+
+def test_existing_collection_is_left_as_is() -> None:
+    # Given
+    client = FakeQdrantClient()
+    client.collections["docs"] = {"vectors_config": "existing"}
+    repo = QdrantDocumentRepository(FakeSentenceTransformer(), client=client)
+
+    # When
+    repo.store(Document("doc1", "content", "", {}))
+
+    # Then
+    assert client.collections["docs"] == {"vectors_config": "existing"}
+
+
+def test_filtered_search_sends_the_filter_to_qdrant() -> None:
+    # Given
+    client = FakeQdrantClient()
+    repo = QdrantDocumentRepository(FakeSentenceTransformer(), client=client)
+
+    # When
+    repo.find_similar(SearchQuery("content"))
+    repo.find_similar(
+        SearchQuery("content", filter=SearchFilter(deck="Biology", tag="cell"))
+    )
+
+    # Then - applied by Qdrant during the search, not afterwards
+    unfiltered, filtered = client.query_filters
+    assert unfiltered is None
+    assert [(c.key, c.match.value) for c in filtered.must] == [
+        ("metadata.deck_name", "Biology"),
+        ("metadata.tags", "cell"),
+    ]
+
+
+def test_removed_documents_are_deleted_from_qdrant() -> None:
+    # Given
+    repo = QdrantDocumentRepository(
+        FakeSentenceTransformer(), client=FakeQdrantClient()
+    )
+    repo.store_batch(
+        [
+            Document(id=doc_id, content=doc_id, source="", metadata={})
+            for doc_id in ("a", "b")
+        ]
+    )
+
+    # When
+    repo.remove(["a"])
+
+    # Then
+    with pytest.raises(DocumentNotFoundError):
+        repo.find_by_id("a")
+    assert repo.find_by_id("b").id == "b"
@@ -0,0 +1,127 @@
+import pytest
+from tests.fakes.qdrant_fakes import FakeCrossEncoder, FakeSentenceTransformer
+
+from addon.domain.repositories.document_repository import (
+    Document,
+    SearchFilter,
+    SearchQuery,
+)
+from addon.infrastructure.persistence.numpy_repository import (
+    NumpyDocumentRepository,
+)
+from addon.infrastructure.persistence.reranking_repository import (
+    RerankingDocumentRepository,
+)
+
+
+def _doc(doc_id: str, content: str) -> Document:
+    return Document(id=doc_id, content=content, source="", metadata={})
+
+
+@pytest.fixture
+def base() -> NumpyDocumentRepository:
+    # The fake embedding is the same for every text: dense search ranks
+    # all documents alike, so only the cross-encoder tells them apart.
+    repository = NumpyDocumentRepository(FakeSentenceTransformer())
+    repository.store_batch(
+        [
+            _doc("a", "capital of france"),
+            _doc("b", "what does beta_2 control in adam"),
+            _doc("c", "what does beta_1 control in adam"),
+        ]
+    )
+    return repository
+
+
+def test_candidates_are_ordered_by_cross_encoder_score(
+    base: NumpyDocumentRepository,
+) -> None:
+    # Given
+    repository = RerankingDocumentRepository(base, FakeCrossEncoder())
+
+    # When
+    results = repository.find_similar(
+        SearchQuery("what does beta_2 control", max_results=2)
+    )
+
+    # Then
+    assert [r.document.id for r in results] == ["b", "c"]
+    assert results[0].relevance_score == pytest.approx(4 / 6)
+
+
+def test_candidates_below_min_score_are_dropped(
+    base: NumpyDocumentRepository,
+) -> None:
+    # Given
+    repository = RerankingDocumentRepository(
+        base, FakeCrossEncoder(), min_score=0.5
+    )
+
+    # When
+    results = repository.find_similar(SearchQuery("beta_2 in adam", 3))
+
+    # Then
+    assert [r.document.id for r in results] == ["b"]
+
+
+def test_only_the_top_k_candidates_are_scored(
+    base: NumpyDocumentRepository,
+) -> None:
+    # Given
+    model = FakeCrossEncoder()
+    repository = RerankingDocumentRepository(base, model, candidates=2)
+
+    # When
+    repository.find_similar(SearchQuery("adam", max_results=1))
+
+    # Then
+    assert model.predict_calls == [2]
+
+
+def test_scores_are_cached_by_pair(base: NumpyDocumentRepository) -> None:
+    # Given
+    model = FakeCrossEncoder()
+    repository = RerankingDocumentRepository(base, model)
+    repository.find_similar(SearchQuery("adam", 3))
+
+    # When
+    repository.find_similar(SearchQuery("adam", 3))
+
+    # Then
+    assert model.predict_calls == [3]
+    assert repository.scored_pairs == 3
+
+
+def test_neighbor_pairs_are_scored_in_one_batch(
+    base: NumpyDocumentRepository,
+) -> None:
+    # Given
+    model = FakeCrossEncoder()
+    repository = RerankingDocumentRepository(base, model)
+
+    # When
+    neighbors = repository.find_neighbors(["b", "c"], max_results=1)
+
+    # Then
+    assert model.predict_calls == [4]
+    assert [[r.document.id for r in n] for n in neighbors] == [["c"], ["b"]]
+
+
+def test_the_query_filter_restricts_the_candidates() -> None:
+    # Given - the best match for the cross-encoder is in another deck
+    base = NumpyDocumentRepository(FakeSentenceTransformer())
+    base.store_batch(
+        [
+            Document("a", "what does beta_2 control", "", {"deck_name": "ML"}),
+            Document("b", "capital of france", "", {"deck_name": "Geo"}),
+        ]
+    )
+    repository = RerankingDocumentRepository(base, FakeCrossEncoder())
+
+    # When
+    results = repository.find_similar(
+        SearchQuery("what does beta_2 control", filter=SearchFilter("Geo"))
+    )
+
+    # Then
+    assert [r.document.id for r in results] == ["b"]
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from tests.fakes.aqt_fakes import FakeAddonManager
+from tests.fakes.note_fakes import FakeNoteRepository
+from tests.fakes.qdrant_fakes import FakeSentenceTransformer
+
+from addon.domain.entities.note import AddonNote, NoteId
+from addon.domain.repositories.document_repository import SearchQuery
+from addon.infrastructure.configuration.settings import AddonConfig
+from addon.infrastructure.persistence.embedding_cache import (
+    CachedEmbeddingModel,
+    MemmapEmbeddingCache,
+)
+from addon.infrastructure.persistence.similarity_index import SimilarityIndex
+
+
+class _WordCountEncoder(FakeSentenceTransformer):
+    """Embeds each text by its number of words, in 7 dimensions."""
+
+    def encode(self, sentences, batch_size: int = 32):  # type: ignore[override]
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        self.encode_calls.append(len(sentences))
+        return [[1.0, len(text.split()), 0, 0, 0, 0, 0] for text in sentences]
+
+
+def _config(embedding_model: str = "m") -> AddonConfig:
+    return AddonConfig(
+        FakeAddonManager(
+            {
+                "openai_host": "localhost",
+                "openai_port": "8000",
+                "openai_model": "test-model",
+                "embedding_model": embedding_model,
+            }
+        )
+    )
+
+
+def _open(
+    tmp_path: Path, encoder: FakeSentenceTransformer, model: str = "m"
+) -> SimilarityIndex:
+    cache = MemmapEmbeddingCache(tmp_path / "cache", model, dim=7)
+    return SimilarityIndex(
+        tmp_path / "index",
+        CachedEmbeddingModel(encoder, cache),
+        _config(model),
+    )
+
+
+def _notes() -> FakeNoteRepository:
+    return FakeNoteRepository(
+        {
+            1: AddonNote(front="Capital of France", back="Paris"),
+            2: AddonNote(front="Capital of Italy", back="Rome"),
+        }
+    )
+
+
+def test_reopened_index_resumes_without_encoding_again(
+    tmp_path: Path,
+) -> None:
+    # Given
+    notes = _notes()
+    _open(tmp_path, _WordCountEncoder()).sync(notes)
+    notes.update(NoteId(2), AddonNote(front="Capital of Spain", back="Madrid"))
+    encoder = _WordCountEncoder()
+
+    # When
+    index = _open(tmp_path, encoder)
+    changed = index.sync(notes)
+
+    # Then
+    assert changed == 1
+    assert encoder.encode_calls == [1]
+    results = index.documents.find_similar(SearchQuery("Madrid", 5))
+    assert "Madrid" in results[0].document.content
+    assert len(results) == 2
+
+
+def test_index_saved_for_another_model_is_rebuilt(tmp_path: Path) -> None:
+    # Given
+    notes = _notes()
+    _open(tmp_path, _WordCountEncoder()).sync(notes)
+
+    # When
+    changed = _open(tmp_path, _WordCountEncoder(), model="other").sync(notes)
+
+    # Then
+    assert changed == 2
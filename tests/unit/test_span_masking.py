@@ -0,0 +1,92 @@
+from addon.application.services.span_masking import (
+    MIN_CODE_BLOCK_CHARS,
+    SpanMask,
+)
+
+_IMG = '<img src="data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAE=">'
+
+
+def test_mask_replaces_images_media_and_math_with_placeholders() -> None:
+    # Given
+    mask = SpanMask()
+    text = f"See {_IMG} and \\(x^2\\) then [sound:hello.mp3]"
+
+    # When
+    masked = mask.mask(text)
+
+    # Then
+    assert masked == "See @@P0@@ and @@P1@@ then @@P2@@"
+    assert mask.unmask(masked) == text
+
+
+def test_placeholders_are_unique_across_fields() -> None:
+    # Given
+    mask = SpanMask()
+
+    # When
+    front = mask.mask(f"Q {_IMG}")
+    back = mask.mask("A $$e^{i\\pi} = -1$$")
+
+    # Then
+    assert (front, back) == ("Q @@P0@@", "A @@P1@@")
+
+
+def test_only_long_code_blocks_are_masked() -> None:
+    # Given
+    mask = SpanMask()
+    short = "```bash<br>$ ls<br>```"
+    long = "```python<br>" + "x = 1<br>" * MIN_CODE_BLOCK_CHARS + "```"
+
+    # When
+    masked = mask.mask(f"{short} then {long}")
+
+    # Then
+    assert masked == f"{short} then @@P0@@"
+    assert mask.spans["@@P0@@"] == long
+
+
+def test_unmask_restores_spans_wherever_the_model_moved_them() -> None:
+    # Given
+    mask = SpanMask()
+    mask.mask(f"Before {_IMG}")
+
+    # When
+    restored = mask.unmask("In ML, @@P0@@<br>after")
+
+    # Then
+    assert restored == f"In ML, {_IMG}<br>after"
+
+
+def test_is_preserved_in_detects_dropped_or_duplicated_placeholders() -> None:
+    # Given
+    mask = SpanMask()
+    mask.mask(f"{_IMG} \\(a\\)")
+
+    # Then
+    assert mask.is_preserved_in("@@P1@@ text", "@@P0@@")
+    assert not mask.is_preserved_in("@@P0@@ only")
+    assert not mask.is_preserved_in("@@P0@@ @@P0@@ @@P1@@")
+    assert not mask.is_preserved_in("@@P0@@ @@P1@@ @@P7@@")
+
+
+def test_text_that_already_contains_placeholders_is_left_alone() -> None:
+    # Given
+    mask = SpanMask()
+
+    # When
+    masked = mask.mask(f"literal @@P0@@ and {_IMG}")
+
+    # Then
+    assert masked == f"literal @@P0@@ and {_IMG}"
+    assert mask.spans == {}
+
+
+def test_tokens_saved_counts_span_tokens_minus_placeholders() -> None:
+    # Given
+    mask = SpanMask()
+
+    # When
+    mask.mask('<img src="' + "a" * 388 + '">')
+
+    # Then
+    assert mask.tokens_saved == 100 - 2